@@ -0,0 +1,285 @@
+import numpy as np
+from codes import (MOVE_SAFE, MOVE_INVALID, MOVE_WUMPUS, MOVE_PIT, MOVE_PLANKS, MOVE_BAT_TAXI, MOVE_BATS,
+                   MOVE_GAME_OVER, SHOT_MISSED, SHOT_WUMPUS, SHOT_SELF, SHOT_WOKE, SHOT_VEERED, SHOT_INVALID,
+                   SHOT_NO_ARROWS, SHOT_GAME_OVER, ONGOING, WON, KILLED_BY_WUMPUS, FELL_IN_PIT, SHOT_YOURSELF,
+                   OUT_OF_ARROWS)
+from freecaves import FreeCaveIndex, random_cave_except
+from rng import make_rng
+from topology import classic
+
+
+def _neighbor_table(topology):
+    """
+    Turns a topology's CSR arrays into an (num_caves + 1, max_degree) table
+    of neighbors padded with 0. Row 0 is unused so caves stay 1-based.
+    """
+    offsets = np.frombuffer(topology.offsets, dtype=np.dtype(topology.offsets.typecode))
+    targets = np.frombuffer(topology.targets, dtype=np.dtype(topology.targets.typecode))
+    degrees = np.diff(offsets)
+    table = np.zeros((topology.num_caves + 1, max(int(degrees.max()), 1)), dtype=np.int32)
+    rows = np.repeat(np.arange(topology.num_caves + 1), degrees)
+    cols = np.arange(len(targets)) - np.repeat(offsets[:-1], degrees)
+    table[rows, cols] = targets
+    return table
+
+
+class BatchWumpus:
+    """
+    Headless batch version of HuntTheWumpus in the classic scenario.
+    Holds N games as NumPy arrays and steps all of them at once. Every game
+    owns its own generator, so game i matches a scalar
+    HuntTheWumpus(seed=seeds[i]) (or rng=make_rng(seeds[i], rng_kind)).
+    Passing a NumPy `generator` instead draws all randomness from it in
+    whole-array operations: much faster for millions of games, but the
+    games no longer match scalar ones.
+    """
+    def __init__(self, num_games, seeds=None, initial_arrows=5, topology=None, rng_kind="mt",
+                 generator=None):
+        if seeds is None:
+            seeds = range(num_games)
+        seeds = list(seeds) if generator is None else []
+        if generator is None and len(seeds) != num_games:
+            raise ValueError("Need exactly one seed per game.")
+
+        self.num_games = num_games
+        self.topology = topology if topology is not None else classic()
+        self.num_caves = self.topology.num_caves
+        self.neighbors = self.topology.derived("neighbor_table", lambda: _neighbor_table(self.topology))
+        self.seeds = seeds
+        self.generator = generator
+        self._rngs = [make_rng(seed, rng_kind) for seed in seeds]
+        # Per-game free-cave indexes, so placements and bat drops draw like the scalar class
+        self._free = [FreeCaveIndex.for_topology(self.topology) for _ in seeds]
+        self.initial_arrows = initial_arrows
+
+        self.player_location = np.zeros(num_games, dtype=np.int32)
+        self.wumpus_location = np.zeros(num_games, dtype=np.int32)
+        self.pit_mask = np.zeros((num_games, self.num_caves + 1), dtype=bool)
+        self.bat_mask = np.zeros((num_games, self.num_caves + 1), dtype=bool)
+        self.num_arrows = np.full(num_games, initial_arrows, dtype=np.int32)
+        self.game_over = np.zeros(num_games, dtype=bool)
+        self.outcome = np.zeros(num_games, dtype=np.int8)
+        self.moves = np.zeros(num_games, dtype=np.int32)
+
+        self._place_game_elements()
+
+    def _place_game_elements(self, games=None):
+        """Places the elements of every game (or the selected ones) exactly like the scalar class does."""
+        if games is None:
+            games = np.arange(self.num_games)
+        if self.generator is not None:
+            # Random sort keys give every game its own uniform permutation of the caves
+            caves = np.argsort(self.generator.random((len(games), self.num_caves)), axis=1) + 1
+            rows = games[:, None]
+            self.wumpus_location[games] = caves[:, 0]
+            self.pit_mask[rows, caves[:, 1:3]] = True
+            self.bat_mask[rows, caves[:, 3:5]] = True
+            self.player_location[games] = caves[:, 5]
+            return
+        for i in games:
+            rng = self._rngs[i]
+            free = self._free[i]
+            free.reset()
+            self.pit_mask[i, [free.pop_random(rng), free.pop_random(rng)]] = True
+            self.bat_mask[i, [free.pop_random(rng), free.pop_random(rng)]] = True
+            wumpus = free.sample(rng)
+            self.wumpus_location[i] = wumpus
+            self.player_location[i] = free.sample_avoiding(rng, (), (wumpus,))
+
+    def reset(self, games=None):
+        """Starts new games in the selected games (a boolean mask or indices), or in all of them."""
+        games = np.arange(self.num_games) if games is None else np.asarray(games)
+        if games.dtype == bool:
+            games = np.flatnonzero(games)
+        self.num_arrows[games] = self.initial_arrows
+        self.game_over[games] = False
+        self.outcome[games] = ONGOING
+        self.moves[games] = 0
+        self.pit_mask[games] = False
+        self.bat_mask[games] = False
+        self._place_game_elements(games)
+
+    def _pick(self, allowed):
+        """Draws one allowed cave per row of a boolean (k, num_caves + 1) mask from the generator."""
+        keys = self.generator.random(allowed.shape)
+        keys[~allowed] = -1.0
+        return keys.argmax(axis=1).astype(np.int32)
+
+    def pit_locations(self, game):
+        """Returns the pit caves of one game in ascending order."""
+        return np.flatnonzero(self.pit_mask[game]).tolist()
+
+    def bat_locations(self, game):
+        """Returns the bat caves of one game in ascending order."""
+        return np.flatnonzero(self.bat_mask[game]).tolist()
+
+    def _as_mask(self, value):
+        """Broadcasts a scalar or per-game flag to a boolean array."""
+        return np.broadcast_to(np.asarray(value, dtype=bool), (self.num_games,))
+
+    def _connected(self, caves, targets):
+        """Returns an (N,) mask of games where targets[i] is a neighbor of caves[i]."""
+        return (self.neighbors[caves] == targets[:, None]).any(axis=1)
+
+    def get_perceptions(self):
+        """
+        Returns three (N,) boolean arrays: Wumpus, pit and bat next to the player.
+        """
+        games = np.arange(self.num_games)[:, None]
+        around = self.neighbors[self.player_location]
+        smell = (around == self.wumpus_location[:, None]).any(axis=1)
+        breeze = self.pit_mask[games, around].any(axis=1)
+        bats = self.bat_mask[games, around].any(axis=1)
+        return smell, breeze, bats
+
+    def _check_hazards(self, active, has_planks, has_bat_taxi):
+        """
+        Vectorized _check_hazards for the games selected by the boolean mask
+        `active`. Returns an (N,) array of MOVE_* codes, MOVE_SAFE elsewhere.
+        """
+        has_planks = self._as_mask(has_planks)
+        has_bat_taxi = self._as_mask(has_bat_taxi)
+        games = np.arange(self.num_games)
+        result = np.full(self.num_games, MOVE_SAFE, dtype=np.int8)
+
+        at_wumpus = active & (self.player_location == self.wumpus_location)
+        in_pit = active & ~at_wumpus & self.pit_mask[games, self.player_location]
+        in_bats = active & ~at_wumpus & ~in_pit & self.bat_mask[games, self.player_location]
+
+        result[at_wumpus] = MOVE_WUMPUS
+        self.outcome[at_wumpus] = KILLED_BY_WUMPUS
+
+        fell = in_pit & ~has_planks
+        result[fell] = MOVE_PIT
+        self.outcome[fell] = FELL_IN_PIT
+        result[in_pit & has_planks] = MOVE_PLANKS
+        self.game_over |= at_wumpus | fell
+
+        result[in_bats & has_bat_taxi] = MOVE_BAT_TAXI
+        dropped = in_bats & ~has_bat_taxi
+        result[dropped] = MOVE_BATS
+        if self.generator is not None and dropped.any():
+            rows = np.flatnonzero(dropped)
+            free = ~(self.pit_mask[rows] | self.bat_mask[rows])
+            free[:, 0] = False
+            free[np.arange(len(rows)), self.wumpus_location[rows]] = False
+            free[np.arange(len(rows)), self.player_location[rows]] = False
+            # Without a free cave the bats drop the player anywhere else
+            crowded = ~free.any(axis=1)
+            free[crowded] = True
+            free[crowded, 0] = False
+            free[crowded, self.player_location[rows[crowded]]] = False
+            self.player_location[rows] = self._pick(free)
+            return result
+        # Random draws stay per game so every game consumes its own stream
+        for i in np.flatnonzero(dropped):
+            rng = self._rngs[i]
+            player = int(self.player_location[i])
+            drop = self._free[i].sample_avoiding(rng, (player,), (int(self.wumpus_location[i]),))
+            if drop is None:
+                drop = random_cave_except(rng, self.num_caves, player)
+            self.player_location[i] = drop
+        return result
+
+    def _playing(self, active):
+        return ~self.game_over if active is None else self._as_mask(active) & ~self.game_over
+
+    def move_player(self, destinations, has_planks=False, has_bat_taxi=False, active=None):
+        """
+        Moves every game's player (or only the games in the boolean mask
+        `active`) to its destination if the move is valid.
+        Returns an (N,) array of MOVE_* codes.
+        """
+        destinations = np.asarray(destinations, dtype=np.int32)
+        result = np.full(self.num_games, MOVE_GAME_OVER, dtype=np.int8)
+        playing = self._playing(active)
+
+        in_range = (destinations >= 1) & (destinations <= self.num_caves)
+        connected = in_range & self._connected(self.player_location, destinations)
+        valid = playing & connected
+        result[playing & ~connected] = MOVE_INVALID
+
+        self.player_location[valid] = destinations[valid]
+        self.moves[valid] += 1
+        hazards = self._check_hazards(valid, has_planks, has_bat_taxi)
+        result[valid] = hazards[valid]
+        return result
+
+    def shoot_arrow(self, target_paths, active=None):
+        """
+        Fires one arrow per game (or only in the games in the boolean mask
+        `active`). `target_paths` is an (N, L) array of caves where 0 marks
+        the end of a shorter path. Returns an (N,) array of SHOT_* codes.
+        """
+        paths = np.asarray(target_paths, dtype=np.int32)
+        if paths.ndim == 1:
+            paths = paths[:, None]
+        result = np.full(self.num_games, SHOT_GAME_OVER, dtype=np.int8)
+        playing = self._playing(active)
+
+        no_arrows = playing & (self.num_arrows <= 0)
+        result[no_arrows] = SHOT_NO_ARROWS
+        self.outcome[no_arrows] = OUT_OF_ARROWS
+        self.game_over |= no_arrows
+
+        firing = playing & ~no_arrows
+        self.num_arrows[firing] -= 1
+
+        empty = firing & (paths[:, 0] == 0)
+        result[empty] = SHOT_INVALID
+        flying = firing & ~empty
+        valid_shot = flying.copy()
+        current = self.player_location.copy()
+
+        # Only the first 5 caves count; anything beyond is out of range
+        for hop in range(min(paths.shape[1], 5)):
+            target = paths[:, hop]
+            flying &= target != 0
+            if not flying.any():
+                break
+            connected = flying & (target >= 1) & self._connected(current, target)
+            veered = flying & ~connected & (target != current)
+            result[veered] = SHOT_VEERED
+            valid_shot &= ~veered
+            flying &= ~veered
+
+            current[flying] = target[flying]
+            hit_wumpus = flying & (current == self.wumpus_location)
+            hit_self = flying & ~hit_wumpus & (current == self.player_location)
+            result[hit_wumpus] = SHOT_WUMPUS
+            self.outcome[hit_wumpus] = WON
+            result[hit_self] = SHOT_SELF
+            self.outcome[hit_self] = SHOT_YOURSELF
+            ended = hit_wumpus | hit_self
+            self.game_over |= ended
+            valid_shot &= ~ended
+            flying &= ~ended
+
+        result[valid_shot] = SHOT_MISSED
+        if self.generator is not None:
+            woke = valid_shot & (self.generator.random(self.num_games) < 0.2)
+            rows = np.flatnonzero(woke)
+            result[rows] = SHOT_WOKE
+            allowed = np.ones((len(rows), self.num_caves + 1), dtype=bool)
+            allowed[:, 0] = False
+            allowed[np.arange(len(rows)), self.player_location[rows]] = False
+            allowed[np.arange(len(rows)), self.wumpus_location[rows]] = False
+            self.wumpus_location[rows] = self._pick(allowed)
+        else:
+            for i in np.flatnonzero(valid_shot):
+                rng = self._rngs[i]
+                if rng.random() < 0.2:
+                    result[i] = SHOT_WOKE
+                    player = int(self.player_location[i])
+                    original_wumpus_location = int(self.wumpus_location[i])
+                    if self.num_caves > 2:
+                        self.wumpus_location[i] = random_cave_except(
+                            rng, self.num_caves, player, original_wumpus_location
+                        )
+                    else:
+                        self.wumpus_location[i] = random_cave_except(rng, self.num_caves, player)
+
+        empty_quiver = valid_shot & (self.num_arrows == 0)
+        self.outcome[empty_quiver] = OUT_OF_ARROWS
+        self.game_over |= empty_quiver
+        return result
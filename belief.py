@@ -0,0 +1,494 @@
+import math
+
+from bitboard import CaveBitboard
+from perception import MESSAGES, WUMPUS, BATS
+
+KINDS = ("wumpus", "pit", "bats")
+
+
+def _bits(mask):
+    """Yields the indices of the set bits of `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class HazardBelief:
+    """
+    Belief over where `count` hazards of one kind are hidden.
+    Caves are tracked as bitmasks (known / still possible) plus a set of
+    "exactly k of these caves" constraints coming from perceptions.
+    Observations only touch masks; marginals are solved lazily on the
+    small frontier of constrained caves, while every unconstrained cave
+    shares one probability.
+    """
+    def __init__(self, adjacency, num_caves, count):
+        self.adjacency = adjacency
+        self.all_caves = ((1 << (num_caves + 1)) - 1) & ~1
+        self.count = count
+        self.reset()
+
+    def reset(self, exclude=0):
+        """Forgets everything, e.g. after the Wumpus moved."""
+        self.known = 0
+        self.candidates = self.all_caves & ~exclude
+        self.constraints = {}
+        self._solution = None
+
+    def exclude(self, cave):
+        """Records that `cave` does not hold this hazard."""
+        bit = 1 << cave
+        if self.candidates & bit:
+            self.candidates &= ~bit
+            self._solution = None
+
+    def confirm(self, cave):
+        """Records that `cave` holds this hazard."""
+        bit = 1 << cave
+        if not self.known & bit:
+            self.known |= bit
+            self.candidates &= ~bit
+            self._solution = None
+
+    def observe_count(self, cave, count):
+        """Records that exactly `count` neighbors of `cave` hold this hazard."""
+        if self.constraints.get(cave) != count:
+            self.constraints[cave] = count
+            self._solution = None
+
+    def _propagate(self):
+        """
+        Applies the constraints that force every cave they mention, then
+        returns the remaining (mask, needed) pairs.
+        """
+        changed = True
+        while changed:
+            changed = False
+            pending = []
+            for cave, count in list(self.constraints.items()):
+                neighbors = self.adjacency[cave]
+                open_caves = neighbors & self.candidates
+                needed = count - (neighbors & self.known).bit_count()
+                if needed < 0 or needed > open_caves.bit_count():
+                    # Contradicts what we know (the hazard moved); drop it
+                    del self.constraints[cave]
+                elif needed == 0:
+                    self.candidates &= ~open_caves
+                    del self.constraints[cave]
+                    changed = changed or bool(open_caves)
+                elif needed == open_caves.bit_count():
+                    self.known |= open_caves
+                    self.candidates &= ~open_caves
+                    del self.constraints[cave]
+                    changed = True
+                else:
+                    pending.append((open_caves, needed))
+        return pending
+
+    def _solve(self):
+        """Computes marginals for the frontier and the shared probability elsewhere."""
+        pending = self._propagate()
+        remaining = self.count - self.known.bit_count()
+        frontier = 0
+        for open_caves, _ in pending:
+            frontier |= open_caves
+        rest = self.candidates & ~frontier
+        rest_size = rest.bit_count()
+        if remaining <= 0:
+            return {}, 0.0
+
+        caves = list(_bits(frontier))
+        index = {cave: i for i, cave in enumerate(caves)}
+        # For each constraint: positions of its caves and how many hazards it still needs
+        members = [[index[c] for c in _bits(mask)] for mask, _ in pending]
+        needed = [n for _, n in pending]
+        watching = [[] for _ in caves]
+        for j, positions in enumerate(members):
+            for i in positions:
+                watching[i].append(j)
+        left = [len(positions) for positions in members]
+
+        totals = {}
+        hits = [dict() for _ in caves]
+        chosen = []
+
+        def search(i, used):
+            if used > remaining:
+                return
+            if i == len(caves):
+                if all(n == 0 for n in needed):
+                    totals[used] = totals.get(used, 0) + 1
+                    for c in chosen:
+                        hits[c][used] = hits[c].get(used, 0) + 1
+                return
+            for take in (1, 0):
+                ok = True
+                for j in watching[i]:
+                    left[j] -= 1
+                    needed[j] -= take
+                    if needed[j] < 0 or needed[j] > left[j]:
+                        ok = False
+                if ok:
+                    if take:
+                        chosen.append(i)
+                    search(i + 1, used + take)
+                    if take:
+                        chosen.pop()
+                for j in watching[i]:
+                    left[j] += 1
+                    needed[j] += take
+
+        search(0, 0)
+
+        # Ways to place the hazards not used on the frontier among the other caves
+        weights = {}
+        for used in totals:
+            spare = remaining - used
+            if spare <= rest_size:
+                weights[used] = _log_comb(rest_size, spare)
+        if not weights:
+            # Nothing fits: fall back to a uniform belief over the candidates
+            self.constraints.clear()
+            size = self.candidates.bit_count()
+            return {}, remaining / size if size else 0.0
+        top = max(weights.values())
+        weights = {used: math.exp(w - top) for used, w in weights.items()}
+        total = sum(totals[used] * w for used, w in weights.items())
+
+        marginals = {}
+        for i, cave in enumerate(caves):
+            mass = sum(count * weights.get(used, 0.0) for used, count in hits[i].items())
+            marginals[cave] = mass / total
+        rest_probability = 0.0
+        if rest_size:
+            spread = sum(totals[used] * w * (remaining - used) for used, w in weights.items())
+            rest_probability = spread / total / rest_size
+        return marginals, rest_probability
+
+    def probability(self, cave):
+        """Returns the probability that `cave` holds this hazard."""
+        bit = 1 << cave
+        if self.known & bit:
+            return 1.0
+        if not self.candidates & bit:
+            return 0.0
+        if self._solution is None:
+            self._solution = self._solve()
+        marginals, rest_probability = self._solution
+        if self.known & bit:
+            return 1.0
+        if not self.candidates & bit:
+            return 0.0
+        return marginals.get(cave, rest_probability)
+
+    def _consistent(self, mask):
+        """Returns True if placing the hazards on `mask` matches every open constraint."""
+        adjacency = self.adjacency
+        for cave, count in self.constraints.items():
+            if (adjacency[cave] & mask).bit_count() != count:
+                return False
+        return True
+
+    def sample(self, rng, taken=0, attempts=20):
+        """
+        Draws a placement of the hazards as a bitmask, skipping the caves in
+        `taken`. Caves are drawn in proportion to their marginals and draws
+        that break an observed count are retried; after `attempts` failed
+        draws the last one is returned anyway.
+        """
+        if self._solution is None:
+            self._solution = self._solve()
+        marginals, rest_probability = self._solution
+        known = self.known & ~taken
+        remaining = self.count - known.bit_count()
+        caves = list(_bits(self.candidates & ~taken))
+        weights = [marginals.get(cave, rest_probability) for cave in caves]
+        if not any(weights):
+            weights = [1.0] * len(caves)
+        mask = known
+        for _ in range(attempts):
+            mask = known
+            pool, pool_weights = list(caves), list(weights)
+            for _ in range(min(remaining, len(pool))):
+                if not any(pool_weights):
+                    i = rng.randrange(len(pool))
+                else:
+                    i = rng.choices(range(len(pool)), pool_weights)[0]
+                mask |= 1 << pool.pop(i)
+                pool_weights.pop(i)
+            if self._consistent(mask):
+                break
+        return mask
+
+
+def _log_comb(n, k):
+    """Returns log(C(n, k)) without building huge integers."""
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+class BeliefState:
+    """
+    Probability distribution over Wumpus, pit and bat placements, built
+    only from what the player can observe: perceptions, surviving a cave,
+    bat snatches, radar scans and missed arrows.
+    """
+    def __init__(self, topology, num_wumpus=1, num_pits=2, num_bats=2):
+        self.topology = topology
+        adjacency = CaveBitboard.for_topology(topology).adjacency
+        self.beliefs = (
+            HazardBelief(adjacency, topology.num_caves, num_wumpus),
+            HazardBelief(adjacency, topology.num_caves, num_pits),
+            HazardBelief(adjacency, topology.num_caves, num_bats),
+        )
+        self.visited = set()
+        self._plan = []
+        self._plan_cave = None
+
+    @classmethod
+    def for_game(cls, game):
+        """Creates a belief for a freshly started game and records the start cave."""
+        belief = cls(game.topology, len(game.wumpus_locations), len(game.pit_locations), len(game.bat_locations))
+        belief.observe_safe(game.player_location)
+        belief.observe_perceptions(game.player_location, game._get_perceptions())
+        return belief
+
+    def observe_safe(self, cave):
+        """Records that `cave` holds no hazard."""
+        self.visited.add(cave)
+        for belief in self.beliefs:
+            belief.exclude(cave)
+
+    def observe_hazard(self, cave, kind):
+        """Records that `cave` holds a hazard of the given kind ("wumpus", "pit" or "bats")."""
+        found = KINDS.index(kind)
+        for i, belief in enumerate(self.beliefs):
+            if i == found:
+                belief.confirm(cave)
+            else:
+                belief.exclude(cave)
+
+    def observe_perceptions(self, cave, perceptions):
+        """Records the perception messages heard in `cave`."""
+        for kind, belief in enumerate(self.beliefs):
+            belief.observe_count(cave, perceptions.count(MESSAGES[kind]))
+
+    def observe_radar(self, cave, hazard):
+        """Records a radar scan; `hazard` is what _hazard_at returned for the cave."""
+        if hazard is None:
+            for belief in self.beliefs:
+                belief.exclude(cave)
+        else:
+            self.observe_hazard(cave, hazard)
+
+    def observe_miss(self, path):
+        """Records that an arrow flew along `path` without hitting the Wumpus."""
+        for cave in path:
+            self.beliefs[WUMPUS].exclude(cave)
+
+    def wumpus_moved(self, player_cave):
+        """The Wumpus woke up and may now be anywhere except the player's cave."""
+        self.beliefs[WUMPUS].reset(exclude=1 << player_cave)
+
+    def wumpus_killed(self, player_cave):
+        """One of several Wumpuses was shot; the others keep their caves but we lose track of which."""
+        self.beliefs[WUMPUS].count -= 1
+        self.wumpus_moved(player_cave)
+
+    def observe_move(self, destination, game):
+        """
+        Updates the belief after game.move_player(destination, ...) using only
+        what the player sees: where they ended up, the message and perceptions.
+        """
+        if game.game_over:
+            return
+        if "Giant bats snatch you" in game.message:
+            self.observe_hazard(destination, "bats")
+            if game.player_location != destination:
+                # Bats only drop the player in a cave without hazards
+                self.observe_safe(game.player_location)
+        elif "wooden planks" in game.message:
+            self.observe_hazard(destination, "pit")
+        elif game.player_location == destination:
+            self.observe_safe(destination)
+        self.observe_perceptions(game.player_location, game._get_perceptions())
+
+    def observe_shot(self, path, game):
+        """Updates the belief after game.shoot_arrow(path)."""
+        if game.game_over:
+            return
+        if "You shot a Wumpus" in game.message:
+            self.wumpus_killed(game.player_location)
+        elif "Your shot woke" in game.message:
+            self.wumpus_moved(game.player_location)
+        elif "Arrow missed" in game.message:
+            self.observe_miss(path[:5])
+        self.observe_perceptions(game.player_location, game._get_perceptions())
+
+    def sample_layout(self, rng, player_cave):
+        """
+        Draws one hazard layout that fits the observations, as
+        (wumpus caves, pit caves, bat caves). The player's cave stays empty.
+        """
+        taken = 1 << player_cave
+        layout = []
+        for belief in self.beliefs:
+            mask = belief.sample(rng, taken)
+            if mask.bit_count() < belief.count:
+                # Observations ruled out every cave (e.g. a stale smell): fill up at random
+                free = [c for c in range(1, self.topology.num_caves + 1) if not (taken | mask) & (1 << c)]
+                for cave in rng.sample(free, min(belief.count - mask.bit_count(), len(free))):
+                    mask |= 1 << cave
+            taken |= mask
+            layout.append(list(_bits(mask)))
+        wumpuses, pits, bats = layout
+        return wumpuses, pits, bats
+
+    def probabilities(self, cave):
+        """Returns the (wumpus, pit, bats) probabilities for `cave`."""
+        return tuple(belief.probability(cave) for belief in self.beliefs)
+
+    def danger(self, cave, has_planks=False):
+        """Returns the probability that walking into `cave` ends the game."""
+        wumpus, pit, _ = self.probabilities(cave)
+        if has_planks:
+            pit = 0.0
+        return 1.0 - (1.0 - wumpus) * (1.0 - pit)
+
+    def _frontier(self, player_cave):
+        """
+        Walks the visited caves reachable from the player. Returns
+        {unvisited cave next to them: visited cave it is entered from} and
+        the BFS parent of every visited cave reached.
+        """
+        parent = {player_cave: None}
+        queue = [player_cave]
+        frontier = {}
+        for cave in queue:
+            for neighbor in self.topology.neighbors(cave):
+                if neighbor in parent or neighbor in frontier:
+                    continue
+                if neighbor in self.visited:
+                    parent[neighbor] = cave
+                    queue.append(neighbor)
+                else:
+                    frontier[neighbor] = cave
+        return frontier, parent
+
+    def _plan_route(self, parent, approach, last_action):
+        """Queues the moves from the player to `approach` followed by `last_action`."""
+        route = []
+        cave = approach
+        while parent[cave] is not None:
+            route.append(("move", cave))
+            cave = parent[cave]
+        route.reverse()
+        route.append(last_action)
+        self._plan = route
+        return self._next_planned()
+
+    def _next_planned(self):
+        """Pops the next planned action and remembers where it leaves the player."""
+        action = self._plan.pop(0)
+        self._plan_cave = action[1] if action[0] == "move" else None
+        return action
+
+    def advise(self, player_cave, num_arrows, has_planks=False, shoot_threshold=0.5):
+        """
+        Recommends the next action as ("shoot", [cave]) or ("move", cave).
+        Heads for the safest unexplored cave through caves already known to
+        be safe, and hunts through explored caves once none is left. Shoots the likeliest Wumpus cave at the edge of the explored
+        area (walking next to it first) once it is likely enough, or when
+        every way forward is risky or leads into known bats.
+        """
+        # Walking back through explored caves teaches nothing new, so a
+        # route planned earlier stays valid while the player follows it
+        if self._plan and self._plan_cave == player_cave:
+            return self._next_planned()
+        self._plan = []
+
+        wumpus = self.beliefs[WUMPUS]
+        bats = self.beliefs[BATS]
+        # Cheap local check first: it settles most moves without a search
+        neighbors = self.topology.neighbors(player_cave)
+        if num_arrows > 0 and neighbors:
+            target = max(neighbors, key=wumpus.probability)
+            if wumpus.probability(target) >= shoot_threshold:
+                return "shoot", [target]
+        for cave in neighbors:
+            if (cave not in self.visited and self.danger(cave, has_planks) <= 1e-9
+                    and bats.probability(cave) <= 1e-9):
+                return "move", cave
+
+        frontier, parent = self._frontier(player_cave)
+        if not frontier:
+            return self._advise_explored(player_cave, num_arrows, has_planks, parent)
+        explore = min(
+            frontier,
+            key=lambda cave: (
+                bats.probability(cave) == 1.0,
+                round(self.danger(cave, has_planks), 9),
+                bats.probability(cave),
+                frontier[cave] != player_cave,
+            ),
+        )
+        stuck = bats.probability(explore) == 1.0 or self.danger(explore, has_planks) > 1e-9
+
+        if num_arrows > 0:
+            target = max(frontier, key=wumpus.probability)
+            chance = wumpus.probability(target)
+            if chance >= shoot_threshold or (stuck and chance > 0):
+                return self._plan_route(parent, frontier[target], ("shoot", [target]))
+        return self._plan_route(parent, frontier[explore], ("move", explore))
+
+    def _advise_explored(self, player_cave, num_arrows, has_planks, parent):
+        """
+        Advice once every reachable cave has been visited, so the Wumpus
+        must have moved into explored ground: shoots its likeliest cave
+        (walking next to it first), or without arrows or any lead steps to
+        the safest neighbor. Returns None only for a cave without tunnels.
+        """
+        wumpus = self.beliefs[WUMPUS]
+        if num_arrows > 0:
+            target = max((cave for cave in parent if cave != player_cave), key=wumpus.probability, default=None)
+            if target is not None and wumpus.probability(target) > 0:
+                return self._plan_route(parent, parent[target], ("shoot", [target]))
+        neighbors = self.topology.neighbors(player_cave)
+        if not neighbors:
+            return None
+        return "move", min(neighbors, key=lambda cave: self.danger(cave, has_planks))
+
+    def hint(self, player_cave, num_arrows, has_planks=False):
+        """Returns the advice as a sentence for the GUI."""
+        advice = self.advise(player_cave, num_arrows, has_planks)
+        if advice is None:
+            return "Hint: there is nowhere to go."
+        action, target = advice
+        if action == "shoot":
+            chance = self.beliefs[WUMPUS].probability(target[0])
+            return f"Hint: shoot into cave {target[0]} ({chance:.0%} Wumpus)."
+        return f"Hint: move to cave {target} ({self.danger(target, has_planks):.0%} danger)."
+
+
+class BeliefAgent:
+    """Tournament agent that plays by following BeliefState.advise()."""
+    def __init__(self, shoot_threshold=0.5):
+        self.shoot_threshold = shoot_threshold
+        self.belief = None
+        self._last_action = None
+
+    def new_game(self, game):
+        self.belief = BeliefState.for_game(game)
+        self._last_action = None
+
+    def __call__(self, game):
+        if self._last_action is not None:
+            action, target = self._last_action
+            if action == "move":
+                self.belief.observe_move(target, game)
+            else:
+                self.belief.observe_shot(target, game)
+        self._last_action = self.belief.advise(
+            game.player_location, game.num_arrows, shoot_threshold=self.shoot_threshold
+        )
+        return self._last_action
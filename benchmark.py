@@ -0,0 +1,280 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import timeit
+
+from topology import grid
+from tournament import play_game, random_agent
+from wumpus import HuntTheWumpus
+
+# Grid shapes used for each map size
+SHAPES = {20: (4, 5), 1000: (25, 40), 10000: (100, 100), 100000: (250, 400), 1000000: (1000, 1000)}
+DEFAULT_SIZES = (20, 1000, 10000, 100000, 1000000)
+# Maps above gui.BUTTON_MAP_LIMIT use the canvas view; beyond this the GUI's belief state takes seconds to build
+GUI_MAX_CAVES = 100000
+# Fail when a benchmark gets this much slower than its baseline
+DEFAULT_THRESHOLD = 0.25
+# ... and slower by more than this many seconds per call: sub-microsecond calls swing by more than 25% between runs
+NOISE_FLOOR = 0.25e-6
+# Whole-suite runs whose fastest time per benchmark is compared against the baseline
+DEFAULT_RUNS = 3
+# Times the sizes with a regression are measured again before it counts, after a pause that
+# lets a slow spell of the machine pass (it can last several seconds)
+DEFAULT_RETRIES = 3
+RETRY_PAUSE = 2.0
+# Timed batches per benchmark and the least time each one runs
+DEFAULT_REPEAT = 25
+BATCH_TIME = 0.01
+
+
+def _batch_size(timer, min_time):
+    """Returns how many calls make a batch that runs for at least `min_time` seconds."""
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            return number
+        number = max(number * 2, int(number * min_time / elapsed * 1.1)) if elapsed > 0 else number * 10
+
+
+def measure_all(benchmarks, repeat=DEFAULT_REPEAT, min_time=BATCH_TIME):
+    """
+    Times every function of {name: function} and returns {name: best
+    seconds per call}. Like timeit, it times batches of calls that run for
+    at least `min_time` seconds and keeps the fastest of `repeat` batches.
+    The batches are taken round-robin, so each benchmark's samples spread
+    over the whole suite: a slow spell of a busy machine, which can last a
+    second, then spoils a few samples of every benchmark rather than all
+    samples of one.
+    """
+    timers = {}
+    for name, func in benchmarks.items():
+        timer = timeit.Timer(func)
+        timers[name] = (timer, _batch_size(timer, min_time))
+    best = {}
+    for _ in range(repeat):
+        for name, (timer, number) in timers.items():
+            seconds = timer.timeit(number) / number
+            best[name] = min(seconds, best.get(name, seconds))
+    return best
+
+
+def measure(func, repeat=DEFAULT_REPEAT, min_time=BATCH_TIME):
+    """Returns the best time per call of `func` in seconds, as measure_all() does."""
+    return measure_all({"func": func}, repeat, min_time)["func"]
+
+
+def _quiet_game(topology):
+    """
+    Returns a game whose player stands next to a hazard-free cave, plus
+    that cave, so moves back and forth never end the game.
+    """
+    for seed in range(1000):
+        game = HuntTheWumpus(topology=topology, seed=seed)
+        for neighbor in game._get_neighbors(game.player_location):
+            if game._hazard_at(neighbor) is None:
+                return game, neighbor
+    raise RuntimeError("No game with a safe neighbor found.")
+
+
+def engine_benchmarks(size):
+    """Sets up the engine hot paths on a grid of `size` caves. Returns {name: function to time}."""
+    topology = grid(*SHAPES[size]) if size in SHAPES else grid(1, size)
+    benchmarks = {}
+    seeds = iter(range(10 ** 9))
+    benchmarks["construct"] = lambda: HuntTheWumpus(topology=topology, seed=next(seeds))
+
+    # Every benchmark gets its own game, so timing them in turns does not change their work
+    game, neighbor = _quiet_game(topology)
+    places = [neighbor, game.player_location]
+
+    def move():
+        game.move_player(places[0], False, False)
+        places.reverse()
+    benchmarks["move_player"] = move
+    # The batched entry point, 1000 moves per call
+    batch_game, neighbor = _quiet_game(topology)
+    actions = [("move", neighbor), ("move", batch_game.player_location)] * 500
+    benchmarks["play_1000_moves"] = lambda: batch_game.play(actions)
+
+    shot_game, neighbor = _quiet_game(topology)
+    snapshot = shot_game.snapshot()
+    target = [neighbor]
+
+    def shoot():
+        shot_game.num_arrows = 5
+        shot_game.shoot_arrow(target)
+        if shot_game.game_over:
+            shot_game.restore(snapshot)
+    benchmarks["shoot_arrow"] = shoot
+    sense_game, _ = _quiet_game(topology)
+    benchmarks["get_perceptions"] = sense_game._get_perceptions
+    benchmarks["check_hazards"] = lambda: sense_game._check_hazards(False, False)
+
+    random_game = HuntTheWumpus(topology=topology, seed=0)
+
+    def one_game():
+        random_game.reset()
+        play_game(random_game, random_agent, max_moves=1000)
+    benchmarks["random_game"] = one_game
+    return benchmarks
+
+
+def gui_benchmarks(size, repeat=DEFAULT_REPEAT, min_time=BATCH_TIME):
+    """Times WumpusGUI.update_display when nothing changed and after a move. Returns {name: seconds per call}."""
+    from gui import WumpusGUI
+
+    topology = grid(*SHAPES[size]) if size in SHAPES else grid(1, size)
+    app = WumpusGUI(topology=topology)
+    try:
+        app.withdraw()
+        game, neighbor = _quiet_game(topology)
+        app.game = game
+        places = [neighbor, game.player_location]
+
+        def move_and_draw():
+            game.move_player(places[0], False, False)
+            places.reverse()
+            app.update_display()
+        # Each move is drawn right away, so the idle calls timed in between still find nothing changed
+        return measure_all({"update_display_idle": app.update_display, "update_display_move": move_and_draw},
+                           repeat, min_time)
+    finally:
+        app.destroy()
+
+
+class _VirtualDisplay:
+    """Starts Xvfb for the GUI benchmarks when there is no display and Xvfb is installed."""
+    def __init__(self, display=":99"):
+        self.display = display
+        self.process = None
+
+    def __enter__(self):
+        if os.environ.get("DISPLAY") or shutil.which("Xvfb") is None:
+            return bool(os.environ.get("DISPLAY"))
+        self.process = subprocess.Popen(["Xvfb", self.display, "-screen", "0", "1280x1024x24"],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        time.sleep(0.5)
+        os.environ["DISPLAY"] = self.display
+        return True
+
+    def __exit__(self, *exc):
+        if self.process is not None:
+            del os.environ["DISPLAY"]
+            self.process.terminate()
+            self.process.wait()
+
+
+def run(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, gui=True, log=print, runs=1, min_time=BATCH_TIME):
+    """
+    Runs every benchmark and returns {"name[size]": seconds per call}.
+    With several `runs` the suite is repeated and each benchmark keeps its
+    fastest time, so a slow spell of the machine during one run does not
+    count as a regression.
+    """
+    results = {}
+
+    def keep(name, size, seconds, run_number):
+        key = f"{name}[{size}]"
+        results[key] = min(seconds, results.get(key, seconds))
+        log(f"{key}: {seconds * 1e6:.2f} us" + (f" (run {run_number + 1}/{runs})" if runs > 1 else ""))
+
+    with _VirtualDisplay() if gui else contextlib.nullcontext(False) as has_display:
+        if gui and not has_display:
+            log("update_display: skipped, no display and no Xvfb")
+        for run_number in range(runs):
+            for size in sizes:
+                for name, seconds in measure_all(engine_benchmarks(size), repeat, min_time).items():
+                    keep(name, size, seconds, run_number)
+            if has_display:
+                for size in sizes:
+                    if size > GUI_MAX_CAVES:
+                        continue
+                    for name, seconds in gui_benchmarks(size, repeat, min_time).items():
+                        keep(name, size, seconds, run_number)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, noise_floor=NOISE_FLOOR):
+    """
+    Returns the regressions as (name, baseline seconds, seconds) for every
+    benchmark more than `threshold` slower than its baseline and slower by
+    more than `noise_floor` seconds per call.
+    """
+    regressions = []
+    for name, seconds in results.items():
+        before = baseline.get(name)
+        if before is not None and seconds > before * (1 + threshold) and seconds - before > noise_floor:
+            regressions.append((name, before, seconds))
+    return regressions
+
+
+def check(baseline, sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, gui=True, log=print, runs=DEFAULT_RUNS,
+          min_time=BATCH_TIME, threshold=DEFAULT_THRESHOLD, noise_floor=NOISE_FLOOR, retries=DEFAULT_RETRIES):
+    """
+    Runs the benchmarks and compares them with `baseline`. The sizes with a
+    regression are measured again after a pause, up to `retries` times,
+    each benchmark keeping its fastest time, so only slowdowns that persist
+    beyond a slow spell of the machine are reported. Returns (results,
+    regressions).
+    """
+    results = run(sizes, repeat, gui, log, runs, min_time)
+    regressions = compare(results, baseline, threshold, noise_floor)
+    for _ in range(retries):
+        if not regressions:
+            break
+        log(f"Measuring {len(regressions)} slower benchmarks again")
+        time.sleep(RETRY_PAUSE)
+        flagged = sorted({int(name.rsplit("[", 1)[1][:-1]) for name, _, _ in regressions})
+        flagged_gui = gui and any(name.startswith("update_display") for name, _, _ in regressions)
+        for name, seconds in run(flagged, repeat, flagged_gui, log, 1, min_time).items():
+            results[name] = min(seconds, results.get(name, seconds))
+        regressions = compare(results, baseline, threshold, noise_floor)
+    return results, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the engine hot paths and catch regressions.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="map sizes in caves")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="timed batches per benchmark (the fastest counts)")
+    parser.add_argument("--no-gui", action="store_true", help="skip the update_display benchmarks")
+    parser.add_argument("--save", default=None, help="write the results to this JSON baseline")
+    parser.add_argument("--compare", default=None, help="fail if slower than this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before failing, e.g. 0.25 for 25%%")
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR * 1e6,
+                        help="slowdowns of fewer microseconds per call never fail")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS,
+                        help="whole-suite runs; each benchmark keeps its fastest")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="with --compare, times a size with a regression is measured again")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        results, regressions = check(baseline, args.sizes, args.repeat, not args.no_gui, runs=args.runs,
+                                     threshold=args.threshold, noise_floor=args.noise_floor * 1e-6,
+                                     retries=args.retries)
+    else:
+        results = run(args.sizes, args.repeat, not args.no_gui, runs=args.runs)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before * 1e6:.2f} us -> {after * 1e6:.2f} us "
+                  f"({after / before - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} and {args.noise_floor:g} us.")
+
+
+if __name__ == '__main__':
+    main()
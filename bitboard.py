@@ -0,0 +1,69 @@
+class CaveBitboard:
+    """
+    Compact state backend that stores a cave map and its hazards as integer bitmasks.
+    Bit i stands for cave i, so a hazard or tunnel check is a single AND.
+    Python ints grow as needed, so the same code handles the 20-cave grid
+    and much larger maps.
+    """
+    def __init__(self, cave_map, adjacency=None):
+        self.num_caves = len(cave_map)
+        if adjacency is None:
+            adjacency = self.adjacency_masks(cave_map)
+        self.adjacency = adjacency
+        self.wumpus = 0
+        self.pits = 0
+        self.bats = 0
+
+    @classmethod
+    def for_topology(cls, topology):
+        """Builds a backend whose adjacency masks are cached on the topology."""
+        adjacency = topology.derived("bitboard_adjacency", lambda: cls.adjacency_masks(topology.cave_map))
+        return cls(topology.cave_map, adjacency)
+
+    @staticmethod
+    def adjacency_masks(cave_map):
+        """Returns a list with the neighbor mask of every cave, index 0 unused."""
+        adjacency = [0] * (len(cave_map) + 1)
+        for cave, neighbors in cave_map.items():
+            mask = 0
+            for neighbor in neighbors:
+                mask |= 1 << neighbor
+            adjacency[cave] = mask
+        return adjacency
+
+    @staticmethod
+    def mask_of(caves):
+        """Returns the bitmask with a bit set for every cave in `caves`."""
+        mask = 0
+        for cave in caves:
+            mask |= 1 << cave
+        return mask
+
+    def place(self, wumpus_locations, pit_locations, bat_locations):
+        """Replaces all hazard masks."""
+        self.wumpus = self.mask_of(wumpus_locations)
+        self.pits = self.mask_of(pit_locations)
+        self.bats = self.mask_of(bat_locations)
+
+    def place_wumpuses(self, wumpus_locations):
+        """Replaces the Wumpus mask after several Wumpuses moved or one was shot."""
+        self.wumpus = self.mask_of(wumpus_locations)
+
+    def is_neighbor(self, cave, other):
+        """Returns True if `other` is connected to `cave`."""
+        if not 0 < cave <= self.num_caves or other < 0:
+            return False
+        return bool(self.adjacency[cave] >> other & 1)
+
+    def hazard_at(self, cave):
+        """Returns "wumpus", "pit", "bats" or None for the given cave."""
+        if not 0 < cave <= self.num_caves:
+            return None
+        bit = 1 << cave
+        if self.wumpus & bit:
+            return "wumpus"
+        if self.pits & bit:
+            return "pit"
+        if self.bats & bit:
+            return "bats"
+        return None
@@ -0,0 +1,33 @@
+# Result codes shared by HuntTheWumpus.play and BatchWumpus
+
+# Results of a move (and of the hazard check after any change of cave)
+MOVE_SAFE = 0          # moved, nothing happened (move_player returns False)
+MOVE_INVALID = 1       # not a connected cave (move_player returns False)
+MOVE_WUMPUS = 2        # eaten by the Wumpus (move_player returns True)
+MOVE_PIT = 3           # fell into a pit (move_player returns True)
+MOVE_PLANKS = 4        # fell into a pit but escaped (move_player returns "planks")
+MOVE_BAT_TAXI = 5      # bats picked the player up for the taxi (move_player returns "bat_taxi")
+MOVE_BATS = 6          # bats dropped the player in a random cave (move_player returns False)
+MOVE_GAME_OVER = 7     # game already over (move_player returns None)
+
+# What move_player returns for each MOVE_* code
+MOVE_RESULTS = (False, False, True, True, "planks", "bat_taxi", False, None)
+
+# Results of a shot
+SHOT_MISSED = 0
+SHOT_WUMPUS = 1        # shot the last Wumpus and won
+SHOT_SELF = 2
+SHOT_WOKE = 3          # missed and at least one Wumpus moved
+SHOT_VEERED = 4        # path was not connected
+SHOT_INVALID = 5       # empty path
+SHOT_NO_ARROWS = 6     # no arrows left when trying to shoot
+SHOT_GAME_OVER = 7
+SHOT_KILLED = 8        # shot one of several Wumpuses, the game goes on
+
+# Final outcome of each game in BatchWumpus
+ONGOING = 0
+WON = 1
+KILLED_BY_WUMPUS = 2
+FELL_IN_PIT = 3
+SHOT_YOURSELF = 4
+OUT_OF_ARROWS = 5
@@ -0,0 +1,206 @@
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+from batch import BatchWumpus, MOVE_BAT_TAXI, MOVE_PLANKS, WON
+from topology import get_topology
+
+# One point of the sweep: store prices and the reward max(base - moves * per_move, floor)
+POINT_FIELDS = ("radar_price", "planks_price", "bat_taxi_price", "reward_base", "reward_per_move", "reward_floor")
+# The values hard-coded in the GUI's buy_ability and award_currency
+DEFAULT_POINT = (50, 75, 60, 100, 2, 10)
+# Uses bought with one radar purchase
+RADAR_USES = 2
+
+
+def simulate_careers(point, num_careers=100000, games_per_career=20, seed=0, topology=None, max_moves=200):
+    """
+    Plays `num_careers` careers of `games_per_career` games each, all at once.
+    Currency and unused tools carry over between the games of a career.
+    Before every game the player buys planks, radar and a bat taxi (in that
+    order) when they have none left and can afford them. In a game they
+    play like the tournament's random agent: shoot a random neighbor when
+    the Wumpus is smelled, else move to a random neighbor. When danger is
+    sensed they radar the cave first and pick again if it holds a hazard.
+    Returns a dict of per-game averages and rates.
+    """
+    radar_price, planks_price, bat_taxi_price, reward_base, reward_per_move, reward_floor = point
+    generator = np.random.default_rng(seed)
+    sim = BatchWumpus(num_careers, topology=topology, generator=generator)
+    neighbors = sim.neighbors
+    degree = (neighbors > 0).sum(axis=1)
+    careers = np.arange(num_careers)
+
+    currency = np.zeros(num_careers, dtype=np.int64)
+    radar = np.zeros(num_careers, dtype=np.int32)
+    planks = np.zeros(num_careers, dtype=np.int32)
+    bat_taxi = np.zeros(num_careers, dtype=np.int32)
+    games_done = np.zeros(num_careers, dtype=np.int32)
+    totals = dict.fromkeys(("wins", "timeouts", "moves", "earned", "spent", "radar_bought",
+                            "planks_bought", "bat_taxi_bought", "radar_used", "planks_used",
+                            "bat_taxi_used"), 0)
+
+    def random_neighbor(caves):
+        picks = (generator.random(num_careers) * degree[caves]).astype(np.int32)
+        return neighbors[caves, picks]
+
+    def buy(shopping):
+        for name, uses, price, amount in (("planks", planks, planks_price, 1),
+                                          ("radar", radar, radar_price, RADAR_USES),
+                                          ("bat_taxi", bat_taxi, bat_taxi_price, 1)):
+            buying = shopping & (uses == 0) & (currency >= price)
+            uses[buying] += amount
+            currency[buying] -= price
+            totals[name + "_bought"] += int(buying.sum())
+            totals["spent"] += int(buying.sum()) * price
+
+    active = ~sim.game_over
+    while active.any():
+        player = sim.player_location
+        smell, breeze, _ = sim.get_perceptions()
+        destination = random_neighbor(player)
+
+        shoot = active & smell & (sim.num_arrows > 0)
+        move = active & ~shoot
+        scan = move & (radar > 0) & (smell | breeze)
+        hazard = (destination == sim.wumpus_location) | sim.pit_mask[careers, destination]
+        destination = np.where(scan & hazard, random_neighbor(player), destination)
+        radar -= scan
+        totals["radar_used"] += int(scan.sum())
+
+        result = sim.move_player(destination, planks > 0, bat_taxi > 0, active=move)
+        used_planks = result == MOVE_PLANKS
+        taxi = result == MOVE_BAT_TAXI
+        bat_taxi -= taxi
+        if taxi.any():
+            # The taxi flies to a random cave, which is then checked like a move
+            sim.player_location[taxi] = generator.integers(1, sim.num_caves + 1, int(taxi.sum()))
+            used_planks |= sim._check_hazards(taxi, planks > 0, bat_taxi > 0) == MOVE_PLANKS
+        planks -= used_planks
+        totals["planks_used"] += int(used_planks.sum())
+        totals["bat_taxi_used"] += int(taxi.sum())
+        sim.shoot_arrow(destination[:, None], active=shoot)
+
+        timed_out = active & ~sim.game_over & (sim.moves >= max_moves)
+        sim.game_over |= timed_out
+        ended = active & sim.game_over
+        won = ended & (sim.outcome == WON)
+        reward = np.maximum(reward_base - sim.moves * reward_per_move, reward_floor)
+        currency[won] += reward[won]
+        totals["earned"] += int(reward[won].sum())
+        totals["wins"] += int(won.sum())
+        totals["timeouts"] += int(timed_out.sum())
+        totals["moves"] += int(sim.moves[ended].sum())
+        games_done += ended
+
+        again = ended & (games_done < games_per_career)
+        if again.any():
+            buy(again)
+            sim.reset(again)
+        active = ~sim.game_over
+
+    games = num_careers * games_per_career
+    result = {name: value for name, value in zip(POINT_FIELDS, point)}
+    result.update({
+        "careers": num_careers,
+        "games": games,
+        "win_rate": totals["wins"] / games,
+        "timeout_rate": totals["timeouts"] / games,
+        "moves_per_game": totals["moves"] / games,
+        "earned_per_game": totals["earned"] / games,
+        "spent_per_game": totals["spent"] / games,
+        "final_currency": float(currency.mean()),
+    })
+    for name in ("radar", "planks", "bat_taxi"):
+        result[name + "_bought_per_game"] = totals[name + "_bought"] / games
+        result[name + "_used_per_game"] = totals[name + "_used"] / games
+    return result
+
+
+class SimulationCache:
+    """
+    Results of evaluated grid points, keyed by the point and the simulation
+    settings. With a path the cache is loaded from and saved to a JSON file,
+    so repeated sweeps only simulate the new points.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.results = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.results = json.load(f)
+
+    @staticmethod
+    def key(point, settings):
+        return json.dumps([list(point), settings], sort_keys=True)
+
+    def get(self, point, settings):
+        return self.results.get(self.key(point, settings))
+
+    def put(self, point, settings, result):
+        self.results[self.key(point, settings)] = result
+
+    def save(self):
+        if self.path is not None:
+            with open(self.path, "w") as f:
+                json.dump(self.results, f)
+
+
+def sweep(grid, num_careers=100000, games_per_career=20, seed=0, topology=None, max_moves=200, cache=None):
+    """
+    Evaluates every combination of the value lists in `grid`, a dict with
+    the keys of POINT_FIELDS (missing keys keep the GUI's values). Every
+    point replays the same seed. Returns one result dict per point.
+    """
+    cache = cache if cache is not None else SimulationCache()
+    values = [grid.get(name, [default]) for name, default in zip(POINT_FIELDS, DEFAULT_POINT)]
+    topology_key = None if topology is None else [topology.name, list(topology.params)]
+    settings = {"careers": num_careers, "games": games_per_career, "seed": seed,
+                "topology": topology_key, "max_moves": max_moves}
+    results = []
+    for point in itertools.product(*values):
+        result = cache.get(point, settings)
+        if result is None:
+            result = simulate_careers(point, num_careers, games_per_career, seed, topology, max_moves)
+            cache.put(point, settings, result)
+        results.append(result)
+    cache.save()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep store prices and win rewards over simulated player careers.")
+    parser.add_argument("--careers", type=int, default=100000, help="careers simulated per grid point")
+    parser.add_argument("--games", type=int, default=20, help="games per career")
+    parser.add_argument("--seed", type=int, default=0, help="seed shared by all grid points")
+    parser.add_argument("--topology", default="grid", help="topology name, e.g. grid, torus, dodecahedron")
+    parser.add_argument("--size", type=int, nargs="*", default=[], help="topology parameters, e.g. 4 5")
+    parser.add_argument("--max-moves", type=int, default=200, help="moves before a game counts as a timeout")
+    parser.add_argument("--cache", default=None, help="JSON file that keeps evaluated points between runs")
+    for name, default in zip(POINT_FIELDS, DEFAULT_POINT):
+        parser.add_argument("--" + name.replace("_", "-"), type=int, nargs="+", default=[default],
+                            help=f"values to sweep (default {default})")
+    args = parser.parse_args()
+
+    grid = {name: getattr(args, name) for name in POINT_FIELDS}
+    topology = get_topology(args.topology, *args.size)
+    start = time.perf_counter()
+    results = sweep(grid, args.careers, args.games, args.seed, topology, args.max_moves,
+                    SimulationCache(args.cache))
+    elapsed = time.perf_counter() - start
+
+    print(f"{'radar':>6} {'planks':>6} {'taxi':>6} {'reward':>12} {'win rate':>9} "
+          f"{'earned/g':>9} {'spent/g':>8} {'final':>8}")
+    for r in results:
+        reward = f"{r['reward_base']}-{r['reward_per_move']}m/{r['reward_floor']}"
+        print(f"{r['radar_price']:>6} {r['planks_price']:>6} {r['bat_taxi_price']:>6} {reward:>12} "
+              f"{r['win_rate']:>9.2%} {r['earned_per_game']:>9.2f} {r['spent_per_game']:>8.2f} "
+              f"{r['final_currency']:>8.1f}")
+    print(f"{len(results)} points in {elapsed:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
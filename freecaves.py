@@ -0,0 +1,109 @@
+from array import array
+
+
+def random_cave_except(rng, num_caves, *excluded):
+    """Draws a uniform cave from 1..num_caves other than the `excluded` ones in O(len(excluded))."""
+    skips = sorted(set(excluded))
+    cave = rng.randrange(1, num_caves + 1 - len(skips))
+    for skip in skips:
+        if cave >= skip:
+            cave += 1
+    return cave
+
+
+class FreeCaveIndex:
+    """
+    The caves that hold no pit or bats, kept in a swap-remove array with a
+    position map: caves[:size] are the free caves and position[cave] is
+    where a cave sits. Removing a cave and drawing a uniform free cave are
+    O(1); reset() undoes the removals since the last reset in O(removals),
+    which restores the exact starting order.
+    """
+    def __init__(self, num_caves, template=None):
+        caves, position = template if template is not None else self.template(num_caves)
+        self.caves = array(caves.typecode, caves)
+        self.position = array(position.typecode, position)
+        self.size = num_caves
+        self._removed = []
+
+    @staticmethod
+    def template(num_caves):
+        """Returns the starting (caves, position) arrays; copying them beats rebuilding them."""
+        return array("l", range(1, num_caves + 1)), array("l", range(-1, num_caves))
+
+    @classmethod
+    def for_topology(cls, topology):
+        """Creates an index whose starting arrays are built once per topology."""
+        num_caves = topology.num_caves
+        return cls(num_caves, topology.derived("free_cave_template", lambda: cls.template(num_caves)))
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, cave):
+        return 0 < cave < len(self.position) and self.position[cave] < self.size
+
+    def _swap(self, i, j):
+        caves, position = self.caves, self.position
+        a, b = caves[i], caves[j]
+        caves[i], caves[j] = b, a
+        position[a], position[b] = j, i
+
+    def remove(self, cave):
+        """Marks a cave as holding a hazard."""
+        p = self.position[cave]
+        if p < self.size:
+            self.size -= 1
+            self._swap(p, self.size)
+            self._removed.append(p)
+
+    def pop_random(self, rng):
+        """Removes and returns a uniform free cave."""
+        cave = self.caves[rng.randrange(self.size)]
+        self.remove(cave)
+        return cave
+
+    def reset(self):
+        """Frees every removed cave again, undoing the swaps in reverse order."""
+        for p in reversed(self._removed):
+            self._swap(p, self.size)
+            self.size += 1
+        self._removed.clear()
+
+    def sample(self, rng, exclude=()):
+        """
+        Draws a uniform free cave other than those in `exclude` without
+        changing the index. Excluded caves are swap-removed only in a small
+        overlay. Returns None if no cave is left.
+        """
+        size = self.size
+        slots = {}
+        where = {}
+        for cave in exclude:
+            p = where.get(cave, self.position[cave])
+            if not 0 <= p < size:
+                continue
+            size -= 1
+            last = slots.get(size, self.caves[size])
+            slots[p] = last
+            where[last] = p
+            slots[size] = cave
+            where[cave] = size
+        if size <= 0:
+            return None
+        r = rng.randrange(size)
+        return slots.get(r, self.caves[r])
+
+    def sample_avoiding(self, rng, exclude, avoid, attempts=64):
+        """
+        Like sample(), but also skips the caves in the container `avoid`
+        (e.g. the Wumpus caves, which move and so are never removed).
+        Draws are rejected while they land in `avoid`, which stays O(1) on
+        average while the avoided caves are a small share of the free ones;
+        after `attempts` misses they are excluded outright instead.
+        """
+        for _ in range(attempts):
+            cave = self.sample(rng, exclude)
+            if cave is None or cave not in avoid:
+                return cave
+        return self.sample(rng, tuple(exclude) + tuple(avoid))
@@ -0,0 +1,532 @@
+import os
+import tkinter as tk
+from tkinter import messagebox
+import customtkinter as ctk
+from belief import BeliefState
+from instrument import NULL_INSTRUMENT, GUI_ACTIONS
+from mcts import MCTSAgent
+from profiles import Profile
+from render import WidgetRenderer, CanvasMapView, PLAYER_COLOR, NEIGHBOR_COLOR, CAVE_COLOR
+from solver import DEFAULT_TABLE, OptimalAdvisor, SolutionTable
+from topology import classic
+from wumpus import HuntTheWumpus
+
+# Larger maps are drawn on a canvas instead of one button per cave
+BUTTON_MAP_LIMIT = 400
+# Size of the canvas map view in pixels
+MAP_WIDTH = 560
+MAP_HEIGHT = 420
+
+class WumpusGUI(ctk.CTk):
+    """
+    The Graphical User Interface for the Hunt the Wumpus game.
+    Uses customtkinter for a modern, dark-themed design.
+    """
+    def __init__(self, topology=None, recorder=None, autoplay_budget=0.05, instrument=None, map_view=None,
+                 solution_table=DEFAULT_TABLE, profiles=None, player="player"):
+        super().__init__()
+        
+        # Configure the main window
+        self.title("Hunt the Wumpus")
+        self.geometry("600x800")
+        
+        self.topology = topology if topology is not None else classic()
+        self.recorder = recorder
+        self.buttons = []
+        # "buttons" draws one button per cave, "canvas" only the caves on screen
+        if map_view is None:
+            map_view = "buttons" if self.topology.num_caves <= BUTTON_MAP_LIMIT else "canvas"
+        if map_view not in ("buttons", "canvas"):
+            raise ValueError(f"Unknown map view {map_view!r}. Use 'buttons' or 'canvas'.")
+        self.map_view_kind = map_view
+        self.map_view = None
+        # Radar and bat taxi choices: every cave, or the caves on screen with the canvas view
+        self.cave_choices = [str(i) for i in range(1, self.topology.num_caves + 1)] if map_view == "buttons" else None
+        # Remembers what is on screen so update_display only touches what changed
+        self.renderer = WidgetRenderer()
+        self._highlighted = None
+        # Auto-play searches for at most this many seconds per action
+        self.auto_player = MCTSAgent(time_budget=autoplay_budget)
+        # Hints follow the table of optimal play when solver.py has written one
+        self.optimal = None
+        if solution_table is not None and os.path.exists(solution_table):
+            self.optimal = OptimalAdvisor(SolutionTable(solution_table))
+        self.moves = 0
+        self.currency = 0
+        self.radar_uses_left = 0
+        self.plank_uses_left = 0
+        self.bat_taxi_uses_left = 0
+        # With a ProfileStore, currency and abilities are the player's career state and outlive each game
+        self.profiles = profiles
+        self.profile = profiles.load(player) if profiles is not None else None
+        if self.profile is not None:
+            for field in Profile.GUI_FIELDS:
+                setattr(self, field, getattr(self.profile, field))
+        self._reward = 0
+        self._game_recorded = False
+
+        # Optional Instrument timing the actions and update_display of the GUI and its games
+        self.instrument = instrument if instrument is not None else NULL_INSTRUMENT
+        self.instrument.attach(self, "gui", GUI_ACTIONS)
+
+        self.create_widgets()
+        self.start_new_game()
+        
+    def create_widgets(self):
+        """Creates and places all the GUI widgets."""
+        # Main frame to center all content
+        self.main_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.main_frame.pack(pady=10, padx=10, fill="both", expand=True)
+
+        # Main game UI frame (initially visible)
+        self.main_game_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        self.main_game_frame.pack(fill="both", expand=True)
+
+        # Store UI frame (initially hidden)
+        self.store_frame = ctk.CTkFrame(self.main_frame)
+        self.create_store_widgets(self.store_frame)
+        
+        # Start game button
+        control_frame = ctk.CTkFrame(self.main_game_frame)
+        control_frame.pack(pady=(10, 10), anchor="center")
+        start_button = ctk.CTkButton(control_frame, text="Start New Game", command=self.start_new_game, corner_radius=8)
+        start_button.pack(side="left", padx=5)
+        hint_button = ctk.CTkButton(control_frame, text="Hint", command=self.show_hint, corner_radius=8)
+        hint_button.pack(side="left", padx=5)
+        autoplay_button = ctk.CTkButton(control_frame, text="Auto-play", command=self.autoplay, corner_radius=8)
+        autoplay_button.pack(side="left", padx=5)
+        
+        # Currency label
+        self.currency_label = ctk.CTkLabel(self.main_game_frame, text=f"Currency: {self.currency}", font=ctk.CTkFont(size=14, weight="bold"))
+        self.currency_label.pack(pady=(0, 10), anchor="center")
+
+        # Frame for cave buttons
+        cave_frame = ctk.CTkFrame(self.main_game_frame, fg_color="transparent")
+        cave_frame.pack(pady=10, padx=10, anchor="center")
+
+        if self.map_view_kind == "canvas":
+            # One canvas that only draws the caves in view
+            canvas = ctk.CTkCanvas(cave_frame, width=MAP_WIDTH, height=MAP_HEIGHT, bg="#2b2b2b", highlightthickness=0)
+            canvas.pack()
+            self.map_view = CanvasMapView(canvas, self.topology, self.move_player_from_gui, MAP_WIDTH, MAP_HEIGHT)
+        else:
+            # Create one button per cave, laid out the way the topology is drawn
+            for i in range(1, self.topology.num_caves + 1):
+                button = ctk.CTkButton(
+                    cave_frame,
+                    text=str(i),
+                    width=50,
+                    height=50,
+                    corner_radius=10,
+                    font=ctk.CTkFont(size=20, weight="bold"),
+                    command=lambda cave=i: self.move_player_from_gui(cave)
+                )
+                row, col = self.topology.position(i)
+                button.grid(row=row, column=col, padx=5, pady=5)
+                self.buttons.append(button)
+
+        # Frame for shooting controls
+        shoot_frame = ctk.CTkFrame(self.main_game_frame)
+        shoot_frame.pack(pady=10, padx=20, anchor="center")
+
+        shoot_label = ctk.CTkLabel(shoot_frame, text="Shoot Arrow to:", font=ctk.CTkFont(size=14))
+        shoot_label.pack(side="left", padx=(10, 5))
+        
+        self.shoot_menu = ctk.CTkOptionMenu(shoot_frame, values=[" "], width=100)
+        self.shoot_menu.pack(side="left", padx=5)
+
+        shoot_button = ctk.CTkButton(shoot_frame, text="Shoot", command=self.shoot_arrow_from_gui, corner_radius=8)
+        shoot_button.pack(side="left", padx=5)
+        
+        # --- NEW CODE START ---
+        # Frame for all tool controls (initially hidden)
+        self.tools_frame = ctk.CTkFrame(self.main_game_frame)
+        self.tools_frame.columnconfigure(0, weight=1)
+
+        # Frame for Radar controls
+        self.radar_control_frame = ctk.CTkFrame(self.tools_frame, fg_color="transparent")
+        radar_label = ctk.CTkLabel(self.radar_control_frame, text="Radar Cave:", font=ctk.CTkFont(size=14))
+        radar_label.pack(side="left", padx=(10, 5))
+        
+        self.radar_menu = ctk.CTkOptionMenu(self.radar_control_frame, values=[" "], width=100)
+        self.radar_menu.pack(side="left", padx=5)
+
+        self.radar_button = ctk.CTkButton(self.radar_control_frame, text="Use Radar", command=self.use_radar, corner_radius=8, state=tk.DISABLED)
+        self.radar_button.pack(side="left", padx=5)
+
+        # Frame for Bat Taxi controls
+        self.bat_taxi_control_frame = ctk.CTkFrame(self.tools_frame, fg_color="transparent")
+        bat_taxi_label = ctk.CTkLabel(self.bat_taxi_control_frame, text="Bat Taxi to:", font=ctk.CTkFont(size=14))
+        bat_taxi_label.pack(side="left", padx=(10, 5))
+
+        self.bat_taxi_menu = ctk.CTkOptionMenu(self.bat_taxi_control_frame, values=[" "], width=100)
+        self.bat_taxi_menu.pack(side="left", padx=5)
+
+        self.bat_taxi_button = ctk.CTkButton(self.bat_taxi_control_frame, text="Take Taxi", command=self.use_bat_taxi, corner_radius=8, state=tk.DISABLED)
+        self.bat_taxi_button.pack(side="left", padx=5)
+        # --- NEW CODE END ---
+
+        # Store button
+        store_button = ctk.CTkButton(self.main_game_frame, text="Open Store", command=self.open_store, corner_radius=8)
+        store_button.pack(pady=10, padx=20, anchor="center")
+
+        # Separate textbox for instructions (non-editable)
+        self.instructions_box = ctk.CTkTextbox(self.main_game_frame, wrap="word", width=550, height=95)
+        self.instructions_box.pack(pady=5, padx=20, anchor="center")
+        self.instructions_box.insert("0.0", self.get_initial_instructions())
+        self.instructions_box.configure(state="disabled")
+
+        # Separate textbox for dynamic game messages
+        self.message_box = ctk.CTkTextbox(self.main_game_frame, wrap="word", width=550, height=155)
+        self.message_box.pack(pady=10, padx=20, anchor="center")
+
+        # Exit button
+        self.exit_button = ctk.CTkButton(self, text="Exit", command=self.quit, corner_radius=8, fg_color="#b00020")
+        self.exit_button.pack(pady=10, padx=20, anchor="center")
+
+    def create_store_widgets(self, parent_frame):
+        """Creates the widgets for the in-game store."""
+        store_label = ctk.CTkLabel(parent_frame, text="Store", font=ctk.CTkFont(size=18, weight="bold"))
+        store_label.pack(pady=(10, 5))
+
+        # Radar
+        radar_frame = ctk.CTkFrame(parent_frame)
+        radar_frame.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(radar_frame, text="Radar (2 uses)").pack(side="left", padx=5)
+        self.buy_radar_btn = ctk.CTkButton(radar_frame, text="Buy (50)", command=lambda: self.buy_ability("radar"), corner_radius=8)
+        self.buy_radar_btn.pack(side="right", padx=5)
+        self.radar_uses_label = ctk.CTkLabel(radar_frame, text=f"Uses Left: {self.radar_uses_left}")
+        self.radar_uses_label.pack(side="right", padx=5)
+        
+        # Wooden Planks
+        planks_frame = ctk.CTkFrame(parent_frame)
+        planks_frame.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(planks_frame, text="Wooden Planks (1 use)").pack(side="left", padx=5)
+        self.buy_planks_btn = ctk.CTkButton(planks_frame, text="Buy (75)", command=lambda: self.buy_ability("planks"), corner_radius=8)
+        self.buy_planks_btn.pack(side="right", padx=5)
+        self.plank_uses_label = ctk.CTkLabel(planks_frame, text=f"Uses Left: {self.plank_uses_left}")
+        self.plank_uses_label.pack(side="right", padx=5)
+        
+        # Bat Taxi Service
+        bat_taxi_frame = ctk.CTkFrame(parent_frame)
+        bat_taxi_frame.pack(pady=5, padx=10, fill="x")
+        ctk.CTkLabel(bat_taxi_frame, text="Bat Taxi Service (1 use)").pack(side="left", padx=5)
+        self.buy_bat_taxi_btn = ctk.CTkButton(bat_taxi_frame, text="Buy (60)", command=lambda: self.buy_ability("bat_taxi"), corner_radius=8)
+        self.buy_bat_taxi_btn.pack(side="right", padx=5)
+        self.bat_taxi_uses_label = ctk.CTkLabel(bat_taxi_frame, text=f"Uses Left: {self.bat_taxi_uses_left}")
+        self.bat_taxi_uses_label.pack(side="right", padx=5)
+        
+        # Close button
+        close_button = ctk.CTkButton(parent_frame, text="Close Store", command=self.close_store, corner_radius=8, fg_color="#b00020") 
+        close_button.pack(pady=5, padx=20, anchor="center")
+
+    def open_store(self):
+        """Hides the main game frame and displays the store frame."""
+        self.main_game_frame.pack_forget()
+        self.store_frame.pack(fill="both", expand=True)
+        self.exit_button.pack_forget()
+        self.update_display()
+            
+    def close_store(self):
+        """Hides the store frame and displays the main game frame."""
+        self.store_frame.pack_forget()
+        self.main_game_frame.pack(fill="both", expand=True)
+        self.exit_button.pack(pady=10, padx=20, anchor="center")
+        self.update_display()
+
+    def buy_ability(self, ability):
+        """Handles purchasing an ability from the store."""
+        price_map = {"radar": 50, "planks": 75, "bat_taxi": 60}
+        price = price_map.get(ability)
+        
+        if self.currency >= price:
+            self.currency -= price
+            self.game.message = f"Purchased {ability.replace('_', ' ')} for {price} currency."
+            if ability == "radar":
+                self.radar_uses_left += 2
+            elif ability == "planks":
+                self.plank_uses_left += 1
+            elif ability == "bat_taxi":
+                self.bat_taxi_uses_left += 1
+        else:
+            self.game.message = f"Not enough currency to buy {ability.replace('_', ' ')}."
+            
+        self.save_profile()
+        self.update_display()
+
+    def start_new_game(self):
+        """
+        Initializes a new game with a default of 5 arrows. Abilities and
+        currency are reset unless they belong to a saved profile.
+        """
+        self.game = HuntTheWumpus(initial_arrows=5, topology=self.topology, recorder=self.recorder,
+                                  instrument=self.instrument)
+        self.moves = 0
+        if self.profile is None:
+            self.currency = 0
+            self.radar_uses_left = 0
+            self.plank_uses_left = 0
+            self.bat_taxi_uses_left = 0
+        self._reward = 0
+        self._game_recorded = False
+        self.belief = BeliefState.for_game(self.game)
+        if self.optimal is not None:
+            self.optimal.new_game(self.game)
+        self.game.message = "Starting a new game. Good luck!"
+        self.save_profile()
+        self.update_display()
+
+    def save_profile(self):
+        """Saves the career state after an action; a finished game is added to the history once."""
+        if self.profile is None:
+            return
+        for field in Profile.GUI_FIELDS:
+            setattr(self.profile, field, getattr(self, field))
+        if self.game.game_over and not self._game_recorded:
+            self._game_recorded = True
+            self.profiles.record_game(self.profile, self.game.outcome, self.moves, self._reward)
+        else:
+            self.profiles.save(self.profile)
+
+    def get_initial_instructions(self):
+        """Returns the game's starting instructions as a string."""
+        return (
+            "Welcome to Hunt the Wumpus!\n"
+            "Objective: Hunt down the Wumpus without falling into pits or being carried by bats.\n"
+            "To move, click on a connected cave. Drag the map to pan and use the mouse wheel to zoom.\n"
+            "To shoot, select a connected cave from the dropdown menu and click Shoot.\n"
+            "Use currency earned to buy abilities in the store."
+        )
+    
+    def move_player_from_gui(self, destination):
+        """Handles a player's move initiated by a button click."""
+        if self.game.game_over:
+            return
+        self.moves += 1
+        
+        hazard_check = self.game.move_player(destination, self.plank_uses_left > 0, self.bat_taxi_uses_left > 0)
+        self.belief.observe_move(destination, self.game)
+        if self.optimal is not None:
+            self.optimal.observe_move(destination, self.game)
+        
+        if hazard_check == "planks":
+            self.plank_uses_left -= 1
+        elif hazard_check == "bat_taxi":
+            self.bat_taxi_uses_left -= 1
+            # Instead of a popup, the bat taxi controls are now on the main page.
+            # The player must use the controls to choose a new location.
+            self.game.message += "\nChoose a cave with the Bat Taxi controls to fly to."
+            
+        self.save_profile()
+        self.update_display()
+        if hazard_check is True:
+            messagebox.showinfo("Game Over", self.game.message)
+
+    def shoot_arrow_from_gui(self):
+        """Handles shooting an arrow based on user input from the dropdown menu."""
+        if self.game.game_over:
+            return
+        
+        target_cave_str = self.shoot_menu.get()
+        if target_cave_str and target_cave_str.strip() != " ":
+            target_cave = int(target_cave_str)
+            self.game.shoot_arrow([target_cave])
+            self.belief.observe_shot([target_cave], self.game)
+            if self.optimal is not None:
+                self.optimal.observe_shot([target_cave], self.game)
+            
+            if self.game.game_over and "You shot the Wumpus!" in self.game.message:
+                self.award_currency()
+                
+            self.save_profile()
+            self.update_display()
+            if self.game.game_over:
+                messagebox.showinfo("Game Over", self.game.message)
+        else:
+            self.game.message = "You must select a cave to shoot at."
+            self.update_display()
+
+    def award_currency(self):
+        """Awards currency based on number of moves."""
+        reward = max(100 - (self.moves * 2), 10)
+        self.currency += reward
+        self._reward = reward
+        self.game.message += f"\n You won! You receive {reward} currency."
+
+    def use_radar(self):
+        """Uses the Radar ability to check a cave."""
+        if self.radar_uses_left > 0:
+            target_cave_str = self.radar_menu.get()
+            if target_cave_str and target_cave_str.strip() != " ":
+                target_cave = int(target_cave_str)
+                self.radar_uses_left -= 1
+                hazard = self.game.use_radar(target_cave)
+                self.game.message = self.check_cave_contents(target_cave)
+                self.belief.observe_radar(target_cave, hazard)
+                if self.optimal is not None:
+                    self.optimal.observe_radar(target_cave, hazard)
+                self.save_profile()
+                self.update_display()
+            else:
+                self.game.message = "Please select a cave to use the radar on."
+                self.update_display()
+        else:
+            self.game.message = "You don't have any Radar uses left."
+            self.update_display()
+
+    def use_bat_taxi(self):
+        """Uses the Bat Taxi ability to move to any cave."""
+        if self.bat_taxi_uses_left > 0:
+            destination_str = self.bat_taxi_menu.get()
+            if destination_str and destination_str.strip() != " ":
+                destination = int(destination_str)
+                self.bat_taxi_uses_left -= 1
+
+                # Fly to the new location and check it for hazards
+                hazard_check = self.game.take_bat_taxi(destination, self.plank_uses_left > 0, self.bat_taxi_uses_left > 0)
+                self.belief.observe_move(destination, self.game)
+                if self.optimal is not None:
+                    self.optimal.observe_move(destination, self.game)
+                if hazard_check == "planks":
+                    self.plank_uses_left -= 1
+                
+                self.save_profile()
+                self.update_display()
+                if hazard_check is True:
+                    messagebox.showinfo("Game Over", self.game.message)
+            else:
+                self.game.message = "Please select a cave to fly to."
+                self.update_display()
+        else:
+            self.game.message = "You don't have any Bat Taxi uses left."
+            self.update_display()
+
+    def show_hint(self):
+        """Shows the optimal advice for the next action, or the belief-based one off the solved table."""
+        if self.game.game_over:
+            return
+        hint = None
+        if self.optimal is not None:
+            hint = self.optimal.hint(self.game.player_location, self.game.num_arrows)
+        if hint is None:
+            hint = self.belief.hint(self.game.player_location, self.game.num_arrows, self.plank_uses_left > 0)
+        self.game.message = hint
+        self.update_display()
+
+    def autoplay(self):
+        """Lets the MCTS player choose the next action and plays it like a click would."""
+        if self.game.game_over:
+            return
+        advice = self.auto_player.choose(self.game, self.belief, self.plank_uses_left > 0)
+        if advice is None:
+            return
+        action, target = advice
+        if action == "move":
+            self.move_player_from_gui(target)
+        else:
+            self.shoot_menu.set(str(target[0]))
+            self.shoot_arrow_from_gui()
+
+    def check_cave_contents(self, cave_num):
+        """Returns the contents of a specified cave."""
+        hazard = self.game._hazard_at(cave_num)
+        if hazard == "wumpus":
+            return f"Radar scan of cave {cave_num}: Wumpus is there!"
+        elif hazard == "pit":
+            return f"Radar scan of cave {cave_num}: A bottomless pit is there."
+        elif hazard == "bats":
+            return f"Radar scan of cave {cave_num}: Giant bats are there."
+        else:
+            return f"Radar scan of cave {cave_num}: It's empty."
+    
+    def update_display(self):
+        """
+        Updates the GUI with the current game state, currency, and abilities.
+        Only widgets whose content changed since the last call are touched.
+        """
+        render = self.renderer
+        render.begin_frame()
+        render.configure(self.currency_label, "currency", text=f"Currency: {self.currency}")
+
+        render.configure(self.buy_radar_btn, "buy_radar", state=tk.NORMAL if self.currency >= 50 else tk.DISABLED)
+        render.configure(self.buy_planks_btn, "buy_planks", state=tk.NORMAL if self.currency >= 75 else tk.DISABLED)
+        render.configure(self.buy_bat_taxi_btn, "buy_bat_taxi", state=tk.NORMAL if self.currency >= 60 else tk.DISABLED)
+
+        render.configure(self.radar_uses_label, "radar_uses", text=f"Uses Left: {self.radar_uses_left}")
+        render.configure(self.plank_uses_label, "plank_uses", text=f"Uses Left: {self.plank_uses_left}")
+        render.configure(self.bat_taxi_uses_label, "bat_taxi_uses", text=f"Uses Left: {self.bat_taxi_uses_left}")
+
+        # Game state information
+        neighbors = self.game._get_neighbors(self.game.player_location)
+        if self.map_view is not None:
+            # Scrolls to the player first, so the radar and taxi menus list what is on screen
+            self.map_view.show(self.game.player_location, neighbors)
+        lines = [
+            "--- Current State ---",
+            f"You are in cave {self.game.player_location}.",
+            f"Connected caves: {neighbors}",
+            f"Arrows remaining: {self.game.num_arrows}",
+            "",
+        ]
+        lines.extend(self.game._get_perceptions())
+        lines.append("")
+        lines.append(f"Message: {self.game.message}")
+        render.text(self.message_box, "message_box", "\n".join(lines) + "\n")
+
+        # Update shoot menu options
+        neighbor_strings = [str(n) for n in neighbors]
+        if not neighbor_strings:
+            render.option_menu(self.shoot_menu, "shoot_menu", [" "], tk.DISABLED)
+        else:
+            render.option_menu(self.shoot_menu, "shoot_menu", neighbor_strings, tk.NORMAL)
+
+        # Update tools frame visibility and its contents
+        has_tools = self.radar_uses_left > 0 or self.bat_taxi_uses_left > 0
+        render.visible(self.tools_frame, "tools_frame", has_tools, pady=5, padx=20, anchor="center")
+
+        cave_choices = self.cave_choices
+        if cave_choices is None and has_tools:
+            cave_choices = [str(cave) for cave in self.map_view.visible_caves()] or [" "]
+
+        # Update radar menu options and visibility, keeping radar above the bat taxi
+        if self.radar_uses_left > 0:
+            before = {"before": self.bat_taxi_control_frame} if render.is_visible("bat_taxi_frame") else {}
+            render.visible(self.radar_control_frame, "radar_frame", True, pady=5, padx=0, **before)
+            render.option_menu(self.radar_menu, "radar_menu", cave_choices, tk.NORMAL)
+            render.configure(self.radar_button, "radar_button", state=tk.NORMAL)
+        else:
+            render.visible(self.radar_control_frame, "radar_frame", False)
+
+        # Update bat taxi menu options and visibility
+        if self.bat_taxi_uses_left > 0:
+            render.visible(self.bat_taxi_control_frame, "bat_taxi_frame", True, pady=5, padx=0)
+            render.option_menu(self.bat_taxi_menu, "bat_taxi_menu", cave_choices, tk.NORMAL)
+            render.configure(self.bat_taxi_button, "bat_taxi_button", state=tk.NORMAL)
+        else:
+            render.visible(self.bat_taxi_control_frame, "bat_taxi_frame", False)
+
+        if self.map_view is not None:
+            render.end_frame()
+            return
+
+        # Update button colors, visiting only caves that are or were highlighted
+        highlighted = {self.game.player_location: "player"}
+        for neighbor in neighbors:
+            highlighted.setdefault(neighbor, "neighbor")
+        if self._highlighted is None:
+            caves = range(1, len(self.buttons) + 1)
+        else:
+            caves = self._highlighted.keys() | highlighted.keys()
+        for cave_num in caves:
+            if not 0 < cave_num <= len(self.buttons):
+                continue
+            style = highlighted.get(cave_num)
+            if style == "player":
+                fg_color, state = PLAYER_COLOR, tk.NORMAL
+            elif style == "neighbor":
+                fg_color, state = NEIGHBOR_COLOR, tk.NORMAL
+            else:
+                fg_color, state = CAVE_COLOR, tk.DISABLED
+            render.configure(self.buttons[cave_num - 1], ("cave", cave_num), fg_color=fg_color, state=state)
+        self._highlighted = highlighted
+        render.end_frame()
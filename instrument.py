@@ -0,0 +1,245 @@
+import argparse
+import bisect
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+# Public actions timed on HuntTheWumpus and WumpusGUI
+ENGINE_ACTIONS = ("move_player", "shoot_arrow", "use_radar", "take_bat_taxi", "reset", "play")
+GUI_ACTIONS = ("update_display", "start_new_game", "move_player_from_gui", "shoot_arrow_from_gui",
+               "use_radar", "use_bat_taxi", "buy_ability", "autoplay", "show_hint", "save_profile")
+# Histogram bucket upper bounds in seconds, 1 us to 10 s
+BUCKETS = tuple(float(f"{m}e{e}") for e in range(-6, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+
+class NullInstrument:
+    """Disabled instrumentation: attaching it leaves the object untouched, so it costs nothing."""
+    enabled = False
+
+    def attach(self, obj, component, actions):
+        return obj
+
+
+NULL_INSTRUMENT = NullInstrument()
+
+
+class Histogram:
+    """Call count, total time and bucketed latencies of one action."""
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        """Returns the upper bound of the bucket holding the q-quantile."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return bound
+        return 0.0
+
+
+class Instrument:
+    """
+    Counts calls and records latency histograms of the actions of every
+    object attached to it. attach() replaces the instance's methods with
+    timing wrappers; objects built without an instrument get NULL_INSTRUMENT
+    and keep their plain methods.
+    """
+    enabled = True
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.histograms = {}
+
+    def attach(self, obj, component, actions):
+        for action in actions:
+            method = getattr(obj, action, None)
+            if method is not None:
+                setattr(obj, action, self._timed(method, component, action))
+        return obj
+
+    def _timed(self, method, component, action):
+        histogram = self.histograms.setdefault((component, action), Histogram())
+        clock = self.clock
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                histogram.observe(clock() - start)
+        return timed
+
+    def reset(self):
+        for key in self.histograms:
+            self.histograms[key] = Histogram()
+
+    def to_json(self):
+        """Returns the stats as a JSON-ready dict keyed by "component.action"."""
+        stats = {}
+        for (component, action), histogram in sorted(self.histograms.items()):
+            if not histogram.count:
+                continue
+            stats[f"{component}.{action}"] = {
+                "count": histogram.count,
+                "total_seconds": histogram.total,
+                "mean_seconds": histogram.total / histogram.count,
+                "p50_seconds": histogram.quantile(0.5),
+                "p99_seconds": histogram.quantile(0.99),
+                "buckets": {str(bound): count for bound, count in zip(BUCKETS + ("+Inf",), histogram.buckets)},
+            }
+        return stats
+
+    def to_prometheus(self, name="wumpus_action_seconds"):
+        """Returns the stats in the Prometheus text exposition format."""
+        lines = [f"# HELP {name} Latency of Hunt the Wumpus actions.", f"# TYPE {name} histogram"]
+        for (component, action), histogram in sorted(self.histograms.items()):
+            labels = f'component="{component}",action="{action}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ("+Inf",), histogram.buckets):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a background thread looks at the profiled
+    thread's stack every `interval` seconds and counts the functions on it.
+    Much cheaper than cProfile, at the price of sampling error.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = 0
+        self.own = Counter()
+        self.cumulative = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+
+    def __enter__(self):
+        self._target = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.samples += 1
+            code = frame.f_code
+            self.own[(code.co_filename, code.co_firstlineno, code.co_name)] += 1
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                if key not in seen:
+                    seen.add(key)
+                    self.cumulative[key] += 1
+                frame = frame.f_back
+
+    def report(self, limit=20):
+        """Returns the functions seen most often, like pstats' cumulative view."""
+        lines = [f"{self.samples} samples every {self.interval * 1000:g} ms",
+                 f"{'own %':>7} {'cum %':>7}  function"]
+        total = max(self.samples, 1)
+        for key, count in self.cumulative.most_common(limit):
+            filename, line, function = key
+            lines.append(f"{self.own[key] / total:>7.1%} {count / total:>7.1%}  {function} ({filename}:{line})")
+        return "\n".join(lines)
+
+
+@contextmanager
+def profiled(kind="cprofile", interval=0.005):
+    """
+    Profiles the code in the with-block. Yields a cProfile.Profile (kind
+    "cprofile") or a SamplingProfiler (kind "sampling").
+    """
+    if kind == "sampling":
+        with SamplingProfiler(interval) as profiler:
+            yield profiler
+    elif kind == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+    else:
+        raise ValueError(f"Unknown profiler {kind!r}. Use 'cprofile' or 'sampling'.")
+
+
+def profile_games(num_games, agent=None, topology=None, seed=0, kind="cprofile", instrument=None):
+    """
+    Plays `num_games` games inside profiled() and returns the profiler.
+    Pass an Instrument to also collect per-action histograms.
+    """
+    from tournament import play_game, random_agent
+    from wumpus import HuntTheWumpus
+
+    agent = agent if agent is not None else random_agent
+    game = HuntTheWumpus(topology=topology, seed=seed, instrument=instrument)
+    with profiled(kind) as profiler:
+        for _ in range(num_games):
+            game.reset()
+            play_game(game, agent)
+    return profiler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile and instrument Hunt the Wumpus games.")
+    parser.add_argument("--games", type=int, default=1000, help="games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the game")
+    parser.add_argument("--profile", choices=("cprofile", "sampling"), default="cprofile", help="profiler to use")
+    parser.add_argument("--format", choices=("text", "prometheus", "json"), default="text",
+                        help="how to print the per-action stats")
+    parser.add_argument("--limit", type=int, default=20, help="functions shown in the profile")
+    args = parser.parse_args()
+
+    instrument = Instrument()
+    profiler = profile_games(args.games, seed=args.seed, kind=args.profile, instrument=instrument)
+    if args.profile == "cprofile":
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(args.limit)
+        print(out.getvalue())
+    else:
+        print(profiler.report(args.limit))
+    print()
+    if args.format == "prometheus":
+        print(instrument.to_prometheus(), end="")
+    elif args.format == "json":
+        print(json.dumps(instrument.to_json(), indent=2))
+    else:
+        for name, stats in instrument.to_json().items():
+            print(f"{name:<28} {stats['count']:>9} calls  mean {stats['mean_seconds'] * 1e6:8.2f} us"
+                  f"  p99 <= {stats['p99_seconds'] * 1e6:g} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from server import GameServer, LocalClient
+
+
+class _StreamClient:
+    """Pipelining client for one socket connection."""
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def batch(self, requests):
+        """Sends all requests in one write and reads their replies in order."""
+        self.writer.write(b"".join(json.dumps(r, separators=(",", ":")).encode() + b"\n" for r in requests))
+        await self.writer.drain()
+        return [json.loads(await self.reader.readline()) for _ in requests]
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+class _LocalBatchClient(LocalClient):
+    async def batch(self, requests):
+        return [await self.request(**r) for r in requests]
+
+    async def close(self):
+        pass
+
+
+def _next_request(state, session, rng):
+    """Picks a plausible next action for a session from its last state."""
+    if state["game_over"]:
+        return {"action": "new", "session": session}
+    if state["arrows"] > 0 and "I smell a Wumpus!" in state["perceptions"] and rng.random() < 0.5:
+        return {"action": "shoot", "session": session, "path": [rng.choice(state["neighbors"])]}
+    return {"action": "move", "session": session, "cave": rng.choice(state["neighbors"])}
+
+
+async def _drive(client, sessions, requests, latencies, seed):
+    """Plays `sessions` games side by side, one pipelined batch per round, until `requests` are done."""
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    replies = await client.batch([{"action": "new"} for _ in range(sessions)])
+    latencies.extend([time.perf_counter() - start] * sessions)
+    states = {reply["session"]: reply["state"] for reply in replies}
+    done = sessions
+    while done < requests:
+        batch = [_next_request(state, session, rng) for session, state in states.items()]
+        batch = batch[:requests - done]
+        start = time.perf_counter()
+        replies = await client.batch(batch)
+        elapsed = time.perf_counter() - start
+        # Every request of a batch waited for the whole batch
+        latencies.extend([elapsed] * len(batch))
+        for request, reply in zip(batch, replies):
+            if reply["ok"]:
+                states[request["session"]] = reply["state"]
+        done += len(batch)
+    for session in states:
+        await client.batch([{"action": "close", "session": session}])
+    await client.close()
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def run_load(host="127.0.0.1", port=8765, unix_path=None, connections=10, sessions=20,
+                   requests=10000, server=None, seed=0):
+    """
+    Runs the load and returns {"requests", "seconds", "rps", "p50_ms", "p99_ms"}.
+    Requests are split evenly over the connections. Pass a GameServer as
+    `server` to skip the sockets and drive it in-process.
+    """
+    clients = []
+    for _ in range(connections):
+        if server is not None:
+            clients.append(_LocalBatchClient(server))
+        elif unix_path is not None:
+            clients.append(_StreamClient(*await asyncio.open_unix_connection(unix_path, limit=1 << 20)))
+        else:
+            clients.append(_StreamClient(*await asyncio.open_connection(host, port, limit=1 << 20)))
+    latencies = []
+    share = max(requests // connections, sessions)
+    start = time.perf_counter()
+    await asyncio.gather(*(_drive(client, sessions, share, latencies, seed + i)
+                           for i, client in enumerate(clients)))
+    seconds = time.perf_counter() - start
+    return {
+        "requests": len(latencies),
+        "seconds": seconds,
+        "rps": len(latencies) / seconds,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def _main(args):
+    server = None
+    listener = None
+    if args.local:
+        server = GameServer()
+    elif args.spawn:
+        # Benchmark against a server running in this process and event loop
+        listener = await GameServer().serve(args.host, args.port, args.unix)
+    try:
+        result = await run_load(args.host, args.port, args.unix, args.connections, args.sessions,
+                                args.requests, server, args.seed)
+    finally:
+        if listener is not None:
+            listener.close()
+            await listener.wait_closed()
+    print(f"Requests:   {result['requests']}")
+    print(f"Seconds:    {result['seconds']:.2f}")
+    print(f"Throughput: {result['rps']:.0f} requests/s")
+    print(f"Latency:    p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator and benchmark for the Wumpus game server.")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=8765, help="server port")
+    parser.add_argument("--unix", default=None, help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--connections", type=int, default=10, help="concurrent connections")
+    parser.add_argument("--sessions", type=int, default=20, help="games played side by side per connection")
+    parser.add_argument("--requests", type=int, default=10000, help="total requests to send")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the clients' choices")
+    parser.add_argument("--spawn", action="store_true", help="start a server in this process first")
+    parser.add_argument("--local", action="store_true", help="drive an in-process server without sockets")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from belief import BeliefState
+from wumpus import GameState, HuntTheWumpus
+
+# Value of a rollout that ends with the player still alive
+ALIVE_VALUE = 0.5
+
+
+class _Node:
+    """Statistics of one action sequence in the open-loop search tree."""
+    __slots__ = ("visits", "value", "children")
+
+    def __init__(self):
+        self.visits = 0
+        self.value = 0.0
+        self.children = {}
+
+
+def _actions(game):
+    """Returns the legal actions as ("move", cave) and ("shoot", cave) pairs."""
+    neighbors = game._get_neighbors(game.player_location)
+    actions = [("move", cave) for cave in neighbors]
+    if game.num_arrows > 0:
+        actions.extend(("shoot", cave) for cave in neighbors)
+    return actions
+
+
+def _apply(game, action, has_planks):
+    """Plays an action on the scratch game and returns whether the planks are still unused."""
+    kind, cave = action
+    if kind == "move":
+        if game.move_player(cave, has_planks, False) == "planks":
+            return False
+    else:
+        game.shoot_arrow([cave])
+    return has_planks
+
+
+def _value(game):
+    if game.outcome == "won":
+        return 1.0
+    return 0.0 if game.game_over else ALIVE_VALUE
+
+
+def _rollout(game, rng, has_planks, depth):
+    """Plays random actions like the tournament's random agent and returns the result's value."""
+    for _ in range(depth):
+        if game.game_over:
+            break
+        neighbors = game._get_neighbors(game.player_location)
+        if game.num_arrows > 0 and game.perception_table.counts(game.player_location)[0] and rng.random() < 0.5:
+            game.shoot_arrow([rng.choice(neighbors)])
+        else:
+            has_planks = _apply(game, ("move", rng.choice(neighbors)), has_planks)
+    return _value(game)
+
+
+def search(topology, belief, player_cave, num_arrows, has_planks=False, rng=None,
+           time_budget=0.05, iterations=None, exploration=1.4, rollout_depth=12):
+    """
+    Runs open-loop UCT from the player's cave and returns the root statistics
+    as {action: (visits, total value)} plus the number of iterations run.
+    Every iteration plays on a hazard layout sampled from the belief, so the
+    search never looks at the real placement. Stops after `iterations` or
+    `time_budget` seconds, whichever comes first.
+    """
+    if time_budget is None and iterations is None:
+        raise ValueError("Give a time budget, an iteration count or both.")
+    rng = rng if rng is not None else random.Random()
+    game = HuntTheWumpus(initial_arrows=num_arrows, topology=topology, rng=rng)
+    root = _Node()
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    done = 0
+    while iterations is None or done < iterations:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        wumpuses, pits, bats = belief.sample_layout(rng, player_cave)
+        game.restore(GameState(player_cave, wumpuses, tuple(pits), tuple(bats), num_arrows, False, None, ""))
+        planks = has_planks
+        node = root
+        path = [root]
+        # Selection and expansion
+        while not game.game_over:
+            actions = _actions(game)
+            untried = [action for action in actions if action not in node.children]
+            if untried:
+                action = rng.choice(untried)
+                child = node.children[action] = _Node()
+                node = child
+                planks = _apply(game, action, planks)
+                path.append(node)
+                break
+            log_visits = math.log(node.visits)
+            children = node.children
+            action = max(actions, key=lambda a: children[a].value / children[a].visits
+                         + exploration * math.sqrt(log_visits / children[a].visits))
+            node = children[action]
+            planks = _apply(game, action, planks)
+            path.append(node)
+
+        reward = _rollout(game, rng, planks, rollout_depth)
+        for visited in path:
+            visited.visits += 1
+            visited.value += reward
+        done += 1
+    return {action: (child.visits, child.value) for action, child in root.children.items()}, done
+
+
+def _search_worker(topology, belief, player_cave, num_arrows, has_planks, seed, options):
+    return search(topology, belief, player_cave, num_arrows, has_planks, random.Random(seed), **options)
+
+
+class MCTSAgent:
+    """
+    Monte Carlo Tree Search player. Keeps a BeliefState of what it has
+    observed and searches over hazard layouts sampled from it. With
+    `workers` > 1 every decision runs one independent search per worker
+    process (root parallelization) and the root statistics are summed.
+    Works as a tournament agent. Its search draws from its own generator,
+    restarted from `seed` every game, never from game.rng: the same game
+    seed then plays out the same whichever agent is attached, and so does
+    any single game replayed on its own. A `seed` of None searches
+    differently every game.
+    """
+    def __init__(self, time_budget=0.05, iterations=None, workers=None, exploration=1.4,
+                 rollout_depth=12, seed=0):
+        self.options = {"time_budget": time_budget, "iterations": iterations,
+                        "exploration": exploration, "rollout_depth": rollout_depth}
+        self.workers = workers
+        self.seed = seed
+        self.belief = None
+        self.rng = random.Random(seed)
+        self.last_iterations = 0
+        self._last_action = None
+        self._pool = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        return state
+
+    def close(self):
+        """Shuts down the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def new_game(self, game):
+        self.belief = BeliefState.for_game(game)
+        self.rng = random.Random(self.seed)
+        self._last_action = None
+
+    def choose(self, game, belief, has_planks=False):
+        """
+        Returns the most visited action as ("move", cave) or ("shoot", [cave]),
+        or None once the game is over.
+        """
+        if game.game_over:
+            return None
+        args = (game.topology, belief, game.player_location, game.num_arrows, has_planks)
+        if self.workers and self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            futures = [self._pool.submit(_search_worker, *args, self.rng.getrandbits(64), self.options)
+                       for _ in range(self.workers)]
+            stats, self.last_iterations = {}, 0
+            for future in futures:
+                worker_stats, done = future.result()
+                self.last_iterations += done
+                for action, (visits, value) in worker_stats.items():
+                    total = stats.get(action, (0, 0.0))
+                    stats[action] = (total[0] + visits, total[1] + value)
+        else:
+            stats, self.last_iterations = search(*args, rng=self.rng, **self.options)
+        if not stats:
+            return None
+        kind, cave = max(stats, key=lambda action: (stats[action][0], stats[action][1]))
+        return (kind, [cave]) if kind == "shoot" else (kind, cave)
+
+    def hint(self, game, belief, has_planks=False):
+        """Returns the chosen action as a sentence for the GUI."""
+        advice = self.choose(game, belief, has_planks)
+        if advice is None:
+            return "Auto-play: there is nothing left to do."
+        action, target = advice
+        if action == "shoot":
+            return f"Auto-play: shoot into cave {target[0]} ({self.last_iterations} simulations)."
+        return f"Auto-play: move to cave {target} ({self.last_iterations} simulations)."
+
+    def __call__(self, game):
+        if self._last_action is not None:
+            action, target = self._last_action
+            if action == "move":
+                self.belief.observe_move(target, game)
+            else:
+                self.belief.observe_shot(target, game)
+        advice = self.choose(game, self.belief)
+        if advice is None:
+            # The budget ran out before a single simulation finished: play the belief heuristic
+            advice = self.belief.advise(game.player_location, game.num_arrows)
+        self._last_action = advice
+        return self._last_action
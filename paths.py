@@ -0,0 +1,269 @@
+import heapq
+from array import array
+
+# Maps with at most this many caves get a full all-pairs matrix
+DENSE_LIMIT = 1024
+# Most caves a crooked arrow can fly through
+ARROW_RANGE = 5
+
+
+def _bfs(topology, source, limit=None):
+    """
+    Breadth-first search from `source`, optionally only `limit` hops deep.
+    Returns the caves in visiting order and a {cave: distance} dict.
+    """
+    offsets, targets = topology.offsets, topology.targets
+    distance = {source: 0}
+    order = [source]
+    for cave in order:
+        d = distance[cave]
+        if limit is not None and d >= limit:
+            continue
+        for i in range(offsets[cave], offsets[cave + 1]):
+            neighbor = targets[i]
+            if neighbor not in distance:
+                distance[neighbor] = d + 1
+                order.append(neighbor)
+    return order, distance
+
+
+class _DistanceIndex:
+    """Queries shared by the dense and the landmark index."""
+    def __init__(self, topology):
+        self.topology = topology
+        self._reach = {}
+
+    def _check(self, cave, other):
+        """Raises ValueError unless both caves are on the map; flat tables would wrap around otherwise."""
+        num_caves = self.topology.num_caves
+        if not (0 < cave <= num_caves and 0 < other <= num_caves):
+            raise ValueError(f"Caves must be between 1 and {num_caves}, got {cave} and {other}.")
+
+    def adjacent(self, cave, other):
+        """Returns True if `other` is one tunnel away from `cave`."""
+        return self.topology.is_neighbor(cave, other)
+
+    def is_valid_path(self, start, path):
+        """
+        Returns True if an arrow shot from `start` can follow `path`: every
+        cave is connected to the previous one (or repeats it).
+        """
+        current = start
+        for cave in path[:ARROW_RANGE]:
+            if cave != current and not self.adjacent(current, cave):
+                return False
+            current = cave
+        return True
+
+    def arrow_reach(self, cave, hops=ARROW_RANGE):
+        """Returns the frozenset of caves a crooked arrow from `cave` can hit within `hops` caves."""
+        key = (cave, hops)
+        reach = self._reach.get(key)
+        if reach is None:
+            if len(self._reach) >= 4096:
+                self._reach.clear()
+            reach = self._reach[key] = self._within(cave, hops)
+        return reach
+
+    def _within(self, cave, hops):
+        return frozenset(_bfs(self.topology, cave, hops)[0])
+
+    def nearest(self, cave, caves):
+        """Returns the distance from `cave` to the closest of `caves`, or None if none is reachable."""
+        goals = set(caves)
+        if not goals:
+            return None
+        if cave in goals:
+            return 0
+        offsets, targets = self.topology.offsets, self.topology.targets
+        seen = {cave}
+        frontier = [cave]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for current in frontier:
+                for i in range(offsets[current], offsets[current + 1]):
+                    neighbor = targets[i]
+                    if neighbor in goals:
+                        return depth
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return None
+
+
+class DenseDistanceIndex(_DistanceIndex):
+    """
+    All-pairs distances and next hops in flat (n + 1) x (n + 1) arrays.
+    Distances are uint8 when the map's diameter allows, otherwise uint16.
+    """
+    def __init__(self, topology):
+        super().__init__(topology)
+        size = self.size = topology.num_caves + 1
+        offsets, targets = topology.offsets, topology.targets
+        distances = [-1] * (size * size)
+        self.next_hops = array("H", bytes(2 * size * size))
+        for source in range(1, size):
+            base = source * size
+            distances[base + source] = 0
+            frontier = [source]
+            while frontier:
+                next_frontier = []
+                for cave in frontier:
+                    d = distances[base + cave] + 1
+                    # The first step towards a cave is inherited along BFS tree edges
+                    step = self.next_hops[base + cave]
+                    for i in range(offsets[cave], offsets[cave + 1]):
+                        neighbor = targets[i]
+                        if distances[base + neighbor] < 0:
+                            distances[base + neighbor] = d
+                            self.next_hops[base + neighbor] = neighbor if cave == source else step
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+        self.unreachable = 0xFF if max(distances) < 0xFF else 0xFFFF
+        self.distances = array("B" if self.unreachable == 0xFF else "H",
+                               [self.unreachable if d < 0 else d for d in distances])
+
+    def distance(self, cave, other):
+        """Returns the number of tunnels between two caves, or None if unreachable."""
+        self._check(cave, other)
+        d = self.distances[cave * self.size + other]
+        return None if d == self.unreachable else d
+
+    def next_hop(self, cave, other):
+        """Returns the first cave on a shortest path from `cave` to `other`."""
+        self._check(cave, other)
+        step = self.next_hops[cave * self.size + other]
+        return step or None
+
+    def adjacent(self, cave, other):
+        if not (0 < cave < self.size and 0 < other < self.size):
+            return False
+        return self.distances[cave * self.size + other] == 1
+
+    def _within(self, cave, hops):
+        base = cave * self.size
+        row = self.distances[base:base + self.size]
+        return frozenset(c for c in range(1, self.size) if row[c] <= hops)
+
+    def nearest(self, cave, caves):
+        best = None
+        for other in caves:
+            d = self.distance(cave, other)
+            if d is not None and (best is None or d < best):
+                best = d
+        return best
+
+
+class LandmarkDistanceIndex(_DistanceIndex):
+    """
+    Distance index for large maps. Stores BFS distances from a few far-apart
+    landmark caves; the triangle inequality then gives O(landmarks) distance
+    bounds and an A* heuristic for exact distances and next hops.
+    """
+    def __init__(self, topology, num_landmarks=4):
+        super().__init__(topology)
+        n = topology.num_caves
+        self.landmarks = []
+        self.tables = []
+        unreachable = 0xFFFFFFFF
+        closest = None
+        landmark = 1
+        offsets, targets = topology.offsets, topology.targets
+        for _ in range(min(num_landmarks, n)):
+            table = array("I", [unreachable]) * (n + 1)
+            table[landmark] = 0
+            frontier = [landmark]
+            d = 0
+            while frontier:
+                d += 1
+                next_frontier = []
+                for cave in frontier:
+                    for i in range(offsets[cave], offsets[cave + 1]):
+                        neighbor = targets[i]
+                        if table[neighbor] == unreachable:
+                            table[neighbor] = d
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            self.landmarks.append(landmark)
+            self.tables.append(table)
+            # Next landmark: the reachable cave farthest from all landmarks so far
+            if closest is None:
+                closest = array("I", table)
+            else:
+                closest = array("I", map(min, closest, table))
+            landmark = max(range(1, n + 1), key=lambda c: closest[c] if closest[c] != unreachable else -1)
+            if closest[landmark] == 0:
+                break
+        self.unreachable = unreachable
+
+    def bounds(self, cave, other):
+        """Returns (lower, upper) bounds on the distance between two caves."""
+        lower, upper = 0, None
+        for table in self.tables:
+            a, b = table[cave], table[other]
+            if a == self.unreachable or b == self.unreachable:
+                continue
+            lower = max(lower, abs(a - b))
+            upper = a + b if upper is None else min(upper, a + b)
+        return lower, upper
+
+    def _heuristic(self, cave, other):
+        return self.bounds(cave, other)[0]
+
+    def _search(self, cave, other):
+        """A* from `cave` to `other`; returns the path as a list of caves, or None."""
+        if cave == other:
+            return [cave]
+        offsets, targets = self.topology.offsets, self.topology.targets
+        came_from = {cave: None}
+        cost = {cave: 0}
+        # Ties go to the deepest cave, so A* runs straight down equally short paths
+        queue = [(self._heuristic(cave, other), 0, cave)]
+        while queue:
+            _, g, current = heapq.heappop(queue)
+            g = -g
+            if current == other:
+                path = [current]
+                while came_from[path[-1]] is not None:
+                    path.append(came_from[path[-1]])
+                path.reverse()
+                return path
+            if g > cost[current]:
+                continue
+            for i in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[i]
+                if neighbor not in cost or g + 1 < cost[neighbor]:
+                    cost[neighbor] = g + 1
+                    came_from[neighbor] = current
+                    heapq.heappush(queue, (g + 1 + self._heuristic(neighbor, other), -g - 1, neighbor))
+        return None
+
+    def distance(self, cave, other):
+        """Returns the number of tunnels between two caves, or None if unreachable."""
+        self._check(cave, other)
+        lower, upper = self.bounds(cave, other)
+        if lower == upper:
+            return lower
+        path = self._search(cave, other)
+        return None if path is None else len(path) - 1
+
+    def next_hop(self, cave, other):
+        """Returns the first cave on a shortest path from `cave` to `other`."""
+        self._check(cave, other)
+        path = self._search(cave, other)
+        return path[1] if path is not None and len(path) > 1 else None
+
+
+def distance_index(topology, dense_limit=DENSE_LIMIT):
+    """
+    Returns the distance index of a topology, built once and cached on it:
+    a dense all-pairs matrix for small maps, landmarks for large ones.
+    """
+    def build():
+        if topology.num_caves <= dense_limit:
+            return DenseDistanceIndex(topology)
+        return LandmarkDistanceIndex(topology)
+    return topology.derived("distance_index", build)
@@ -0,0 +1,88 @@
+import functools
+
+# Hazard kinds tracked by the table
+WUMPUS = 0
+PIT = 1
+BATS = 2
+
+MESSAGES = ("I smell a Wumpus!", "I feel a breeze.", "I hear bats.")
+
+
+@functools.lru_cache(maxsize=None)
+def _messages_for(counts):
+    """
+    Returns the perception messages for a (wumpus, pit, bats) count triple.
+    Messages are grouped by kind in a fixed order rather than listed in
+    neighbor order: the order then tells the player nothing about which
+    tunnel a hazard lies behind.
+    """
+    messages = []
+    for kind, count in enumerate(counts):
+        messages.extend([MESSAGES[kind]] * count)
+    return tuple(messages)
+
+
+class PerceptionTable:
+    """
+    Per-cave table of what the player senses in each cave.
+    Only caves next to a hazard have an entry, so building it costs
+    O(hazards * degree) and a lookup is a single dict access. Tunnels are
+    two-way, so the caves that sense a hazard are the hazard's neighbors.
+    """
+    def __init__(self, topology):
+        self.topology = topology
+        self._counts = {}
+        self._messages = {}
+
+    def build(self, wumpus_locations, pit_locations, bat_locations):
+        """
+        Rebuilds the table for a freshly placed game. All counts are
+        summed first, so every cave's messages are looked up only once.
+        """
+        counts = self._counts
+        counts.clear()
+        self._messages.clear()
+        neighbors = self.topology.neighbors
+        for kind, caves in ((WUMPUS, wumpus_locations), (PIT, pit_locations), (BATS, bat_locations)):
+            for cave in caves:
+                for neighbor in neighbors(cave):
+                    cave_counts = counts.get(neighbor)
+                    if cave_counts is None:
+                        cave_counts = counts[neighbor] = [0, 0, 0]
+                    cave_counts[kind] += 1
+        self._messages.update((cave, _messages_for(tuple(cave_counts))) for cave, cave_counts in counts.items())
+
+    def _update(self, kind, cave, step):
+        """Adds `step` to the `kind` count of every neighbor of `cave`."""
+        for neighbor in self.topology.neighbors(cave):
+            counts = self._counts.get(neighbor)
+            if counts is None:
+                counts = self._counts[neighbor] = [0, 0, 0]
+            counts[kind] += step
+            if any(counts):
+                self._messages[neighbor] = _messages_for(tuple(counts))
+            else:
+                del self._counts[neighbor]
+                del self._messages[neighbor]
+
+    def add(self, kind, cave):
+        """Records a hazard of the given kind in `cave`."""
+        self._update(kind, cave, 1)
+
+    def remove(self, kind, cave):
+        """Forgets a hazard of the given kind in `cave`."""
+        self._update(kind, cave, -1)
+
+    def move(self, kind, old_cave, new_cave):
+        """Moves a hazard, touching only the neighbors of both caves."""
+        if old_cave != new_cave:
+            self.remove(kind, old_cave)
+            self.add(kind, new_cave)
+
+    def counts(self, cave):
+        """Returns how many Wumpus, pit and bat caves are next to `cave`."""
+        return tuple(self._counts.get(cave, (0, 0, 0)))
+
+    def perceptions(self, cave):
+        """Returns the perception messages for a player standing in `cave`."""
+        return self._messages.get(cave, ())
@@ -0,0 +1,302 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+import zlib
+
+MAGIC = b"WUMPPRO1"
+INDEX_MAGIC = b"WUMPIDX1"
+VERSION = 1
+# magic, version, record size
+HEADER = struct.Struct("<8sHH")
+# kind, outcome, radar, planks and bat taxi uses, moves, games, wins, link, currency, time, name
+RECORD = struct.Struct("<BBHHHIIIIqd32s")
+# magic, version, slot size, capacity, players, log records indexed
+INDEX_HEADER = struct.Struct("<8sHHIII")
+# name, 1 + record number of the player's latest snapshot (0: empty slot)
+SLOT = struct.Struct("<32sI")
+NAME_SIZE = 32
+INITIAL_CAPACITY = 1024
+NO_RECORD = 0xFFFFFFFF
+DEFAULT_STORE = "profiles"
+
+# Record kinds
+SNAPSHOT = 1   # career state after an action; link = the player's latest GAME record
+GAME = 2       # a finished game; moves and currency = moves and reward, link = the previous GAME record
+
+OUTCOMES = (None, "won", "wumpus", "pit", "self_shot", "out_of_arrows")
+
+
+class Profile:
+    """Career state of one player, carried from game to game."""
+    __slots__ = ("name", "currency", "radar_uses_left", "plank_uses_left", "bat_taxi_uses_left",
+                 "moves", "games", "wins", "last_game")
+
+    # The fields WumpusGUI keeps under the same names
+    GUI_FIELDS = ("currency", "radar_uses_left", "plank_uses_left", "bat_taxi_uses_left", "moves")
+
+    def __init__(self, name, currency=0, radar_uses_left=0, plank_uses_left=0, bat_taxi_uses_left=0,
+                 moves=0, games=0, wins=0, last_game=NO_RECORD):
+        self.name = name
+        self.currency = currency
+        self.radar_uses_left = radar_uses_left
+        self.plank_uses_left = plank_uses_left
+        self.bat_taxi_uses_left = bat_taxi_uses_left
+        self.moves = moves
+        self.games = games
+        self.wins = wins
+        self.last_game = last_game
+
+    def __repr__(self):
+        return (f"Profile({self.name!r}, currency={self.currency}, radar={self.radar_uses_left}, "
+                f"planks={self.plank_uses_left}, bat_taxi={self.bat_taxi_uses_left}, moves={self.moves}, "
+                f"games={self.games}, wins={self.wins})")
+
+
+class GameEntry:
+    """One finished game of a player's history."""
+    __slots__ = ("outcome", "moves", "reward", "time")
+
+    def __init__(self, outcome, moves, reward, time):
+        self.outcome = outcome
+        self.moves = moves
+        self.reward = reward
+        self.time = time
+
+    def __repr__(self):
+        return f"GameEntry(outcome={self.outcome!r}, moves={self.moves}, reward={self.reward})"
+
+
+def _encode_name(name):
+    encoded = name.encode("utf-8")
+    if not encoded or len(encoded) > NAME_SIZE:
+        raise ValueError(f"Player names must be 1 to {NAME_SIZE} bytes of UTF-8, got {name!r}.")
+    return encoded
+
+
+class ProfileStore:
+    """
+    Player profiles in an append-only log of fixed-width records plus an
+    index. Every save appends one snapshot record and points the player's
+    index slot at it, so a save is one small write and loading a profile
+    reads one record, however long the history is. Finished games are
+    GAME records chained to the player's previous game, so a history is
+    read without scanning other players' records.
+
+    The index is a memory-mapped open-addressing hash table from name to
+    the latest snapshot. It remembers how many log records it covers; on
+    opening, records written after it (e.g. before a crash) are indexed
+    from the log tail, and a partly written last record is cut off.
+    Writes are flushed to the OS, not synced to disk, unless `sync` is True.
+    """
+    def __init__(self, path=DEFAULT_STORE, sync=False):
+        self.log_path = path + ".log"
+        self.index_path = path + ".idx"
+        self.sync = sync
+        exists = os.path.exists(self.log_path) and os.path.getsize(self.log_path) > 0
+        if exists:
+            with open(self.log_path, "rb") as f:
+                magic, version, size = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or size != RECORD.size:
+                raise ValueError(f"{self.log_path} is not a profile log this version can open.")
+        self._log = open(self.log_path, "a+b")
+        if not exists:
+            self._log.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            self._log.flush()
+        self._log.seek(0, os.SEEK_END)
+        self.num_records = (self._log.tell() - HEADER.size) // RECORD.size
+        # A crash can leave part of a record at the end; drop it so appends stay on record boundaries
+        self._log.truncate(HEADER.size + self.num_records * RECORD.size)
+        self._open_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self._log.closed:
+            self._index.close()
+            self._index_file.close()
+            self._log.close()
+
+    # Index
+
+    def _open_index(self):
+        """Maps the index, creating it or catching up with the log when needed."""
+        valid = os.path.exists(self.index_path) and os.path.getsize(self.index_path) >= INDEX_HEADER.size
+        if valid:
+            with open(self.index_path, "rb") as f:
+                magic, version, size, capacity, _, indexed = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            valid = (magic == INDEX_MAGIC and version == VERSION and size == SLOT.size
+                     and os.path.getsize(self.index_path) == INDEX_HEADER.size + capacity * SLOT.size
+                     and indexed <= self.num_records)
+        if not valid:
+            self._write_empty_index(self.index_path, INITIAL_CAPACITY)
+        self._map_index()
+        # Index whatever the log gained since the index was last written
+        for number in range(self._indexed, self.num_records):
+            kind, name = self._read_kind_and_name(number)
+            if kind == SNAPSHOT:
+                self._point(name, number)
+        self._set_indexed(self.num_records)
+
+    @staticmethod
+    def _write_empty_index(path, capacity):
+        with open(path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, SLOT.size, capacity, 0, 0))
+            f.truncate(INDEX_HEADER.size + capacity * SLOT.size)
+
+    def _map_index(self):
+        self._index_file = open(self.index_path, "r+b")
+        self._index = mmap.mmap(self._index_file.fileno(), 0)
+        _, _, _, self._capacity, self._players, self._indexed = INDEX_HEADER.unpack_from(self._index, 0)
+
+    def _set_indexed(self, indexed):
+        self._indexed = indexed
+        struct.pack_into("<II", self._index, INDEX_HEADER.size - 8, self._players, indexed)
+
+    def _find_slot(self, encoded):
+        """Returns (slot, record number + 1) for a name; the number is 0 if the name is not indexed."""
+        index = self._index
+        padded = encoded.ljust(NAME_SIZE, b"\0")
+        slot = zlib.crc32(encoded) % self._capacity
+        while True:
+            name, pointer = SLOT.unpack_from(index, INDEX_HEADER.size + slot * SLOT.size)
+            if pointer == 0 or name == padded:
+                return slot, pointer
+            slot = (slot + 1) % self._capacity
+
+    def _point(self, encoded, number):
+        """Points a name's slot at snapshot record `number`, growing the table past half full."""
+        slot, pointer = self._find_slot(encoded)
+        if pointer == 0:
+            if 2 * (self._players + 1) > self._capacity:
+                self._grow()
+                slot, pointer = self._find_slot(encoded)
+            self._players += 1
+        SLOT.pack_into(self._index, INDEX_HEADER.size + slot * SLOT.size, encoded, number + 1)
+
+    def _grow(self):
+        """Rehashes every slot into a table twice as large and swaps it in atomically."""
+        entries = []
+        for slot in range(self._capacity):
+            name, pointer = SLOT.unpack_from(self._index, INDEX_HEADER.size + slot * SLOT.size)
+            if pointer:
+                entries.append((name.rstrip(b"\0"), pointer))
+        self._index.close()
+        self._index_file.close()
+        temporary = self.index_path + ".tmp"
+        self._write_empty_index(temporary, self._capacity * 2)
+        os.replace(temporary, self.index_path)
+        indexed = self._indexed
+        self._map_index()
+        self._players = 0
+        for name, pointer in entries:
+            slot, _ = self._find_slot(name)
+            SLOT.pack_into(self._index, INDEX_HEADER.size + slot * SLOT.size, name, pointer)
+            self._players += 1
+        self._set_indexed(indexed)
+
+    # Log
+
+    def _append(self, *fields):
+        """Appends one record and returns its number."""
+        self._log.write(RECORD.pack(*fields))
+        self._log.flush()
+        if self.sync:
+            os.fsync(self._log.fileno())
+        number = self.num_records
+        self.num_records += 1
+        return number
+
+    def _read(self, number):
+        # The log is opened for appending, so reading never moves where records are written
+        self._log.seek(HEADER.size + number * RECORD.size)
+        return RECORD.unpack(self._log.read(RECORD.size))
+
+    def _read_kind_and_name(self, number):
+        record = self._read(number)
+        return record[0], record[-1].rstrip(b"\0")
+
+    # Profiles
+
+    def __contains__(self, name):
+        return self._find_slot(_encode_name(name))[1] != 0
+
+    def __len__(self):
+        return self._players
+
+    def names(self):
+        """Returns the names of every player with a profile."""
+        names = []
+        for slot in range(self._capacity):
+            name, pointer = SLOT.unpack_from(self._index, INDEX_HEADER.size + slot * SLOT.size)
+            if pointer:
+                names.append(name.rstrip(b"\0").decode("utf-8"))
+        return sorted(names)
+
+    def load(self, name):
+        """Returns the latest profile of `name`, or a fresh one for a new player."""
+        _, pointer = self._find_slot(_encode_name(name))
+        if pointer == 0:
+            return Profile(name)
+        (_, _, radar, planks, bat_taxi, moves, games, wins, last_game,
+         currency, _, _) = self._read(pointer - 1)
+        return Profile(name, currency, radar, planks, bat_taxi, moves, games, wins, last_game)
+
+    def save(self, profile):
+        """Appends a snapshot of `profile` and makes it the one load() returns."""
+        encoded = _encode_name(profile.name)
+        number = self._append(SNAPSHOT, 0, profile.radar_uses_left, profile.plank_uses_left,
+                              profile.bat_taxi_uses_left, profile.moves, profile.games, profile.wins,
+                              profile.last_game, profile.currency, time.time(), encoded)
+        self._point(encoded, number)
+        self._set_indexed(self.num_records)
+
+    def record_game(self, profile, outcome, moves, reward=0):
+        """
+        Appends a finished game to the player's history and counts it in
+        `profile`, then saves the profile.
+        """
+        encoded = _encode_name(profile.name)
+        profile.last_game = self._append(GAME, OUTCOMES.index(outcome), 0, 0, 0, moves, 0, 0,
+                                         profile.last_game, reward, time.time(), encoded)
+        profile.games += 1
+        profile.wins += outcome == "won"
+        self.save(profile)
+
+    def history(self, name, limit=None):
+        """Returns the finished games of `name`, latest first, following the chain of GAME records."""
+        games = []
+        number = self.load(name).last_game
+        while number != NO_RECORD and (limit is None or len(games) < limit):
+            _, outcome, _, _, _, moves, _, _, previous, reward, when, _ = self._read(number)
+            games.append(GameEntry(OUTCOMES[outcome], moves, reward, when))
+            number = previous
+        return games
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the player profiles of a profile store.")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="profile store path, without .log / .idx")
+    parser.add_argument("--player", default=None, help="show this player's profile and latest games")
+    parser.add_argument("--games", type=int, default=10, help="games of history to show")
+    args = parser.parse_args()
+
+    with ProfileStore(args.store) as store:
+        if args.player is None:
+            for name in store.names():
+                print(store.load(name))
+            print(f"{len(store)} players, {store.num_records:,} records")
+            return
+        print(store.load(args.player))
+        for game in store.history(args.player, args.games):
+            print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(game.time))}  {game.outcome:<14} "
+                  f"{game.moves:>4} moves  +{game.reward}")
+
+
+if __name__ == '__main__':
+    main()
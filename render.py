@@ -0,0 +1,321 @@
+import math
+
+# Colors of the caves on the map, shared by the button and the canvas views
+PLAYER_COLOR = "#34547c"
+NEIGHBOR_COLOR = "#3c6f4c"
+CAVE_COLOR = "#555555"
+# The canvas never zooms out so far that more caves than this are on screen
+MAX_VISIBLE_CAVES = 2500
+# Cave numbers and tunnels are only drawn when a cell is at least this many pixels wide
+LABEL_SCALE = 24
+TUNNEL_SCALE = 12
+# A press that moves further than this many pixels pans instead of clicking
+DRAG_THRESHOLD = 4
+
+
+class WidgetRenderer:
+    """
+    Remembers what was last pushed to each widget and only issues widget
+    calls for values that changed. Every widget touched in a frame counts
+    as one update; the count of the last frame is kept in `last_frame_updates`.
+    """
+    def __init__(self):
+        self._last = {}
+        self.frame_updates = 0
+        self.last_frame_updates = 0
+        self.total_updates = 0
+        self.frames = 0
+
+    def begin_frame(self):
+        self.frame_updates = 0
+
+    def end_frame(self):
+        self.last_frame_updates = self.frame_updates
+        self.total_updates += self.frame_updates
+        self.frames += 1
+
+    def invalidate(self, prefix=None):
+        """Forgets remembered values (all of them, or the keys starting with `prefix`)."""
+        if prefix is None:
+            self._last.clear()
+        else:
+            for key in [k for k in self._last if k[0] == prefix]:
+                del self._last[key]
+
+    def _changed(self, key, value):
+        if key in self._last and self._last[key] == value:
+            return False
+        self._last[key] = value
+        return True
+
+    def configure(self, widget, key, **options):
+        """Configures only the options whose value differs from the last frame."""
+        changed = {name: value for name, value in options.items() if self._changed((key, name), value)}
+        if changed:
+            widget.configure(**changed)
+            self.frame_updates += 1
+
+    def visible(self, widget, key, shown, **pack_options):
+        """Packs or unpacks a widget when its visibility changes."""
+        if self._changed((key, "visible"), shown):
+            if shown:
+                widget.pack(**pack_options)
+            else:
+                widget.pack_forget()
+            self.frame_updates += 1
+
+    def is_visible(self, key):
+        return self._last.get((key, "visible"), False)
+
+    def option_menu(self, menu, key, values, state):
+        """Updates an option menu's choices and resets its selection only when the choices change."""
+        values = list(values)
+        if self._changed((key, "values"), values):
+            menu.configure(values=values, state=state)
+            menu.set(values[0])
+            self._last[(key, "state")] = state
+            self.frame_updates += 1
+        else:
+            self.configure(menu, key, state=state)
+
+    def text(self, textbox, key, text):
+        """Rewrites a read-only textbox only when its text changed."""
+        if self._changed((key, "text"), text):
+            textbox.configure(state="normal")
+            textbox.delete("0.0", "end")
+            textbox.insert("end", text)
+            textbox.configure(state="disabled")
+            self.frame_updates += 1
+
+
+class Viewport:
+    """
+    Pan and zoom state of a map drawn on a canvas. Cave (row, col) owns the
+    world square [col, col + 1) x [row, row + 1); `scale` is the size of a
+    square in pixels and (x, y) the world point in the top-left corner.
+    """
+    def __init__(self, width, height, scale=60.0, max_scale=120.0, max_visible=MAX_VISIBLE_CAVES):
+        self.width = width
+        self.height = height
+        self.max_scale = max_scale
+        self.max_visible = max_visible
+        self.x = 0.0
+        self.y = 0.0
+        self.scale = self._clamp(scale)
+
+    @property
+    def min_scale(self):
+        """Smallest scale that keeps at most max_visible caves on screen."""
+        return math.sqrt(self.width * self.height / self.max_visible)
+
+    def _clamp(self, scale):
+        return min(max(scale, self.min_scale), self.max_scale)
+
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.scale = self._clamp(self.scale)
+
+    def to_screen(self, wx, wy):
+        return (wx - self.x) * self.scale, (wy - self.y) * self.scale
+
+    def to_world(self, sx, sy):
+        return self.x + sx / self.scale, self.y + sy / self.scale
+
+    def pan(self, dx, dy):
+        """Moves the view by (dx, dy) screen pixels."""
+        self.x -= dx / self.scale
+        self.y -= dy / self.scale
+
+    def zoom(self, factor, sx, sy):
+        """Zooms by `factor`, keeping the world point under screen point (sx, sy) in place."""
+        wx, wy = self.to_world(sx, sy)
+        self.scale = self._clamp(self.scale * factor)
+        self.x = wx - sx / self.scale
+        self.y = wy - sy / self.scale
+
+    def center_on(self, wx, wy):
+        self.x = wx - self.width / self.scale / 2
+        self.y = wy - self.height / self.scale / 2
+
+    def shows(self, row, col, margin=0):
+        """Returns True if the square of (row, col) lies inside the view, `margin` squares in from the edges."""
+        return (self.x + margin <= col and col + 1 <= self.x + (self.width / self.scale) - margin
+                and self.y + margin <= row and row + 1 <= self.y + (self.height / self.scale) - margin)
+
+    def cell_range(self, rows, cols):
+        """Returns the (first row, end row, first col, end col) of the squares at least partly in view."""
+        row0 = max(0, math.floor(self.y))
+        col0 = max(0, math.floor(self.x))
+        row1 = min(rows, math.ceil(self.y + self.height / self.scale))
+        col1 = min(cols, math.ceil(self.x + self.width / self.scale))
+        return row0, max(row0, row1), col0, max(col0, col1)
+
+
+class CanvasMapView:
+    """
+    Draws a cave map on a single canvas instead of one button per cave.
+    Only the caves inside the viewport, plus the player and their
+    neighbors, get canvas items, so a frame costs O(caves on screen) however
+    large the map is. Clicks are mapped to caves by hit-testing the world
+    grid; dragging pans and the mouse wheel zooms.
+    """
+    def __init__(self, canvas, topology, on_click, width, height):
+        self.canvas = canvas
+        self.topology = topology
+        self.on_click = on_click
+        self.viewport = Viewport(width, height)
+        # cave -> (circle item, label item or None) of every cave drawn
+        self.items = {}
+        self.styles = {}
+        self.player = None
+        self.neighbors = ()
+        self._dirty = True
+        self._press = None
+        self._dragging = False
+        canvas.bind("<ButtonPress-1>", self._on_press)
+        canvas.bind("<B1-Motion>", self._on_drag)
+        canvas.bind("<ButtonRelease-1>", self._on_release)
+        canvas.bind("<MouseWheel>", self._on_wheel)
+        canvas.bind("<Button-4>", lambda event: self._zoom_at(event, 1.25))
+        canvas.bind("<Button-5>", lambda event: self._zoom_at(event, 0.8))
+        canvas.bind("<Configure>", self._on_resize)
+
+    def visible_caves(self):
+        """Returns the caves inside the viewport, in row-major order."""
+        topology = self.topology
+        row0, row1, col0, col1 = self.viewport.cell_range(topology.rows, topology.cols)
+        caves = []
+        for row in range(row0, row1):
+            for col in range(col0, col1):
+                cave = topology.cave_at(row, col)
+                if cave is not None:
+                    caves.append(cave)
+        return caves
+
+    def cave_at(self, sx, sy):
+        """Returns the cave drawn under screen point (sx, sy), or None."""
+        wx, wy = self.viewport.to_world(sx, sy)
+        row, col = math.floor(wy), math.floor(wx)
+        cave = self.topology.cave_at(row, col)
+        if cave is None:
+            return None
+        # Only the circle counts, not the gap around it
+        if (wx - col - 0.5) ** 2 + (wy - row - 0.5) ** 2 > 0.4 ** 2:
+            return None
+        return cave
+
+    def show(self, player, neighbors):
+        """
+        Shows the player's cave and neighbors. Scrolls to the player when
+        they left the view; otherwise only restyles the caves whose style changed.
+        """
+        row, col = self.topology.position(player)
+        if not self.viewport.shows(row, col, margin=1):
+            self.viewport.center_on(col + 0.5, row + 0.5)
+            self._dirty = True
+        neighbors = tuple(neighbors)
+        moved = player != self.player or neighbors != self.neighbors
+        self.player = player
+        self.neighbors = neighbors
+        if self._dirty:
+            self.redraw()
+        elif moved:
+            self._restyle()
+
+    def _style(self, cave):
+        if cave == self.player:
+            return PLAYER_COLOR
+        if cave in self.neighbors:
+            return NEIGHBOR_COLOR
+        return CAVE_COLOR
+
+    def redraw(self):
+        """Deletes every map item and draws the caves in view, the player's tunnels and their neighbors."""
+        canvas = self.canvas
+        viewport = self.viewport
+        topology = self.topology
+        canvas.delete("map")
+        self.items = {}
+        self.styles = {}
+        caves = self.visible_caves()
+        drawn = set(caves)
+        if self.player is not None:
+            for cave in (self.player, *self.neighbors):
+                if cave not in drawn:
+                    caves.append(cave)
+                    drawn.add(cave)
+        radius = 0.4 * viewport.scale
+        if viewport.scale >= TUNNEL_SCALE:
+            for cave in drawn:
+                x, y = self._center(cave)
+                for neighbor in topology.neighbors(cave):
+                    if neighbor > cave and neighbor in drawn:
+                        canvas.create_line(x, y, *self._center(neighbor), fill="#3a3a3a", tags="map")
+        for cave in caves:
+            x, y = self._center(cave)
+            style = self._style(cave)
+            circle = canvas.create_oval(x - radius, y - radius, x + radius, y + radius,
+                                        fill=style, outline="", tags="map")
+            label = None
+            if viewport.scale >= LABEL_SCALE:
+                label = canvas.create_text(x, y, text=str(cave), fill="white",
+                                           font=("TkDefaultFont", max(8, int(viewport.scale / 4)), "bold"),
+                                           tags="map")
+            self.items[cave] = (circle, label)
+            self.styles[cave] = style
+        self._dirty = False
+
+    def _restyle(self):
+        """Recolors the drawn caves whose style changed; draws a fresh view if a neighbor is missing."""
+        for cave in (self.player, *self.neighbors):
+            if cave not in self.items:
+                self.redraw()
+                return
+        for cave, (circle, _) in self.items.items():
+            style = self._style(cave)
+            if self.styles[cave] != style:
+                self.canvas.itemconfigure(circle, fill=style)
+                self.styles[cave] = style
+
+    def _center(self, cave):
+        row, col = self.topology.position(cave)
+        return self.viewport.to_screen(col + 0.5, row + 0.5)
+
+    def _on_press(self, event):
+        self._press = (event.x, event.y)
+        self._dragging = False
+
+    def _on_drag(self, event):
+        if self._press is None:
+            return
+        dx, dy = event.x - self._press[0], event.y - self._press[1]
+        if not self._dragging and abs(dx) + abs(dy) <= DRAG_THRESHOLD:
+            return
+        self._dragging = True
+        self._press = (event.x, event.y)
+        self.viewport.pan(dx, dy)
+        # Panning moves every item, which is cheaper than recreating them
+        self.canvas.move("map", dx, dy)
+        self._dirty = True
+
+    def _on_release(self, event):
+        if self._dragging:
+            self.redraw()
+        else:
+            cave = self.cave_at(event.x, event.y)
+            if cave is not None:
+                self.on_click(cave)
+        self._press = None
+        self._dragging = False
+
+    def _on_wheel(self, event):
+        self._zoom_at(event, 1.25 if event.delta > 0 else 0.8)
+
+    def _zoom_at(self, event, factor):
+        self.viewport.zoom(factor, event.x, event.y)
+        self.redraw()
+
+    def _on_resize(self, event):
+        self.viewport.resize(event.width, event.height)
+        self.redraw()
@@ -0,0 +1,405 @@
+import mmap
+import os
+import struct
+
+MAGIC = b"WUMPLOG1"
+VERSION = 1
+# magic, version, record size, keyframe interval
+HEADER = struct.Struct("<8sHHI")
+# kind, outcome, flags, path length, arrows, detail, game, player, wumpus, 5 path caves
+RECORD = struct.Struct("<BBBBHHIII5I")
+MAX_PATH = 5
+
+# Record kinds
+GAME_START = 1   # a new game: player, wumpus and arrows at the start
+PITS = 2         # up to 5 pit caves of the current game in `path`
+BATS = 3         # up to 5 bat caves of the current game in `path`
+MOVE = 4         # move_player(path[0])
+SHOOT = 5        # shoot_arrow(path[:path_len])
+RADAR = 6        # radar scan of path[0], hazard code in `detail`
+BAT_TAXI = 7     # bat taxi ride to path[0]
+KEYFRAME = 8     # state before the next record; path = (game start record, action number, WUMPUSES group)
+WUMPUSES = 9     # up to 5 caves of the Wumpuses after the first; a group of these follows the
+                 # placement and every action that moves or kills one (`wumpus` holds the first)
+
+# Flags
+FLAG_GAME_OVER = 1
+FLAG_INVALID = 2       # move to a cave that is not connected
+FLAG_PLANKS = 4        # fell into a pit and used the planks
+FLAG_BAT_TAXI = 8      # bats picked the player up for the taxi
+
+OUTCOMES = (None, "won", "wumpus", "pit", "self_shot", "out_of_arrows")
+HAZARDS = (None, "wumpus", "pit", "bats")
+NO_GAME = 0xFFFFFFFF
+
+
+def _read_group(f, start, num_records):
+    """Reads the caves of the WUMPUSES group at record `start` of an open log, skipping keyframes."""
+    caves = []
+    for index in range(start, num_records):
+        f.seek(HEADER.size + index * RECORD.size)
+        record = RECORD.unpack(f.read(RECORD.size))
+        if record[0] == KEYFRAME:
+            continue
+        if record[0] != WUMPUSES:
+            break
+        caves.extend(record[9:9 + record[3]])
+    return caves
+
+
+class ReplayState:
+    """Game state reconstructed from a replay log."""
+    __slots__ = ("game", "action", "player_location", "wumpus_location", "wumpus_locations", "num_arrows",
+                 "pit_locations", "bat_locations", "game_over", "outcome")
+
+    def __init__(self, game, action, player_location, wumpus_location, num_arrows,
+                 pit_locations, bat_locations, game_over, outcome, wumpus_locations=None):
+        self.game = game
+        self.action = action
+        self.player_location = player_location
+        self.wumpus_location = wumpus_location
+        self.wumpus_locations = [wumpus_location] if wumpus_locations is None else wumpus_locations
+        self.num_arrows = num_arrows
+        self.pit_locations = pit_locations
+        self.bat_locations = bat_locations
+        self.game_over = game_over
+        self.outcome = outcome
+
+    def __repr__(self):
+        return (f"ReplayState(game={self.game}, action={self.action}, player={self.player_location}, "
+                f"wumpus={self.wumpus_location}, arrows={self.num_arrows}, game_over={self.game_over})")
+
+
+class ReplayWriter:
+    """
+    Append-only writer of fixed-width binary action records.
+    Every `keyframe_interval`-th record is a keyframe, so a reader can find
+    any action with a binary search instead of replaying from the start.
+    Attach it to a game with HuntTheWumpus(recorder=writer).
+    """
+    def __init__(self, path, keyframe_interval=256):
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "rb") as f:
+                magic, version, size, keyframe_interval = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION or size != RECORD.size:
+                raise ValueError(f"{path} is not a replay log this version can append to.")
+        # Readers find keyframes at every multiple of the interval, so records must fit in between
+        if keyframe_interval < 2:
+            raise ValueError(f"keyframe_interval must be at least 2, got {keyframe_interval}.")
+        self.keyframe_interval = keyframe_interval
+        self._file = open(path, "ab")
+        if not exists:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, keyframe_interval))
+        self._count = (self._file.tell() - HEADER.size) // RECORD.size
+        self.game = -1
+        self._game_start = 0
+        self._action = 0
+        self._state = None
+        # First record of the latest WUMPUSES group of this game (0: none) and the caves it lists
+        self._wumpuses = 0
+        self._extra = ()
+        if self._count:
+            self._resume(path)
+
+    def _resume(self, path):
+        """
+        Restores the last game of an existing log: its number, start record,
+        action count, state and Wumpuses, so keyframes written from now on
+        describe it. Reads back to the game's start or its latest keyframe,
+        whichever is nearer.
+        """
+        with open(path, "rb") as f:
+            index = self._count - 1
+            f.seek(HEADER.size + index * RECORD.size)
+            last_game = RECORD.unpack(f.read(RECORD.size))[6]
+            if last_game == NO_GAME:
+                return
+            self.game = last_game
+            actions = 0
+            # The latest WUMPUSES group met going backwards, and whether we are still inside it
+            group, in_group = None, False
+            while index >= 0:
+                f.seek(HEADER.size + index * RECORD.size)
+                record = RECORD.unpack(f.read(RECORD.size))
+                kind, outcome, flags, _, arrows, _, game, player, wumpus, start, action, wumpuses = record[:12]
+                index -= 1
+                if game != last_game:
+                    continue
+                if kind == WUMPUSES:
+                    if group is None or in_group:
+                        group, in_group = index + 1, True
+                    continue
+                if kind in (PITS, BATS):
+                    in_group = False
+                    continue
+                if self._state is None and kind != GAME_START:
+                    self._state = (player, wumpus, arrows, flags & FLAG_GAME_OVER, outcome)
+                if kind == KEYFRAME:
+                    # A keyframe inside a group points at the group's start
+                    self._wumpuses = group if group is not None and not in_group else wumpuses
+                    self._game_start, self._action = start, action + actions
+                    break
+                in_group = False
+                if kind == GAME_START:
+                    if self._state is None:
+                        self._state = (player, wumpus, arrows, 0, 0)
+                    self._wumpuses = group or 0
+                    self._game_start, self._action = index + 1, actions
+                    break
+                actions += 1
+            if self._wumpuses:
+                self._extra = tuple(_read_group(f, self._wumpuses, self._count))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def _write(self, kind, outcome=0, flags=0, path=(), arrows=0, detail=0, player=0, wumpus=0):
+        if self._count % self.keyframe_interval == 0:
+            self._write_keyframe()
+        caves = [cave & NO_GAME for cave in path[:MAX_PATH]] + [0] * (MAX_PATH - min(len(path), MAX_PATH))
+        game = self.game if self.game >= 0 else NO_GAME
+        self._file.write(RECORD.pack(kind, outcome, flags, min(len(path), MAX_PATH), arrows, detail,
+                                     game, player, wumpus, *caves))
+        self._count += 1
+
+    def _write_keyframe(self):
+        game = self.game if self.game >= 0 else NO_GAME
+        player, wumpus, arrows, flags, outcome = self._state or (0, 0, 0, 0, 0)
+        # While a group is being written the keyframe points at it; due before its first record, that is next
+        wumpuses = self._count + 1 if self._wumpuses is None else self._wumpuses
+        self._file.write(RECORD.pack(KEYFRAME, outcome, flags, 3, arrows, 0, game, player, wumpus,
+                                     self._game_start, self._action, wumpuses, 0, 0))
+        self._count += 1
+
+    def _write_wumpuses(self, extra):
+        """Writes a WUMPUSES group listing `extra`, the caves of every Wumpus after the first."""
+        self._wumpuses = None
+        for i in range(0, max(len(extra), 1), MAX_PATH):
+            self._write(WUMPUSES, path=extra[i:i + MAX_PATH])
+            if self._wumpuses is None:
+                self._wumpuses = self._count - 1
+        self._extra = extra
+
+    def _after(self, game, kind, path, flags=0, detail=0):
+        """Writes an action record carrying the state after the action."""
+        if self.game < 0:
+            raise ValueError("Call start_game() before recording actions.")
+        if game.game_over:
+            flags |= FLAG_GAME_OVER
+        outcome = OUTCOMES.index(game.outcome)
+        self._write(kind, outcome, flags, path, game.num_arrows, detail,
+                    game.player_location, game.wumpus_location)
+        self._action += 1
+        self._state = (game.player_location, game.wumpus_location, game.num_arrows,
+                       flags & FLAG_GAME_OVER, outcome)
+        extra = tuple(game.wumpus_locations[1:])
+        if extra != self._extra:
+            self._write_wumpuses(extra)
+
+    def start_game(self, game):
+        """Records the placement of a freshly (re)started game."""
+        # A keyframe due right here still describes the previous game
+        if self._count % self.keyframe_interval == 0:
+            self._write_keyframe()
+        self.game += 1
+        self._action = 0
+        self._state = (game.player_location, game.wumpus_location, game.num_arrows, 0, 0)
+        self._game_start = self._count
+        self._wumpuses, self._extra = 0, ()
+        self._write(GAME_START, path=(), arrows=game.num_arrows,
+                    player=game.player_location, wumpus=game.wumpus_location)
+        for kind, caves in ((PITS, game.pit_locations), (BATS, game.bat_locations)):
+            for i in range(0, len(caves), MAX_PATH):
+                self._write(kind, path=caves[i:i + MAX_PATH])
+        if len(game.wumpus_locations) > 1:
+            self._write_wumpuses(tuple(game.wumpus_locations[1:]))
+
+    def record_move(self, game, destination, result, valid=True):
+        """Records a move_player call and its result."""
+        flags = 0 if valid else FLAG_INVALID
+        if result == "planks":
+            flags |= FLAG_PLANKS
+        elif result == "bat_taxi":
+            flags |= FLAG_BAT_TAXI
+        self._after(game, MOVE, (destination,), flags)
+
+    def record_shot(self, game, target_path):
+        """Records a shoot_arrow call."""
+        self._after(game, SHOOT, list(target_path or ()))
+
+    def record_radar(self, game, cave, hazard):
+        """Records a radar scan and what it found."""
+        self._after(game, RADAR, (cave,), detail=HAZARDS.index(hazard))
+
+    def record_bat_taxi(self, game, destination, result):
+        """Records a bat taxi ride and its result."""
+        self._after(game, BAT_TAXI, (destination,), FLAG_PLANKS if result == "planks" else 0)
+
+
+class ReplayReader:
+    """
+    Memory-mapped reader of a replay log.
+    Records are unpacked straight from the mapping without copying the file,
+    and state_at() jumps to any action through the keyframes.
+    """
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, self.keyframe_interval = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or size != RECORD.size:
+            raise ValueError(f"{path} is not a replay log.")
+        self.view = memoryview(self._map)[HEADER.size:]
+        self.num_records = len(self.view) // RECORD.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            # Arrays from as_array() still point into the map; it closes once they are gone
+            pass
+        self._file.close()
+
+    def __len__(self):
+        return self.num_records
+
+    def record(self, index):
+        """Returns the fields of one record as a tuple."""
+        return RECORD.unpack_from(self.view, index * RECORD.size)
+
+    def records(self, start=0, stop=None):
+        """Iterates over record tuples, unpacked directly from the mapping."""
+        stop = self.num_records if stop is None else min(stop, self.num_records)
+        return RECORD.iter_unpack(self.view[start * RECORD.size:stop * RECORD.size])
+
+    def as_array(self):
+        """Returns a zero-copy NumPy structured array over all records (needs NumPy)."""
+        import numpy as np
+
+        dtype = np.dtype([
+            ("kind", "u1"), ("outcome", "u1"), ("flags", "u1"), ("path_len", "u1"),
+            ("arrows", "<u2"), ("detail", "<u2"), ("game", "<u4"), ("player", "<u4"),
+            ("wumpus", "<u4"), ("path", "<u4", (MAX_PATH,)),
+        ])
+        return np.frombuffer(self.view[:self.num_records * RECORD.size], dtype=dtype)
+
+    def _keyframe_key(self, index):
+        record = self.record(index)
+        game = -1 if record[6] == NO_GAME else record[6]
+        return game, record[10]
+
+    def _find_keyframe(self, game, action):
+        """Binary searches the keyframes for the last one at or before (game, action)."""
+        low, high = 0, (self.num_records - 1) // self.keyframe_interval
+        while low < high:
+            mid = (low + high + 1) // 2
+            if self._keyframe_key(mid * self.keyframe_interval) <= (game, action):
+                low = mid
+            else:
+                high = mid - 1
+        return low * self.keyframe_interval
+
+    def state_at(self, game, action):
+        """
+        Returns the ReplayState of `game` after its first `action` actions
+        (0 is the freshly placed game). Reads at most one keyframe interval
+        of records plus the game's placement records.
+        """
+        if self.num_records == 0:
+            raise ValueError("The replay log is empty.")
+        index = self._find_keyframe(game, action)
+        keyframe = self.record(index)
+        start = keyframe[9] if keyframe[6] == game else None
+        done = keyframe[10] if keyframe[6] == game else 0
+        state = None
+        # Caves of the Wumpuses after the first; None in games with a single Wumpus
+        extra = None
+        if start is not None:
+            pits, bats, extra = self._placement(start)
+            if keyframe[11]:
+                extra = self._wumpus_group(keyframe[11])
+            state = ReplayState(game, done, keyframe[7], keyframe[8], keyframe[4], pits, bats,
+                                bool(keyframe[2] & FLAG_GAME_OVER), OUTCOMES[keyframe[1]],
+                                [keyframe[8]] + (extra or []))
+
+        for i in range(index + 1, self.num_records):
+            record = self.record(i)
+            kind, outcome, flags, _, arrows, _, record_game, player, wumpus = record[:9]
+            if kind in (KEYFRAME, PITS, BATS, WUMPUSES):
+                continue
+            if record_game > game:
+                break
+            if record_game < game:
+                continue
+            if kind == GAME_START:
+                pits, bats, extra = self._placement(i)
+                state = ReplayState(game, 0, player, wumpus, arrows, pits, bats, False, None,
+                                    [wumpus] + (extra or []))
+                done = 0
+            elif state is not None:
+                if done == action:
+                    break
+                done += 1
+                if extra is not None:
+                    group = self._wumpus_group(i + 1)
+                    if group is not None:
+                        extra = group
+                state.action = done
+                state.player_location = player
+                state.wumpus_location = wumpus
+                state.wumpus_locations = [wumpus] + (extra or [])
+                state.num_arrows = arrows
+                state.game_over = bool(flags & FLAG_GAME_OVER)
+                state.outcome = OUTCOMES[outcome]
+            if state is not None and done == action:
+                break
+
+        if state is None or state.action != action:
+            raise IndexError(f"Game {game} has no action {action} in this log.")
+        return state
+
+    def _placement(self, start):
+        """
+        Collects the pit and bat caves written after the GAME_START record at
+        `start`, and the caves of the Wumpuses after the first (None if the
+        game has a single Wumpus).
+        """
+        pits, bats = [], []
+        for i in range(start + 1, self.num_records):
+            kind, _, _, length = self.record(i)[:4]
+            if kind == KEYFRAME:
+                continue
+            if kind not in (PITS, BATS):
+                return pits, bats, self._wumpus_group(i)
+            caves = list(self.record(i)[9:9 + length])
+            (pits if kind == PITS else bats).extend(caves)
+        return pits, bats, None
+
+    def _wumpus_group(self, start):
+        """Collects the caves of the WUMPUSES group at record `start`, or None if no group starts there."""
+        caves = None
+        for i in range(start, self.num_records):
+            kind, _, _, length = self.record(i)[:4]
+            if kind == KEYFRAME:
+                continue
+            if kind != WUMPUSES:
+                break
+            caves = (caves or []) + list(self.record(i)[9:9 + length])
+        return caves
@@ -0,0 +1,308 @@
+import argparse
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from belief import BeliefAgent
+from mcts import MCTSAgent
+from rng import make_rng
+from scenario import get_scenario
+from topology import classic, get_topology
+from tournament import RunningStats, play_game, random_agent
+from wumpus import HuntTheWumpus
+
+# Columns of a per-game result, in file order
+FIELDS = ("seed", "topology", "scenario", "agent", "outcome", "moves", "arrows_used", "purchases", "currency")
+# The GUI's store price for planks and its win reward max(base - moves * per_move, floor)
+PLANKS_PRICE = 75
+REWARD_BASE = 100
+REWARD_PER_MOVE = 2
+REWARD_FLOOR = 10
+# Games played per worker task; also how often a career's wallet starts over
+DEFAULT_CHUNK = 5000
+
+
+def game_seed(seed, index):
+    """Seed of game `index` of a run, so any single game can be replayed on its own."""
+    return seed * 1_000_003 + index
+
+
+class Wallet:
+    """
+    Currency and planks a player carries from game to game. Before every
+    game the player buys planks when they have none and can afford them;
+    winning pays the GUI's reward.
+    """
+    def __init__(self):
+        self.currency = 0
+        self.planks = 0
+
+    def shop(self):
+        """Buys what the player needs for the next game and returns the number of purchases."""
+        if self.planks == 0 and self.currency >= PLANKS_PRICE:
+            self.currency -= PLANKS_PRICE
+            self.planks += 1
+            return 1
+        return 0
+
+    def award(self, moves):
+        self.currency += max(REWARD_BASE - moves * REWARD_PER_MOVE, REWARD_FLOOR)
+
+
+def _label(topology):
+    return topology.name + "".join(f"-{param}" for param in topology.params)
+
+
+def _play_chunk(agent, agent_name, start, count, seed, topology, initial_arrows, max_moves, rng_kind, scenario):
+    """
+    Plays games start .. start + count - 1 as one career and returns their
+    results as tuples in FIELDS order. Tuples pickle much smaller than dicts.
+    """
+    topology_label = _label(topology)
+    scenario_name = scenario.name if scenario is not None else "classic"
+    game = HuntTheWumpus(initial_arrows=initial_arrows, topology=topology,
+                         rng=make_rng(game_seed(seed, start), rng_kind), scenario=scenario)
+    wallet = Wallet()
+    rows = []
+    for index in range(start, start + count):
+        if index != start:
+            game.rng.seed(game_seed(seed, index))
+            game.reset()
+        purchases = wallet.shop()
+        outcome, moves = play_game(game, agent, max_moves, wallet)
+        if outcome == "won":
+            wallet.award(moves)
+        rows.append((game_seed(seed, index), topology_label, scenario_name, agent_name, outcome, moves,
+                     initial_arrows - game.num_arrows, purchases, wallet.currency))
+    return rows
+
+
+def game_results(agent, num_games, workers=1, seed=0, topology=None, initial_arrows=5, max_moves=1000,
+                 rng_kind="mt", scenario=None, agent_name=None, chunk_size=DEFAULT_CHUNK):
+    """
+    Yields one result dict per game, with the keys of FIELDS, in game order.
+    Games are played in chunks of `chunk_size`, spread over a process pool
+    when `workers` > 1. At most two chunks per worker are in flight, so
+    memory stays flat however many games are played. The same seed and
+    chunk size always give the same results, whatever the worker count.
+    """
+    topology = topology if topology is not None else classic()
+    agent_name = agent_name or getattr(agent, "__name__", type(agent).__name__)
+    args = (seed, topology, initial_arrows, max_moves, rng_kind, scenario)
+    starts = range(0, num_games, chunk_size)
+    if workers <= 1:
+        for start in starts:
+            for row in _play_chunk(agent, agent_name, start, min(chunk_size, num_games - start), *args):
+                yield dict(zip(FIELDS, row))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        starts = iter(starts)
+        while True:
+            while len(pending) < 2 * workers:
+                start = next(starts, None)
+                if start is None:
+                    break
+                pending.append(pool.submit(_play_chunk, agent, agent_name, start,
+                                           min(chunk_size, num_games - start), *args))
+            if not pending:
+                return
+            for row in pending.pop(0).result():
+                yield dict(zip(FIELDS, row))
+
+
+def where(results, **conditions):
+    """
+    Yields the results whose fields equal the given values; a list or tuple
+    value matches any of its items, e.g. where(results, outcome=("pit", "wumpus")).
+    """
+    tests = [(field, set(value) if isinstance(value, (list, tuple, set)) else {value})
+             for field, value in conditions.items()]
+    for result in results:
+        if all(result[field] in allowed for field, allowed in tests):
+            yield result
+
+
+class GroupStats:
+    """
+    Streaming per-group aggregates: games, wins and running stats of the
+    numeric fields. Only one small record per group is kept, never the games.
+    """
+    NUMERIC = ("moves", "arrows_used", "purchases", "currency")
+
+    def __init__(self, by=()):
+        self.by = tuple(by)
+        self.groups = {}
+
+    def add(self, result):
+        key = tuple(result[field] for field in self.by)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = [0, 0] + [RunningStats() for _ in self.NUMERIC]
+        group[0] += 1
+        group[1] += result["outcome"] == "won"
+        for stats, field in zip(group[2:], self.NUMERIC):
+            stats.add(result[field])
+
+    def observe(self, results):
+        """Aggregates results while passing them on, so one pass can both aggregate and write."""
+        for result in results:
+            self.add(result)
+            yield result
+
+    def rows(self):
+        """Returns one dict per group, sorted by the group key."""
+        rows = []
+        for key, (games, wins, *stats) in sorted(self.groups.items(), key=lambda item: str(item[0])):
+            row = dict(zip(self.by, key))
+            row["games"] = games
+            row["win_rate"] = wins / games
+            for field, running in zip(self.NUMERIC, stats):
+                row[field + "_mean"] = running.mean
+            row["currency_max"] = stats[-1].max
+            rows.append(row)
+        return rows
+
+
+class CsvWriter:
+    """Writes results to a CSV file in chunks of `chunk_size` rows."""
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(FIELDS)
+        self._buffer = []
+
+    def write(self, result):
+        self._buffer.append([result[field] for field in FIELDS])
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        self._writer.writerows(self._buffer)
+        self._buffer.clear()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+class ParquetWriter:
+    """
+    Writes results to a Parquet file, one row group per chunk of
+    `chunk_size` rows. Needs pyarrow.
+    """
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Writing Parquet needs pyarrow: pip install pyarrow")
+        self.pa = pyarrow
+        self.schema = pyarrow.schema([
+            ("seed", pyarrow.int64()), ("topology", pyarrow.string()), ("scenario", pyarrow.string()),
+            ("agent", pyarrow.string()), ("outcome", pyarrow.string()), ("moves", pyarrow.int32()),
+            ("arrows_used", pyarrow.int32()), ("purchases", pyarrow.int32()), ("currency", pyarrow.int64()),
+        ])
+        self.path = path
+        self.chunk_size = chunk_size
+        self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self._columns = {field: [] for field in FIELDS}
+        self._size = 0
+
+    def write(self, result):
+        for field in FIELDS:
+            self._columns[field].append(result[field])
+        self._size += 1
+        if self._size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._size:
+            self._writer.write_table(self.pa.Table.from_pydict(self._columns, schema=self.schema))
+            for column in self._columns.values():
+                column.clear()
+            self._size = 0
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "parquet": ParquetWriter}
+
+
+def run_pipeline(results, writer=None, stats=None, progress=None, every=100000):
+    """
+    Drains a result stream into a writer and a GroupStats, each optional.
+    Calls progress(games, seconds) every `every` games. Returns
+    (games, seconds); throughput is games / seconds.
+    """
+    if stats is not None:
+        results = stats.observe(results)
+    start = time.perf_counter()
+    games = 0
+    try:
+        for result in results:
+            if writer is not None:
+                writer.write(result)
+            games += 1
+            if progress is not None and games % every == 0:
+                progress(games, time.perf_counter() - start)
+    finally:
+        if writer is not None:
+            writer.close()
+    return games, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream per-game results of a simulation campaign to a file.")
+    parser.add_argument("--games", type=int, default=100000, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="base seed of the campaign")
+    parser.add_argument("--agent", choices=("random", "belief", "mcts"), default="random", help="which agent plays")
+    parser.add_argument("--topology", default="grid", help="topology name, e.g. grid, torus, dodecahedron")
+    parser.add_argument("--size", type=int, nargs="*", default=[], help="topology parameters, e.g. 4 5")
+    parser.add_argument("--scenario", default="classic", help="hazard scenario: classic, pack or dense")
+    parser.add_argument("--rng", default="mt", help="generator kind: mt, counter, pcg64 or philox")
+    parser.add_argument("--max-moves", type=int, default=1000, help="moves before a game counts as a timeout")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK, help="games per task and rows per write")
+    parser.add_argument("--out", default=None, help="file to write the per-game results to")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv", help="format of --out")
+    parser.add_argument("--where", nargs="*", default=[], metavar="FIELD=VALUE",
+                        help="keep only matching games, e.g. outcome=won")
+    parser.add_argument("--group-by", nargs="*", default=["outcome"], help="fields to aggregate by")
+    args = parser.parse_args()
+
+    if args.agent == "mcts":
+        # A fixed iteration count keeps MCTS campaigns reproducible
+        agent = MCTSAgent(time_budget=None, iterations=300)
+    else:
+        agent = BeliefAgent() if args.agent == "belief" else random_agent
+    results = game_results(agent, args.games, args.workers, args.seed,
+                           get_topology(args.topology, *args.size), max_moves=args.max_moves,
+                           rng_kind=args.rng, scenario=get_scenario(args.scenario), agent_name=args.agent,
+                           chunk_size=args.chunk_size)
+    conditions = {}
+    for condition in args.where:
+        field, _, value = condition.partition("=")
+        if field not in FIELDS:
+            parser.error(f"Unknown field {field!r}. Choose from: {', '.join(FIELDS)}")
+        conditions.setdefault(field, []).append(int(value) if value.lstrip("-").isdigit() else value)
+    if conditions:
+        results = where(results, **conditions)
+
+    writer = WRITERS[args.format](args.out, args.chunk_size) if args.out else None
+    stats = GroupStats(args.group_by)
+    games, seconds = run_pipeline(results, writer, stats,
+                                  lambda done, elapsed: print(f"{done:,} games, {done / elapsed:,.0f} games/s"))
+
+    for row in stats.rows():
+        print("  ".join(f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+                        for name, value in row.items()))
+    print(f"{games:,} games kept in {seconds:.1f} s, {args.games / seconds:,.0f} games/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import random
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def _splitmix64(x):
+    """Finalizer of the SplitMix64 generator; scrambles a 64-bit integer."""
+    x = (x + _GOLDEN_GAMMA) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class CounterRandom(random.Random):
+    """
+    Counter-based generator: the n-th output is a pure function of (key, n),
+    so any position of the stream can be reached with jump() and separate
+    keys give independent streams. Drop-in for random.Random.
+    """
+    def __init__(self, seed=0, counter=0):
+        super().__init__(seed)
+        self.counter = counter
+
+    def seed(self, a=None, version=2):
+        if a is None:
+            a = random.SystemRandom().getrandbits(64)
+        elif not isinstance(a, int):
+            a = int.from_bytes(str(a).encode(), "big")
+        self.key = _splitmix64(a & _MASK64)
+        self.counter = 0
+
+    def _next64(self):
+        value = _splitmix64(self.key ^ ((self.counter * _GOLDEN_GAMMA) & _MASK64))
+        self.counter += 1
+        return value
+
+    def getrandbits(self, k):
+        if k <= 64:
+            return self._next64() >> (64 - k)
+        value = 0
+        for _ in range((k + 63) // 64):
+            value = (value << 64) | self._next64()
+        return value >> (-k % 64)
+
+    def random(self):
+        return (self._next64() >> 11) * (1.0 / (1 << 53))
+
+    def jump(self, steps):
+        """Skips `steps` 64-bit outputs without generating them."""
+        self.counter += steps
+
+    def getstate(self):
+        return self.key, self.counter
+
+    def setstate(self, state):
+        self.key, self.counter = state
+
+
+class NumpyRandom(random.Random):
+    """
+    random.Random facade over a NumPy Generator, so the engine can draw from
+    PCG64, Philox or any other NumPy bit generator.
+    """
+    def __init__(self, generator):
+        super().__init__()
+        self.generator = generator
+
+    def seed(self, a=None, version=2):
+        """Restarts the stream with a new bit generator of the same type, as make_rng(a, kind) would."""
+        generator = getattr(self, "generator", None)
+        # random.Random.__init__ seeds before the wrapped Generator is attached
+        if generator is None:
+            return
+        if a is not None and not isinstance(a, int):
+            a = int.from_bytes(str(a).encode(), "big")
+        elif a is not None:
+            a = abs(a)
+        self.generator = type(generator)(type(generator.bit_generator)(a))
+
+    def getrandbits(self, k):
+        raw = self.generator.bit_generator.random_raw
+        if k <= 64:
+            return int(raw()) >> (64 - k)
+        value = 0
+        for _ in range((k + 63) // 64):
+            value = (value << 64) | int(raw())
+        return value >> (-k % 64)
+
+    def random(self):
+        return float(self.generator.random())
+
+    def getstate(self):
+        return self.generator.bit_generator.state
+
+    def __reduce__(self):
+        return self.__class__, (self.generator,)
+
+    def setstate(self, state):
+        self.generator.bit_generator.state = state
+
+
+def make_rng(seed=None, kind="mt"):
+    """
+    Creates a per-game generator.
+    kind is "mt" (random.Random), "counter" (CounterRandom), "pcg64" or
+    "philox" (NumPy bit generators, NumPy must be installed).
+    """
+    if kind == "mt":
+        return random.Random(seed)
+    if kind == "counter":
+        return CounterRandom(seed)
+    if kind in ("pcg64", "philox"):
+        import numpy as np
+        bit_generator = np.random.PCG64(seed) if kind == "pcg64" else np.random.Philox(seed)
+        return NumpyRandom(np.random.Generator(bit_generator))
+    raise ValueError(f"Unknown generator kind {kind!r}. Use 'mt', 'counter', 'pcg64' or 'philox'.")
@@ -0,0 +1,54 @@
+class Scenario:
+    """
+    How many Wumpuses, pits and bat colonies a game hides. Every hazard is
+    given either as a count or as a density, the fraction of the caves it
+    fills (e.g. pits=0.05 for 5% pits), so one scenario scales with the map.
+    Densities are rounded to the nearest count; at least one Wumpus is kept.
+    """
+    def __init__(self, wumpuses=1, pits=2, bats=2, name="custom"):
+        for label, value in (("wumpuses", wumpuses), ("pits", pits), ("bats", bats)):
+            if value < 0 or (isinstance(value, float) and value >= 1):
+                raise ValueError(f"{label} must be a count >= 0 or a density in [0, 1), got {value!r}.")
+        self.wumpuses = wumpuses
+        self.pits = pits
+        self.bats = bats
+        self.name = name
+
+    @staticmethod
+    def _resolve(value, num_caves):
+        if isinstance(value, float):
+            return round(value * num_caves)
+        return value
+
+    def counts(self, num_caves):
+        """Returns the (wumpuses, pits, bats) counts for a map of `num_caves` caves."""
+        wumpuses = max(1, self._resolve(self.wumpuses, num_caves))
+        pits = self._resolve(self.pits, num_caves)
+        bats = self._resolve(self.bats, num_caves)
+        # The player needs a cave without pits, bats or Wumpus to start in
+        if pits + bats + wumpuses >= num_caves:
+            raise ValueError(f"Scenario {self.name!r} needs {pits + bats + wumpuses + 1} caves, "
+                             f"the map has {num_caves}.")
+        return wumpuses, pits, bats
+
+    def __repr__(self):
+        return f"Scenario({self.name!r}, wumpuses={self.wumpuses}, pits={self.pits}, bats={self.bats})"
+
+
+CLASSIC = Scenario(name="classic")
+
+SCENARIOS = {
+    "classic": CLASSIC,
+    # Classic hazards with a pack of Wumpuses
+    "pack": Scenario(wumpuses=3, name="pack"),
+    # Densities for large maps: 5% pits, 2% bats, one Wumpus per thousand caves
+    "dense": Scenario(wumpuses=0.001, pits=0.05, bats=0.02, name="dense"),
+}
+
+
+def get_scenario(name):
+    """Returns the scenario registered under `name`."""
+    try:
+        return SCENARIOS[name]
+    except KeyError:
+        raise ValueError(f"Unknown scenario {name!r}. Choose from: {', '.join(sorted(SCENARIOS))}")
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import secrets
+import time
+from collections import OrderedDict
+
+from scenario import get_scenario
+from topology import classic, get_topology
+from wumpus import HuntTheWumpus
+
+# Store prices, the same as in the GUI's store
+PRICES = {"radar": 50, "planks": 75, "bat_taxi": 60}
+# Longest request line accepted before the connection is dropped
+MAX_LINE = 64 * 1024
+
+
+class Session:
+    """One player's game plus the store state that lives next to it."""
+    __slots__ = ("game", "currency", "moves", "radar_uses_left", "plank_uses_left",
+                 "bat_taxi_uses_left", "last_seen")
+
+    def __init__(self, game, now):
+        self.game = game
+        self.currency = 0
+        self.moves = 0
+        self.radar_uses_left = 0
+        self.plank_uses_left = 0
+        self.bat_taxi_uses_left = 0
+        self.last_seen = now
+
+    def state(self):
+        """Returns what the player may see, as a JSON-ready dict."""
+        game = self.game
+        return {
+            "cave": game.player_location,
+            "neighbors": game._get_neighbors(game.player_location),
+            "perceptions": game._get_perceptions(),
+            "arrows": game.num_arrows,
+            "game_over": game.game_over,
+            "outcome": game.outcome,
+            "message": game.message,
+            "moves": self.moves,
+            "currency": self.currency,
+            "radar": self.radar_uses_left,
+            "planks": self.plank_uses_left,
+            "bat_taxi": self.bat_taxi_uses_left,
+        }
+
+
+def _cave(request, game):
+    """Returns the request's "cave" as a cave number, raising ValueError if it is not on the map."""
+    cave = int(request["cave"])
+    if not 1 <= cave <= game.num_caves:
+        raise ValueError(f"There is no cave {cave} on this map.")
+    return cave
+
+
+def _check_playing(game):
+    """Raises ValueError once the game is over, so tools are not used up for nothing."""
+    if game.game_over:
+        raise ValueError("The game is over. Start a new game.")
+
+
+class GameServer:
+    """
+    Hosts many concurrent games. Requests are JSON objects with an "action"
+    ("new", "move", "shoot", "radar", "taxi", "buy", "state" or "close")
+    and, except for "new", the "session" id that "new" returned. An "id"
+    field is echoed back. Sessions are kept in least-recently-used order,
+    so evicting idle ones only looks at the oldest.
+    """
+    def __init__(self, topology=None, idle_timeout=300.0, max_sessions=100000, initial_arrows=5, scenario=None):
+        self.topology = topology if topology is not None else classic()
+        self.scenario = scenario
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.initial_arrows = initial_arrows
+        self.sessions = OrderedDict()
+        self.requests = 0
+        self.evicted = 0
+
+    def _session(self, request, now):
+        session_id = request.get("session")
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown session {session_id!r}.")
+        self.sessions.move_to_end(session_id)
+        session.last_seen = now
+        return session
+
+    def evict_idle(self, now=None):
+        """Drops sessions idle for longer than idle_timeout and returns how many went."""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session.last_seen < self.idle_timeout:
+                break
+            del self.sessions[session_id]
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    def handle(self, request):
+        """Runs one request and returns the reply dict."""
+        self.requests += 1
+        now = time.monotonic()
+        action = request.get("action")
+        if action == "new":
+            session_id = request.get("session")
+            if session_id in self.sessions:
+                # A new game in an existing session keeps its currency and tools
+                session = self._session(request, now)
+                session.game.reset()
+                session.moves = 0
+            else:
+                if len(self.sessions) >= self.max_sessions:
+                    self.evict_idle(now)
+                    if len(self.sessions) >= self.max_sessions:
+                        raise RuntimeError("The server is full.")
+                session_id = secrets.token_hex(8)
+                game = HuntTheWumpus(initial_arrows=self.initial_arrows, topology=self.topology,
+                                     scenario=self.scenario)
+                session = self.sessions[session_id] = Session(game, now)
+            session.game.message = "Starting a new game. Good luck!"
+            return {"ok": True, "session": session_id, "state": session.state()}
+
+        session = self._session(request, now)
+        if action == "close":
+            del self.sessions[request["session"]]
+            return {"ok": True}
+        game = session.game
+        reply = {"ok": True}
+        if action == "move":
+            if not game.game_over:
+                session.moves += 1
+            result = game.move_player(int(request["cave"]), session.plank_uses_left > 0,
+                                      session.bat_taxi_uses_left > 0)
+            if result == "planks":
+                session.plank_uses_left -= 1
+            elif result == "bat_taxi":
+                session.bat_taxi_uses_left -= 1
+            reply["result"] = result
+        elif action == "shoot":
+            path = [int(cave) for cave in request["path"]]
+            game.shoot_arrow(path)
+            if game.outcome == "won" and game.game_over:
+                reward = max(100 - (session.moves * 2), 10)
+                session.currency += reward
+                reply["reward"] = reward
+        elif action == "radar":
+            _check_playing(game)
+            cave = _cave(request, game)
+            if session.radar_uses_left <= 0:
+                raise ValueError("You don't have any Radar uses left.")
+            session.radar_uses_left -= 1
+            reply["hazard"] = game.use_radar(cave)
+        elif action == "taxi":
+            _check_playing(game)
+            cave = _cave(request, game)
+            if session.bat_taxi_uses_left <= 0:
+                raise ValueError("You don't have any Bat Taxi uses left.")
+            session.bat_taxi_uses_left -= 1
+            result = game.take_bat_taxi(cave, session.plank_uses_left > 0,
+                                        session.bat_taxi_uses_left > 0)
+            if result == "planks":
+                session.plank_uses_left -= 1
+            reply["result"] = result
+        elif action == "buy":
+            item = request.get("item")
+            price = PRICES.get(item)
+            if price is None:
+                raise ValueError(f"Unknown item {item!r}. Use 'radar', 'planks' or 'bat_taxi'.")
+            if session.currency < price:
+                raise ValueError(f"Not enough currency to buy {item.replace('_', ' ')}.")
+            session.currency -= price
+            if item == "radar":
+                session.radar_uses_left += 2
+            elif item == "planks":
+                session.plank_uses_left += 1
+            else:
+                session.bat_taxi_uses_left += 1
+        elif action != "state":
+            raise ValueError(f"Unknown action {action!r}.")
+        reply["state"] = session.state()
+        return reply
+
+    def handle_line(self, line):
+        """Decodes one request line and returns the encoded reply line."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            reply = self.handle(request)
+        # OverflowError comes from int(float("inf")), RecursionError from very deeply nested JSON
+        except (ValueError, KeyError, TypeError, RuntimeError, AttributeError, OverflowError,
+                RecursionError) as error:
+            message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+            reply = {"ok": False, "error": message}
+        if request_id is not None:
+            reply["id"] = request_id
+        return json.dumps(reply, separators=(",", ":")).encode() + b"\n"
+
+    async def evict_forever(self, interval=10.0):
+        """Background task that evicts idle sessions every `interval` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            self.evict_idle()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None):
+        """Starts listening on TCP (or a Unix socket) and returns the asyncio server."""
+        loop = asyncio.get_running_loop()
+        if unix_path is not None:
+            return await loop.create_unix_server(lambda: _Connection(self), unix_path)
+        return await loop.create_server(lambda: _Connection(self), host, port)
+
+
+class _Connection(asyncio.Protocol):
+    """
+    Line-delimited JSON connection. Every chunk read from the socket is
+    answered with a single write of all its replies, so pipelined requests
+    are batched without a drain per line.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.buffer = b""
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        lines = (self.buffer + data).split(b"\n")
+        self.buffer = lines.pop()
+        if len(self.buffer) > MAX_LINE:
+            self.transport.write(b'{"ok":false,"error":"Request line too long."}\n')
+            self.transport.close()
+            return
+        replies = [self.server.handle_line(line) for line in lines if line.strip()]
+        if replies:
+            self.transport.write(b"".join(replies))
+
+    def pause_writing(self):
+        # The client is not reading its replies: stop reading its requests
+        self.transport.pause_reading()
+
+    def resume_writing(self):
+        self.transport.resume_reading()
+
+
+class LocalClient:
+    """
+    In-process stand-in for a socket connection: same encoded lines, no
+    transport. Useful for tests and for benchmarking the server alone.
+    """
+    def __init__(self, server):
+        self.server = server
+
+    async def request(self, **request):
+        line = json.dumps(request, separators=(",", ":")).encode()
+        return json.loads(self.server.handle_line(line))
+
+
+async def _main(args):
+    topology = get_topology(args.topology, *args.size)
+    server = GameServer(topology, idle_timeout=args.idle_timeout, max_sessions=args.max_sessions,
+                        scenario=get_scenario(args.scenario))
+    listener = await server.serve(args.host, args.port, args.unix)
+    evictor = asyncio.create_task(server.evict_forever())
+    where = args.unix or f"{args.host}:{args.port}"
+    print(f"Serving Hunt the Wumpus on {where}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        evictor.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many Hunt the Wumpus games over line-delimited JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--topology", default="grid", help="topology name, e.g. grid, torus, dodecahedron")
+    parser.add_argument("--size", type=int, nargs="*", default=[], help="topology parameters, e.g. 4 5")
+    parser.add_argument("--scenario", default="classic", help="hazard scenario: classic, pack or dense")
+    parser.add_argument("--idle-timeout", type=float, default=300.0, help="seconds before an idle session is evicted")
+    parser.add_argument("--max-sessions", type=int, default=100000, help="most sessions held at once")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,636 @@
+import argparse
+import hashlib
+import heapq
+import itertools
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from belief import BeliefAgent
+from bitboard import CaveBitboard
+from perception import MESSAGES
+from topology import classic
+
+MAGIC = b"WUMPSOL1"
+VERSION = 1
+# magic, version, record size, arrows, rows, cols, record count
+HEADER = struct.Struct("<8sHHHHHI")
+DIGEST_SIZE = 12
+# state digest, win probability, best action; records are sorted by digest
+RECORD = struct.Struct(f"<{DIGEST_SIZE}sfB")
+# Best-action byte: the cave, plus SHOOT_FLAG when the action is a shot into it
+SHOOT_FLAG = 0x80
+NO_ACTION = 0
+DEFAULT_TABLE = "classic.solution"
+
+
+def _bits(mask):
+    """Yields the indices of the set bits of `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def grid_symmetries(topology):
+    """
+    Returns the symmetries of a grid topology as cave permutations: tuples
+    with perm[cave] the image of `cave` (index 0 unused). A rectangle has
+    four (identity, the two mirror images and the half turn); a square
+    grid adds the four that swap rows and columns.
+    """
+    rows, cols = topology.params
+    maps = [
+        lambda r, c: (r, c),
+        lambda r, c: (rows - 1 - r, c),
+        lambda r, c: (r, cols - 1 - c),
+        lambda r, c: (rows - 1 - r, cols - 1 - c),
+    ]
+    if rows == cols:
+        maps += [
+            lambda r, c: (c, r),
+            lambda r, c: (cols - 1 - c, r),
+            lambda r, c: (c, rows - 1 - r),
+            lambda r, c: (cols - 1 - c, rows - 1 - r),
+        ]
+    perms = []
+    for transform in maps:
+        perm = [0]
+        for cave in range(1, topology.num_caves + 1):
+            perm.append(topology.cave_at(*transform(*topology.position(cave))))
+        perms.append(tuple(perm))
+    return perms
+
+
+def canonical_frame(symmetries, start):
+    """
+    Returns the symmetry that maps `start` to the smallest cave of its
+    orbit. Games are solved and looked up in that frame, so only one start
+    cave per orbit has to be solved.
+    """
+    return min(symmetries, key=lambda perm: perm[start])
+
+
+# Hazard codes of Layouts.hazards
+EMPTY = 0
+WUMPUS = 1
+PIT = 2
+BATS = 3
+
+
+class Layouts:
+    """
+    Every hazard layout of a map with one Wumpus, `num_pits` pits and
+    `num_bats` bat colonies, all in different caves, as the game places
+    them. What the player knows is the sorted array of the indices of the
+    layouts that fit it, so every observation is one vectorized lookup over
+    the layouts still possible. All layouts are equally likely at the start.
+    """
+    def __init__(self, topology, num_pits=2, num_bats=2):
+        self.topology = topology
+        self.num_pits = num_pits
+        self.num_bats = num_bats
+        n = topology.num_caves
+        rows = []
+        for pits in itertools.combinations(range(1, n + 1), num_pits):
+            rest = [cave for cave in range(1, n + 1) if cave not in pits]
+            for bats in itertools.combinations(rest, num_bats):
+                for wumpus in rest:
+                    if wumpus not in bats:
+                        rows.append((wumpus,) + pits + bats)
+        table = np.array(rows, dtype=np.int32).reshape(len(rows), 1 + num_pits + num_bats)
+        self.size = len(table)
+        self.all = np.arange(self.size, dtype=np.int32)
+        # Caves a bat colony drops the player into: any without a hazard
+        self.free_caves = n - 1 - num_pits - num_bats
+
+        # hazards[cave][i]: hazard code of `cave` in layout i
+        self.hazards = np.zeros((n + 1, self.size), dtype=np.uint8)
+        for code, columns in ((WUMPUS, table[:, :1]), (PIT, table[:, 1:1 + num_pits]),
+                              (BATS, table[:, 1 + num_pits:])):
+            for column in columns.T:
+                self.hazards[column, self.all] = code
+        # perceptions[cave][i]: what the player senses in `cave` in layout i, as
+        # wumpus * 100 + pits * 10 + bats neighbor counts
+        self.perceptions = np.zeros((n + 1, self.size), dtype=np.uint16)
+        for cave in range(1, n + 1):
+            for neighbor in topology.neighbors(cave):
+                held = self.hazards[neighbor]
+                self.perceptions[cave] += ((held == WUMPUS) * 100 + (held == PIT) * 10 + (held == BATS)).astype(np.uint16)
+
+        self.adjacency = CaveBitboard.for_topology(topology).adjacency
+        # The same tables layout by layout, so one gather gives a layout set's view of every cave
+        self.hazards_by_layout = np.ascontiguousarray(self.hazards.T)
+        self.perceptions_by_layout = np.ascontiguousarray(self.perceptions.T)
+
+    def start(self, cave):
+        """Layouts that leave the start cave empty."""
+        return self.all[self.hazards[cave] == EMPTY]
+
+    def observe(self, possible, cave, counts):
+        """Keeps the layouts in which `cave` shows the given (wumpus, pit, bats) perception counts."""
+        wumpus, pits, bats = counts
+        return possible[self.perceptions[cave][possible] == wumpus * 100 + pits * 10 + bats]
+
+    def with_hazard(self, possible, cave, code):
+        """Keeps the layouts in which `cave` holds the given hazard code."""
+        return possible[self.hazards[cave][possible] == code]
+
+    def without_hazard(self, possible, cave, code):
+        """Keeps the layouts in which `cave` does not hold the given hazard code."""
+        return possible[self.hazards[cave][possible] != code]
+
+    def region(self, possible, cave):
+        """
+        Returns, as a bitmask, the caves the player in `cave` can walk to
+        through caves that are empty in every layout still `possible`.
+        """
+        occupied = self.hazards_by_layout[possible].any(axis=0)
+        empty = int.from_bytes(np.packbits(~occupied, bitorder="little").tobytes(), "little")
+        adjacency = self.adjacency
+        region = 1 << cave
+        grown = region
+        while grown:
+            reach = 0
+            for member in _bits(grown):
+                reach |= adjacency[member]
+            grown = reach & empty & ~region
+            region |= grown
+        return region
+
+    def unsettled(self, possible, region):
+        """
+        Returns the first cave of `region` whose perceptions differ between
+        the `possible` layouts, and those perceptions; (None, None) if the
+        player already knows what every cave of the region senses.
+        """
+        seen = self.perceptions_by_layout[possible]
+        varying = (seen != seen[0]).any(axis=0)
+        for cave in _bits(region):
+            if varying[cave]:
+                return cave, seen[:, cave]
+        return None, None
+
+
+def state_key(possible, arrows, region):
+    """
+    Returns the digest that identifies an information state in the
+    table: the region bitmask, the arrows and the sorted layout indices.
+    """
+    digest = hashlib.blake2b(struct.pack("<IB", region, arrows), digest_size=DIGEST_SIZE)
+    digest.update(possible.tobytes())
+    return digest.digest()
+
+
+class Solver:
+    """
+    Exact optimal play by dynamic programming over information states.
+    An information state is the set of hazard layouts that fit everything
+    the player has seen, the arrows left and the bitmask of the caves the
+    player can walk through safely; it is memoized by the digest of that
+    canonical encoding, so histories that teach the same are solved once.
+
+    The model is the classic game as the GUI plays it: arrows are shot into
+    a neighboring cave and the Wumpus stays asleep when one misses. Walking
+    through safe caves is free, so every safe cave next to the region is
+    visited before anything else is decided. Caves known to hold bats are
+    not entered on purpose.
+    """
+    def __init__(self, layouts):
+        self.layouts = layouts
+        self.memo = {}
+
+    def value(self, possible, arrows, cave):
+        """Returns the optimal win probability of the player in `cave` when `possible` layouts remain."""
+        layouts = self.layouts
+        region = layouts.region(possible, cave)
+        key = state_key(possible, arrows, region)
+        known = self.memo.get(key)
+        if known is not None:
+            return known[0]
+
+        total = len(possible)
+        # Perceive every cave of the region first: walking there is free and safe
+        unsettled, seen = layouts.unsettled(possible, region)
+        if unsettled is not None:
+            best = 0.0
+            for code in np.unique(seen):
+                part = possible[seen == code]
+                best += len(part) * self.value(part, arrows, unsettled)
+            best /= total
+            self.memo[key] = (best, unsettled)
+            return best
+
+        frontier = 0
+        for member in _bits(region):
+            frontier |= layouts.adjacency[member]
+        frontier &= ~region
+
+        best, action = 0.0, NO_ACTION
+        for target in _bits(frontier):
+            held = layouts.hazards[target][possible]
+            hits = int(np.count_nonzero(held == WUMPUS))
+            if hits:
+                chance = hits / total
+                if hits < total and arrows > 1:
+                    chance += (total - hits) / total * self.value(possible[held != WUMPUS], arrows - 1, cave)
+                if chance > best:
+                    best, action = chance, target | SHOOT_FLAG
+                if hits == total:
+                    break
+            chance = self._explore(possible, held, arrows, target)
+            if chance > best:
+                best, action = chance, target
+        self.memo[key] = (best, action)
+        return best
+
+    def _explore(self, possible, held, arrows, target):
+        """Win probability of walking into `target` and playing on optimally."""
+        layouts = self.layouts
+        bats = possible[held == BATS]
+        if len(bats) == len(possible):
+            return 0.0
+        chance = 0.0
+        safe = possible[held == EMPTY]
+        if len(safe):
+            chance += len(safe) * self.value(safe, arrows, target)
+        if len(bats):
+            # The bats drop the player into any cave without a hazard, all equally likely
+            for drop in range(1, layouts.topology.num_caves + 1):
+                landed = bats[layouts.hazards[drop][bats] == EMPTY]
+                if len(landed):
+                    chance += len(landed) / layouts.free_caves * self.value(landed, arrows, drop)
+        return chance / len(possible)
+
+    def solve_start(self, start, arrows):
+        """Returns the optimal win probability of a game that starts in `start` with `arrows` arrows."""
+        return self.value(self.layouts.start(start), arrows, start)
+
+    def records(self):
+        """Returns the solved states as packed RECORDs, sorted by digest."""
+        return [RECORD.pack(key, value, action) for key, (value, action) in sorted(self.memo.items())]
+
+
+def _read_records(path, chunk=1 << 16):
+    """Yields the packed records of a part file one by one, reading `chunk` records at a time."""
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk * RECORD.size)
+            if not data:
+                return
+            for offset in range(0, len(data), RECORD.size):
+                yield data[offset:offset + RECORD.size]
+
+
+def _solve_part(start, arrows, path):
+    """
+    Solves the games that start in `start` and writes their states, sorted
+    by digest, to the part file `path`. Returns (start, win probability, states).
+    """
+    solver = Solver(Layouts(classic()))
+    value = solver.solve_start(start, arrows)
+    records = solver.records()
+    with open(path, "wb") as f:
+        f.writelines(records)
+    return start, value, len(records)
+
+
+def write_table(path, parts, arrows, topology):
+    """
+    Merges sorted part files into one table. A state reached from several
+    start caves is written once. Returns the number of records.
+    """
+    count = 0
+    last = None
+    rows, cols = topology.params
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, arrows, rows, cols, 0))
+        for record in heapq.merge(*(_read_records(part) for part in parts)):
+            key = record[:DIGEST_SIZE]
+            if key != last:
+                f.write(record)
+                count += 1
+                last = key
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, arrows, rows, cols, count))
+    return count
+
+
+def solve(path=DEFAULT_TABLE, arrows=5, workers=None, progress=None):
+    """
+    Solves the classic map for every start cave and writes the table to
+    `path`. Only one start cave per symmetry orbit is solved; each is a
+    task of its own, spread over `workers` processes (default: all cores).
+    Calls progress(start, win probability, states) as starts finish.
+    Returns {start cave: optimal win probability} for every cave.
+    """
+    topology = classic()
+    symmetries = grid_symmetries(topology)
+    starts = sorted({canonical_frame(symmetries, cave)[cave] for cave in range(1, topology.num_caves + 1)})
+    parts = {start: f"{path}.part{start}" for start in starts}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(starts)))
+    values = {}
+    try:
+        if workers == 1:
+            results = (_solve_part(start, arrows, parts[start]) for start in starts)
+            for start, value, states in results:
+                values[start] = value
+                if progress is not None:
+                    progress(start, value, states)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_solve_part, start, arrows, parts[start]) for start in starts]
+                for future in futures:
+                    start, value, states = future.result()
+                    values[start] = value
+                    if progress is not None:
+                        progress(start, value, states)
+        write_table(path, [parts[start] for start in starts], arrows, topology)
+    finally:
+        for part in parts.values():
+            if os.path.exists(part):
+                os.remove(part)
+    return {cave: values[canonical_frame(symmetries, cave)[cave]] for cave in range(1, topology.num_caves + 1)}
+
+
+class SolutionTable:
+    """
+    Memory-mapped solver table. Records are sorted by state digest, so a
+    lookup is a binary search that touches a few pages of the file and
+    nothing has to be loaded up front.
+    """
+    def __init__(self, path=DEFAULT_TABLE):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, self.arrows, rows, cols, self.num_records = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(f"{path} is not a solver table this version can read.")
+        self.params = (rows, cols)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __len__(self):
+        return self.num_records
+
+    def lookup(self, key):
+        """Returns (win probability, action byte) of the state with digest `key`, or None if unsolved."""
+        data = self._map
+        low, high = 0, self.num_records
+        while low < high:
+            mid = (low + high) // 2
+            offset = HEADER.size + mid * RECORD.size
+            if data[offset:offset + DIGEST_SIZE] < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.num_records:
+            record = RECORD.unpack_from(data, HEADER.size + low * RECORD.size)
+            if record[0] == key:
+                return record[1], record[2]
+        return None
+
+
+class OptimalAdvisor:
+    """
+    Follows a classic game from what the player sees and looks the
+    information state up in a SolutionTable. The game is tracked in the
+    canonical frame of its start cave, so every start cave of an orbit
+    shares the solved states. Observations are only queued until the first
+    hint, so following a game costs nothing while nobody asks. Once the
+    game leaves the solved model (the Wumpus woke up, planks, a bat taxi
+    ride) or reaches a state the table lacks, advise() returns None and
+    callers fall back to BeliefState.
+    """
+    def __init__(self, table, layouts=None):
+        self.table = table
+        self.layouts = layouts
+        self.active = False
+        self.possible = None
+        self._pending = []
+
+    def new_game(self, game):
+        """Starts following a freshly started game."""
+        topology = game.topology
+        self.active = (topology.name == "grid" and tuple(topology.params) == self.table.params
+                       and (len(game.wumpus_locations), len(game.pit_locations), len(game.bat_locations)) == (1, 2, 2))
+        self.possible = None
+        self._pending = []
+        if not self.active:
+            return
+        self.topology = topology
+        self.frame = canonical_frame(grid_symmetries(topology), game.player_location)
+        self.inverse = [0] * len(self.frame)
+        for cave, image in enumerate(self.frame):
+            self.inverse[image] = cave
+        self._pending.append(("start", self.frame[game.player_location]))
+        self._observe_perceptions(game)
+
+    def _observe_perceptions(self, game):
+        perceptions = game._get_perceptions()
+        counts = tuple(perceptions.count(message) for message in MESSAGES)
+        self._pending.append(("perceive", self.frame[game.player_location], counts))
+
+    def _current(self):
+        """Applies the queued observations and returns the layouts that still fit them."""
+        if self.layouts is None:
+            self.layouts = Layouts(self.topology)
+        layouts = self.layouts
+        for event in self._pending:
+            if event[0] == "start":
+                self.possible = layouts.start(event[1])
+            elif event[0] == "perceive":
+                self.possible = layouts.observe(self.possible, event[1], event[2])
+            elif event[0] == "hazard":
+                self.possible = layouts.with_hazard(self.possible, event[1], event[2])
+            else:
+                self.possible = layouts.without_hazard(self.possible, event[1], WUMPUS)
+        self._pending.clear()
+        return self.possible
+
+    def observe_move(self, destination, game):
+        """Updates the state after game.move_player(destination, ...)."""
+        if not self.active or game.game_over:
+            return
+        cave = self.frame[destination]
+        if "Giant bats snatch you and drop you" in game.message:
+            self._pending.append(("hazard", cave, BATS))
+            self._pending.append(("hazard", self.frame[game.player_location], EMPTY))
+        elif "Giant bats" in game.message or "wooden planks" in game.message:
+            # Planks and the bat taxi are not part of the solved game
+            self.active = False
+            return
+        elif game.player_location == destination:
+            self._pending.append(("hazard", cave, EMPTY))
+        else:
+            # Not a connected cave: nothing happened
+            return
+        self._observe_perceptions(game)
+
+    def observe_shot(self, path, game):
+        """Updates the state after game.shoot_arrow(path)."""
+        if not self.active or game.game_over:
+            return
+        if "Arrow missed" in game.message and len(path) == 1:
+            self._pending.append(("miss", self.frame[path[0]]))
+        else:
+            # A woken Wumpus or a longer arrow path leaves the solved game
+            self.active = False
+
+    def observe_radar(self, cave, hazard):
+        """Records a radar scan; `hazard` is what _hazard_at returned for the cave."""
+        if self.active:
+            code = (EMPTY, WUMPUS, PIT, BATS)[(None, "wumpus", "pit", "bats").index(hazard)]
+            self._pending.append(("hazard", self.frame[cave], code))
+
+    def _solution(self, possible, arrows, cave):
+        """
+        Returns (win probability, action byte) of a state, or None. A state
+        the table lacks because the player perceived the caves of the region
+        in another order is valued from its perceptions one cave at a time.
+        """
+        if not len(possible):
+            return None
+        layouts = self.layouts
+        region = layouts.region(possible, cave)
+        found = self.table.lookup(state_key(possible, arrows, region))
+        if found is not None:
+            return found
+        unsettled, seen = layouts.unsettled(possible, region)
+        if unsettled is None:
+            return None
+        value = 0.0
+        for code in np.unique(seen):
+            part = possible[seen == code]
+            found = self._solution(part, arrows, unsettled)
+            if found is None:
+                return None
+            value += len(part) * found[0]
+        return value / len(possible), unsettled
+
+    def _route(self, start, region, goal):
+        """Returns the next cave on a shortest walk from `start` through `region` to a cave of `goal`."""
+        adjacency = self.layouts.adjacency
+        parent = {start: None}
+        queue = [start]
+        for cave in queue:
+            if goal >> cave & 1:
+                while parent[cave] != start and parent[cave] is not None:
+                    cave = parent[cave]
+                return cave
+            for neighbor in _bits(adjacency[cave] & (region | goal)):
+                if neighbor not in parent:
+                    parent[neighbor] = cave
+                    queue.append(neighbor)
+        return None
+
+    def solution(self, player_cave, num_arrows):
+        """Returns (win probability, action byte) for the current state, in the canonical frame, or None."""
+        if not self.active or not 0 < num_arrows <= self.table.arrows:
+            return None
+        return self._solution(self._current(), num_arrows, self.frame[player_cave])
+
+    def advise(self, player_cave, num_arrows):
+        """
+        Recommends the next step of optimal play as ("shoot", [cave]) or
+        ("move", cave), walking through safe caves first when the best
+        action is away from the player. Returns None when off the table.
+        """
+        solution = self.solution(player_cave, num_arrows)
+        if solution is None or solution[1] == NO_ACTION:
+            return None
+        action = solution[1]
+        cave = self.frame[player_cave]
+        target = action & ~SHOOT_FLAG
+        region = self.layouts.region(self.possible, cave)
+        if action & SHOOT_FLAG:
+            if self.layouts.adjacency[cave] >> target & 1:
+                return "shoot", [self.inverse[target]]
+            step = self._route(cave, region, self.layouts.adjacency[target] & region)
+        else:
+            step = self._route(cave, region, 1 << target)
+        return None if step is None else ("move", self.inverse[step])
+
+    def hint(self, player_cave, num_arrows):
+        """Returns the advice as a sentence for the GUI, or None when off the table."""
+        advice = self.advise(player_cave, num_arrows)
+        if advice is None:
+            return None
+        chance = self.solution(player_cave, num_arrows)[0]
+        action, target = advice
+        if action == "shoot":
+            return f"Hint: shoot into cave {target[0]} (optimal play wins {chance:.0%})."
+        return f"Hint: move to cave {target} (optimal play wins {chance:.0%})."
+
+
+class OptimalAgent:
+    """
+    Tournament agent that plays the solved strategy and falls back to a
+    BeliefAgent off the table. The table is opened lazily, so the agent
+    pickles cheaply to worker processes.
+    """
+    def __init__(self, path=DEFAULT_TABLE):
+        self.path = path
+        self.advisor = None
+        self.fallback = BeliefAgent()
+        self._last_action = None
+
+    def __getstate__(self):
+        return {"path": self.path, "fallback": self.fallback, "advisor": None, "_last_action": None}
+
+    def new_game(self, game):
+        if self.advisor is None:
+            self.advisor = OptimalAdvisor(SolutionTable(self.path))
+        self.advisor.new_game(game)
+        self.fallback.new_game(game)
+        self._last_action = None
+
+    def __call__(self, game):
+        if self._last_action is not None:
+            action, target = self._last_action
+            if action == "move":
+                self.advisor.observe_move(target, game)
+                self.fallback.belief.observe_move(target, game)
+            else:
+                self.advisor.observe_shot(target, game)
+                self.fallback.belief.observe_shot(target, game)
+        advice = self.advisor.advise(game.player_location, game.num_arrows)
+        if advice is None:
+            advice = self.fallback.belief.advise(game.player_location, game.num_arrows)
+        self._last_action = advice
+        return advice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve the classic map exactly and write the table of optimal play.")
+    parser.add_argument("--out", default=DEFAULT_TABLE, help="file to write the table to")
+    parser.add_argument("--arrows", type=int, default=5, help="arrows at the start of a game")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    values = solve(args.out, args.arrows, args.workers,
+                   lambda start, value, states: print(f"start cave {start:>2}: {value:.4f} "
+                                                      f"({states:,} states, {time.perf_counter() - started:.0f} s)"))
+    topology = classic()
+    for row in range(topology.rows):
+        print("  ".join(f"{values[topology.cave_at(row, col)]:.3f}" for col in range(topology.cols)))
+    print(f"Average over start caves: {sum(values.values()) / len(values):.4f}")
+    with SolutionTable(args.out) as table:
+        print(f"{len(table):,} states in {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB), "
+              f"{time.perf_counter() - started:.0f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+import benchmark
+
+
+def quiet(message):
+    pass
+
+
+# Timing the real hot paths takes seconds and depends on the machine, so it only runs on request
+@pytest.mark.skipif(not os.environ.get("WUMPUS_LIVE_BENCHMARKS"), reason="set WUMPUS_LIVE_BENCHMARKS=1 to run")
+def test_unchanged_tree_passes():
+    baseline = benchmark.run((20,), gui=False, log=quiet, runs=2)
+    _, regressions = benchmark.check(baseline, (20,), gui=False, log=quiet, runs=2)
+    assert regressions == []
+
+
+def test_compare_needs_a_relative_and_an_absolute_slowdown():
+    baseline = {"fast[20]": 0.2e-6, "slow[20]": 100e-6, "steady[20]": 100e-6}
+    results = {"fast[20]": 0.4e-6, "slow[20]": 150e-6, "steady[20]": 110e-6, "new[20]": 1.0}
+    assert benchmark.compare(results, baseline) == [("slow[20]", 100e-6, 150e-6)]
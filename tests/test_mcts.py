@@ -0,0 +1,17 @@
+from mcts import MCTSAgent
+from tournament import play_game
+from wumpus import HuntTheWumpus
+
+
+def test_search_does_not_draw_from_the_game():
+    game = HuntTheWumpus(seed=7)
+    state = game.rng.getstate()
+    MCTSAgent(time_budget=None, iterations=20).new_game(game)
+    assert game.rng.getstate() == state
+
+
+def test_a_game_replays_the_same_after_other_games():
+    agent = MCTSAgent(time_budget=None, iterations=20)
+    alone = play_game(HuntTheWumpus(seed=11), agent, max_moves=50)
+    play_game(HuntTheWumpus(seed=3), agent, max_moves=50)
+    assert play_game(HuntTheWumpus(seed=11), agent, max_moves=50) == alone
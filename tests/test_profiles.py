@@ -0,0 +1,35 @@
+import os
+
+from profiles import ProfileStore
+
+
+def test_reopen_torn_log(tmp_path):
+    path = str(tmp_path / "store")
+    with ProfileStore(path) as store:
+        alice = store.load("alice")
+        alice.currency = 102
+        store.save(alice)
+        alice.currency = 999
+        store.save(alice)
+    # A crash in the middle of an append leaves part of a record behind
+    with open(path + ".log", "ab") as f:
+        f.write(b"\1" * 20)
+
+    with ProfileStore(path) as store:
+        assert store.load("alice").currency == 999
+        alice = store.load("alice")
+        alice.radar_uses_left = 2
+        store.save(alice)
+        bob = store.load("bob")
+        bob.currency = 50
+        store.save(bob)
+        assert store.load("alice").radar_uses_left == 2
+        assert store.load("alice").moves == 0
+        assert store.load("bob").currency == 50
+
+    # Rebuilding the index from the log finds the same profiles
+    os.remove(path + ".idx")
+    with ProfileStore(path) as store:
+        assert store.load("alice").currency == 999
+        assert store.load("alice").radar_uses_left == 2
+        assert store.load("bob").currency == 50
@@ -0,0 +1,62 @@
+import pytest
+
+from replay import ReplayReader, ReplayWriter
+from scenario import Scenario
+from topology import grid
+from wumpus import HuntTheWumpus
+
+
+def play(game, moves):
+    """Makes up to `moves` moves to the first neighbor; returns the states seen."""
+    states = [(game.player_location, game.wumpus_location, game.num_arrows)]
+    for _ in range(moves):
+        if game.game_over:
+            break
+        game.move_player(game._get_neighbors(game.player_location)[0], False, False)
+        states.append((game.player_location, game.wumpus_location, game.num_arrows))
+    return states
+
+
+def test_reopen_round_trip(tmp_path):
+    path = str(tmp_path / "games.log")
+    played = []
+    for seed in (1, 2):
+        # The second session appends two more games to the log the first one wrote
+        with ReplayWriter(path, keyframe_interval=2) as writer:
+            game = HuntTheWumpus(seed=seed, recorder=writer)
+            played.append(play(game, 6))
+            game.reset()
+            played.append(play(game, 3))
+
+    with ReplayReader(path) as reader:
+        for number, states in enumerate(played):
+            for action, (player, wumpus, arrows) in enumerate(states):
+                state = reader.state_at(number, action)
+                assert (state.player_location, state.wumpus_location, state.num_arrows) == (player, wumpus, arrows)
+
+
+@pytest.mark.parametrize("keyframe_interval", [2, 3, 256])
+def test_every_wumpus_of_a_pack(tmp_path, keyframe_interval):
+    path = str(tmp_path / "games.log")
+    played = []
+    for seed in (1, 2):
+        with ReplayWriter(path, keyframe_interval=keyframe_interval) as writer:
+            # Twelve Wumpuses take three WUMPUSES records, so keyframes fall inside groups too
+            game = HuntTheWumpus(initial_arrows=20, topology=grid(8, 8), seed=seed, recorder=writer,
+                                 scenario=Scenario(wumpuses=12, pits=2, bats=2))
+            states = [list(game.wumpus_locations)]
+            while not game.game_over and len(states) < 60:
+                neighbors = game._get_neighbors(game.player_location)
+                if len(states) % 3:
+                    game.move_player(neighbors[0], True, False)
+                else:
+                    game.shoot_arrow([neighbors[len(states) % len(neighbors)]])
+                states.append(list(game.wumpus_locations))
+            played.append(states)
+
+    with ReplayReader(path) as reader:
+        for number, states in enumerate(played):
+            for action, wumpuses in enumerate(states):
+                state = reader.state_at(number, action)
+                assert state.wumpus_locations == wumpuses
+                assert state.wumpus_location == wumpuses[0]
@@ -0,0 +1,19 @@
+import pytest
+
+from results import game_results
+
+
+def wanderer(game):
+    # Never shoots, so it never wins currency and the wallet stays empty whatever the chunk size
+    return "move", game.rng.choice(game._get_neighbors(game.player_location))
+
+
+@pytest.mark.parametrize("rng_kind", ["mt", "counter", "pcg64", "philox"])
+def test_games_do_not_depend_on_chunk_size(rng_kind):
+    if rng_kind in ("pcg64", "philox"):
+        pytest.importorskip("numpy")
+
+    def play(chunk_size):
+        return [(row["seed"], row["outcome"], row["moves"])
+                for row in game_results(wanderer, 12, seed=3, rng_kind=rng_kind, chunk_size=chunk_size)]
+    assert play(12) == play(1) == play(5)
@@ -0,0 +1,7 @@
+from topology import classic, get_topology, grid, random_regular
+
+
+def test_same_parameters_share_one_topology():
+    assert grid() is grid(4, 5) is grid(rows=4, cols=5) is classic() is get_topology("grid")
+    assert random_regular(20) is random_regular(20, 3, seed=0)
+    assert grid(4, 6) is not grid(4, 5)
@@ -0,0 +1,305 @@
+import functools
+import inspect
+import math
+import random
+from array import array
+from collections.abc import Mapping
+
+# Registered topology builders, keyed by name
+_BUILDERS = {}
+
+
+class CaveMapView(Mapping):
+    """
+    Read-only dict-like view of a Topology, so code written against the old
+    cave_map dict of lists keeps working without materializing it.
+    """
+    def __init__(self, topology):
+        self._topology = topology
+
+    def __getitem__(self, cave):
+        if not isinstance(cave, int) or not 0 < cave <= self._topology.num_caves:
+            raise KeyError(cave)
+        return self._topology.neighbors(cave)
+
+    def __iter__(self):
+        return iter(range(1, self._topology.num_caves + 1))
+
+    def __len__(self):
+        return self._topology.num_caves
+
+    def __contains__(self, cave):
+        return isinstance(cave, int) and 0 < cave <= self._topology.num_caves
+
+
+class Topology:
+    """
+    Immutable cave graph stored as flat CSR-style adjacency arrays.
+    The neighbors of cave c are targets[offsets[c]:offsets[c + 1]].
+    Caves are numbered 1..num_caves and slot 0 is left empty.
+    """
+    def __init__(self, name, params, offsets, targets, cols):
+        self.name = name
+        self.params = params
+        self.offsets = offsets
+        self.targets = targets
+        self.num_caves = len(offsets) - 2
+        # Number of columns used when the map is drawn as a grid of buttons
+        self.cols = cols
+        self.cave_map = CaveMapView(self)
+        self._derived = {}
+
+    def __repr__(self):
+        args = ", ".join(str(p) for p in self.params)
+        return f"{self.name}({args})"
+
+    @classmethod
+    def from_neighbor_lists(cls, name, params, neighbor_lists, cols=None):
+        """Builds a topology from a list of neighbor lists, one per cave starting at cave 1."""
+        offsets = array("l", [0, 0])
+        targets = array("l")
+        for neighbors in neighbor_lists:
+            targets.extend(neighbors)
+            offsets.append(len(targets))
+        if cols is None:
+            cols = math.ceil(math.sqrt(len(neighbor_lists))) or 1
+        return cls(name, params, offsets, targets, cols)
+
+    def neighbors(self, cave):
+        """Returns a list of caves connected to the given cave."""
+        if not 0 < cave <= self.num_caves:
+            return []
+        return self.targets[self.offsets[cave]:self.offsets[cave + 1]].tolist()
+
+    def degree(self, cave):
+        """Returns how many caves are connected to the given cave."""
+        return self.offsets[cave + 1] - self.offsets[cave]
+
+    def is_neighbor(self, cave, other):
+        """Returns True if `other` is connected to `cave`."""
+        if not 0 < cave <= self.num_caves:
+            return False
+        return other in self.targets[self.offsets[cave]:self.offsets[cave + 1]]
+
+    def position(self, cave):
+        """Returns the (row, col) the cave is drawn at."""
+        return (cave - 1) // self.cols, (cave - 1) % self.cols
+
+    def cave_at(self, row, col):
+        """Returns the cave drawn at (row, col), or None if that spot is empty. The inverse of position()."""
+        if row < 0 or not 0 <= col < self.cols:
+            return None
+        cave = row * self.cols + col + 1
+        return cave if cave <= self.num_caves else None
+
+    @property
+    def rows(self):
+        """Number of rows used when the map is drawn."""
+        return -(-self.num_caves // self.cols)
+
+    def derived(self, key, builder):
+        """
+        Returns a table derived from this topology, building it with
+        `builder()` the first time it is requested.
+        """
+        table = self._derived.get(key)
+        if table is None:
+            table = self._derived[key] = builder()
+        return table
+
+
+def register_topology(name):
+    """
+    Registers a topology builder under `name` and caches it by its
+    parameters. Arguments are bound to the builder's signature with the
+    defaults filled in first, so grid(), grid(4, 5) and grid(rows=4, cols=5)
+    share one topology and its derived tables.
+    """
+    def decorator(builder):
+        signature = inspect.signature(builder)
+        cached = functools.lru_cache(maxsize=None)(builder)
+
+        @functools.wraps(builder)
+        def build(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return cached(*bound.args)
+        build.cache_info = cached.cache_info
+        _BUILDERS[name] = build
+        return build
+    return decorator
+
+
+def get_topology(name, *params):
+    """Returns the (cached) topology registered under `name` for the given parameters."""
+    try:
+        builder = _BUILDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown topology {name!r}. Choose from: {', '.join(sorted(_BUILDERS))}")
+    return builder(*params)
+
+
+def available_topologies():
+    """Returns the names of all registered topologies."""
+    return sorted(_BUILDERS)
+
+
+@register_topology("grid")
+def grid(rows=4, cols=5):
+    """
+    Caves on an RxC grid, each connected to its immediate neighbors
+    (up, down, left, right). grid(4, 5) is the classic HuntTheWumpus map.
+    """
+    if rows < 1 or cols < 1:
+        raise ValueError("A grid needs at least one row and one column.")
+    num_caves = rows * cols
+    offsets = array("l", [0, 0])
+    targets = array("l")
+    for i in range(1, num_caves + 1):
+        row = (i - 1) // cols
+        col = (i - 1) % cols
+        # Same neighbor order as the original 4x5 map: above, below, left, right
+        if row > 0:
+            targets.append(i - cols)
+        if row < rows - 1:
+            targets.append(i + cols)
+        if col > 0:
+            targets.append(i - 1)
+        if col < cols - 1:
+            targets.append(i + 1)
+        offsets.append(len(targets))
+    return Topology("grid", (rows, cols), offsets, targets, cols)
+
+
+@register_topology("torus")
+def torus(rows=4, cols=5):
+    """An RxC grid whose edges wrap around, so every cave has up to 4 neighbors."""
+    if rows < 1 or cols < 1:
+        raise ValueError("A torus needs at least one row and one column.")
+    num_caves = rows * cols
+    offsets = array("l", [0, 0])
+    targets = array("l")
+    for i in range(1, num_caves + 1):
+        row = (i - 1) // cols
+        col = (i - 1) % cols
+        candidates = (
+            ((row - 1) % rows) * cols + col + 1,
+            ((row + 1) % rows) * cols + col + 1,
+            row * cols + (col - 1) % cols + 1,
+            row * cols + (col + 1) % cols + 1,
+        )
+        # Narrow tori would otherwise list the same cave twice or the cave itself
+        seen = []
+        for neighbor in candidates:
+            if neighbor != i and neighbor not in seen:
+                seen.append(neighbor)
+        targets.extend(seen)
+        offsets.append(len(targets))
+    return Topology("torus", (rows, cols), offsets, targets, cols)
+
+
+# Vertex connections of the dodecahedron used by the original 1973 game
+_DODECAHEDRON = (
+    (2, 5, 8), (1, 3, 10), (2, 4, 12), (3, 5, 14), (1, 4, 6),
+    (5, 7, 15), (6, 8, 17), (1, 7, 9), (8, 10, 18), (2, 9, 11),
+    (10, 12, 19), (3, 11, 13), (12, 14, 20), (4, 13, 15), (6, 14, 16),
+    (15, 17, 20), (7, 16, 18), (9, 17, 19), (11, 18, 20), (13, 16, 19),
+)
+
+
+@register_topology("dodecahedron")
+def dodecahedron():
+    """The classic 20-cave dodecahedron where every cave has 3 tunnels."""
+    return Topology.from_neighbor_lists("dodecahedron", (), _DODECAHEDRON, cols=5)
+
+
+@register_topology("random_regular")
+def random_regular(num_caves, degree=3, seed=0):
+    """
+    A random connected k-regular graph built with the pairing model.
+    The same (num_caves, degree, seed) always gives the same map.
+    """
+    if degree >= num_caves or (num_caves * degree) % 2:
+        raise ValueError("Need degree < num_caves and an even num_caves * degree.")
+    rng = random.Random(seed)
+    for _ in range(1000):
+        try:
+            neighbor_lists = _pair_stubs(num_caves, degree, rng)
+        except ValueError:
+            # A stuck repair is just an unlucky draw; pair the stubs again
+            continue
+        if _is_connected(neighbor_lists):
+            return Topology.from_neighbor_lists(
+                "random_regular", (num_caves, degree, seed), neighbor_lists
+            )
+    raise ValueError(f"Could not build a connected {degree}-regular graph on {num_caves} caves.")
+
+
+def _pair_stubs(num_caves, degree, rng):
+    """
+    Randomly pairs up `degree` stubs per cave. Self-loops and repeated
+    tunnels are repaired by swapping with a random earlier pair.
+    Returns sorted neighbor lists; raises ValueError if the repair gets
+    stuck.
+    """
+    stubs = [cave for cave in range(1, num_caves + 1) for _ in range(degree)]
+    rng.shuffle(stubs)
+    pairs = [[stubs[i], stubs[i + 1]] for i in range(0, len(stubs), 2)]
+    edges = {}
+    for pair in pairs:
+        key = (min(pair), max(pair))
+        edges[key] = edges.get(key, 0) + 1
+
+    def is_bad(a, b):
+        return a == b or edges[(min(a, b), max(a, b))] > 1
+
+    rounds = 100 * len(pairs)
+    for _ in range(rounds):
+        bad = [i for i, (a, b) in enumerate(pairs) if is_bad(a, b)]
+        if not bad:
+            break
+        for i in bad:
+            a, b = pairs[i]
+            if not is_bad(a, b):
+                continue
+            j = rng.randrange(len(pairs))
+            c, d = pairs[j]
+            # Swap partners: (a, b), (c, d) -> (a, d), (c, b)
+            if len({a, d}) < 2 or len({c, b}) < 2:
+                continue
+            for x, y, step in ((a, b, -1), (c, d, -1), (a, d, 1), (c, b, 1)):
+                key = (min(x, y), max(x, y))
+                edges[key] = edges.get(key, 0) + step
+            pairs[i] = [a, d]
+            pairs[j] = [c, b]
+    # The last round's swaps may have fixed everything, so check once more
+    if any(is_bad(a, b) for a, b in pairs):
+        raise ValueError(f"Could not pair {degree} stubs per cave on {num_caves} caves without self-loops "
+                         f"or repeated tunnels after {rounds} repair rounds.")
+
+    neighbor_lists = [[] for _ in range(num_caves)]
+    for a, b in pairs:
+        neighbor_lists[a - 1].append(b)
+        neighbor_lists[b - 1].append(a)
+    for neighbors in neighbor_lists:
+        neighbors.sort()
+    return neighbor_lists
+
+
+def _is_connected(neighbor_lists):
+    """Returns True if every cave can be reached from cave 1."""
+    seen = bytearray(len(neighbor_lists) + 1)
+    seen[1] = 1
+    stack = [1]
+    while stack:
+        cave = stack.pop()
+        for neighbor in neighbor_lists[cave - 1]:
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                stack.append(neighbor)
+    return sum(seen) == len(neighbor_lists)
+
+
+def classic():
+    """Returns the default 20-cave 4x5 grid."""
+    return grid(4, 5)
@@ -0,0 +1,239 @@
+import argparse
+import math
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from wumpus import HuntTheWumpus
+from belief import BeliefAgent
+from mcts import MCTSAgent
+from rng import make_rng
+from scenario import get_scenario
+from solver import DEFAULT_TABLE, OptimalAgent
+from topology import classic, get_topology
+
+OUTCOMES = ("won", "wumpus", "pit", "self_shot", "out_of_arrows", "timeout")
+
+
+class RunningStats:
+    """
+    Streaming count, mean, variance, min and max (Welford's algorithm).
+    Two instances can be merged, so workers never ship per-game lists.
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        """Adds one sample."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Folds another RunningStats into this one."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self._m2 += other._m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+
+class TournamentStats:
+    """Aggregated results of many games: win rate, death causes and move counts."""
+    def __init__(self):
+        self.games = 0
+        self.outcomes = Counter()
+        self.moves = RunningStats()
+        self.winning_moves = RunningStats()
+        self.elapsed = 0.0
+
+    def record(self, outcome, moves):
+        """Adds the result of a single game."""
+        self.games += 1
+        self.outcomes[outcome] += 1
+        self.moves.add(moves)
+        if outcome == "won":
+            self.winning_moves.add(moves)
+
+    def merge(self, other):
+        """Folds another TournamentStats into this one."""
+        self.games += other.games
+        self.outcomes.update(other.outcomes)
+        self.moves.merge(other.moves)
+        self.winning_moves.merge(other.winning_moves)
+
+    @property
+    def win_rate(self):
+        return self.outcomes["won"] / self.games if self.games else 0.0
+
+    def summary(self):
+        """Returns the results as a plain dict."""
+        return {
+            "games": self.games,
+            "win_rate": self.win_rate,
+            "outcomes": {name: self.outcomes[name] for name in OUTCOMES},
+            "moves_mean": self.moves.mean,
+            "moves_stdev": self.moves.stdev,
+            "moves_min": self.moves.min if self.moves.count else None,
+            "moves_max": self.moves.max if self.moves.count else None,
+            "winning_moves_mean": self.winning_moves.mean,
+            "elapsed": self.elapsed,
+            "games_per_second": self.games / self.elapsed if self.elapsed else None,
+        }
+
+    def __str__(self):
+        lines = [f"Games played: {self.games}", f"Win rate: {self.win_rate:.2%}"]
+        for name in OUTCOMES:
+            count = self.outcomes[name]
+            share = count / self.games if self.games else 0.0
+            lines.append(f"  {name:<14} {count:>10} ({share:.2%})")
+        lines.append(f"Moves per game: {self.moves.mean:.2f} +/- {self.moves.stdev:.2f}")
+        if self.elapsed:
+            lines.append(f"Throughput: {self.games / self.elapsed:,.0f} games/s")
+        return "\n".join(lines)
+
+
+def random_agent(game):
+    """
+    Baseline agent: shoots a random neighbor when it smells the Wumpus,
+    otherwise moves to a random neighbor. Draws from the game's own generator.
+    """
+    neighbors = game._get_neighbors(game.player_location)
+    if "I smell a Wumpus!" in game._get_perceptions():
+        return "shoot", [game.rng.choice(neighbors)]
+    return "move", game.rng.choice(neighbors)
+
+
+def play_game(game, agent, max_moves=1000, wallet=None):
+    """
+    Plays one game to the end on an already reset instance.
+    The agent is called with the game and returns ("move", cave) or
+    ("shoot", [caves]). Agents that need randomness should draw from
+    game.rng to stay reproducible. Agents with a new_game(game) method are
+    told when a game starts. With a wallet (anything with a `planks`
+    count) moves use its planks to escape pits. Returns the outcome and
+    the number of moves made.
+    """
+    if hasattr(agent, "new_game"):
+        agent.new_game(game)
+    moves = 0
+    while not game.game_over:
+        if moves >= max_moves:
+            return "timeout", moves
+        action, target = agent(game)
+        if action == "move":
+            moves += 1
+            if wallet is None:
+                game.move_player(target, False, False)
+            elif game.move_player(target, wallet.planks > 0, False) == "planks":
+                wallet.planks -= 1
+        elif action == "shoot":
+            game.shoot_arrow(target)
+        else:
+            raise ValueError(f"Unknown action {action!r}. Use 'move' or 'shoot'.")
+    return game.outcome, moves
+
+
+def _worker_seed(seed, worker):
+    """Derives a deterministic, well separated seed for one worker."""
+    return seed * 1_000_003 + worker
+
+
+def _run_worker(agent, num_games, seed, topology, initial_arrows, max_moves, rng_kind, scenario=None):
+    """Runs a share of the tournament in one process on a single reused game."""
+    stats = TournamentStats()
+    game = HuntTheWumpus(initial_arrows=initial_arrows, topology=topology, rng=make_rng(seed, rng_kind),
+                         scenario=scenario)
+    for i in range(num_games):
+        if i:
+            game.reset()
+        outcome, moves = play_game(game, agent, max_moves)
+        stats.record(outcome, moves)
+    return stats
+
+
+def run_tournament(agent, num_games, workers=None, seed=0, topology=None,
+                   initial_arrows=5, max_moves=1000, rng_kind="mt", scenario=None):
+    """
+    Plays `num_games` games with `agent` spread over a process pool and
+    returns the aggregated TournamentStats. The agent must be picklable,
+    i.e. a module-level function or an instance of a module-level class.
+    The same seed and worker count always give the same results.
+    """
+    if topology is None:
+        topology = classic()
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, num_games))
+    shares = [num_games // workers + (1 if w < num_games % workers else 0) for w in range(workers)]
+
+    start = time.perf_counter()
+    total = TournamentStats()
+    if workers == 1:
+        total.merge(_run_worker(agent, num_games, _worker_seed(seed, 0), topology, initial_arrows, max_moves, rng_kind,
+                                scenario))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_run_worker, agent, share, _worker_seed(seed, w), topology, initial_arrows, max_moves, rng_kind,
+                            scenario)
+                for w, share in enumerate(shares)
+            ]
+            for future in futures:
+                total.merge(future.result())
+    total.elapsed = time.perf_counter() - start
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a Monte Carlo tournament of Hunt the Wumpus games.")
+    parser.add_argument("--games", type=int, default=10000, help="number of games to play")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for the workers")
+    parser.add_argument("--agent", choices=("random", "belief", "mcts", "optimal"), default="random",
+                        help="which agent plays; optimal needs the table written by solver.py")
+    parser.add_argument("--topology", default="grid", help="topology name, e.g. grid, torus, dodecahedron")
+    parser.add_argument("--size", type=int, nargs="*", default=[], help="topology parameters, e.g. 4 5")
+    parser.add_argument("--scenario", default="classic", help="hazard scenario: classic, pack or dense")
+    parser.add_argument("--rng", default="mt", help="generator kind: mt, counter, pcg64 or philox")
+    parser.add_argument("--mcts-iterations", type=int, default=300, help="MCTS iterations per decision")
+    parser.add_argument("--max-moves", type=int, default=1000, help="moves before a game counts as a timeout")
+    parser.add_argument("--table", default=DEFAULT_TABLE, help="solver table the optimal agent plays from")
+    args = parser.parse_args()
+
+    topology = get_topology(args.topology, *args.size)
+    if args.agent == "mcts":
+        # A fixed iteration count keeps MCTS tournaments reproducible
+        agent = MCTSAgent(time_budget=None, iterations=args.mcts_iterations)
+    elif args.agent == "optimal":
+        agent = OptimalAgent(args.table)
+    else:
+        agent = BeliefAgent() if args.agent == "belief" else random_agent
+    stats = run_tournament(agent, args.games, args.workers, args.seed, topology,
+                           max_moves=args.max_moves, rng_kind=args.rng, scenario=get_scenario(args.scenario))
+    print(stats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,527 @@
+import random
+from array import array
+from bitboard import CaveBitboard
+from freecaves import FreeCaveIndex, random_cave_except
+from topology import classic
+from perception import PerceptionTable, WUMPUS
+from scenario import CLASSIC
+from paths import distance_index, ARROW_RANGE
+from instrument import NULL_INSTRUMENT, ENGINE_ACTIONS
+from codes import (MOVE_SAFE, MOVE_INVALID, MOVE_WUMPUS, MOVE_PIT, MOVE_PLANKS, MOVE_BAT_TAXI, MOVE_BATS,
+                   MOVE_GAME_OVER, MOVE_RESULTS, SHOT_MISSED, SHOT_WUMPUS, SHOT_SELF, SHOT_WOKE, SHOT_VEERED,
+                   SHOT_INVALID, SHOT_NO_ARROWS, SHOT_GAME_OVER, SHOT_KILLED)
+
+# Flags of the per-cave hazard map
+PIT_FLAG = 1
+BAT_FLAG = 2
+# Chance that each Wumpus wakes up and moves after a missed shot
+WAKE_CHANCE = 0.2
+
+
+class GameState:
+    """
+    Immutable record of everything that changes during a game.
+    The topology and the precomputed tables are not part of it, and the pit
+    and bat tuples are shared between snapshots of the same game.
+    """
+    __slots__ = ("player_location", "wumpus_locations", "pit_locations", "bat_locations",
+                 "num_arrows", "game_over", "outcome", "message", "rng_state")
+
+    def __init__(self, player_location, wumpus_locations, pit_locations, bat_locations,
+                 num_arrows, game_over, outcome, message, rng_state=None):
+        set_field = object.__setattr__
+        set_field(self, "player_location", player_location)
+        set_field(self, "wumpus_locations", tuple(wumpus_locations))
+        set_field(self, "pit_locations", pit_locations)
+        set_field(self, "bat_locations", bat_locations)
+        set_field(self, "num_arrows", num_arrows)
+        set_field(self, "game_over", game_over)
+        set_field(self, "outcome", outcome)
+        set_field(self, "message", message)
+        set_field(self, "rng_state", rng_state)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameState is immutable.")
+
+    def __delattr__(self, name):
+        raise AttributeError("GameState is immutable.")
+
+    @property
+    def wumpus_location(self):
+        """The cave of the first Wumpus, the only one in the classic game."""
+        return self.wumpus_locations[0]
+
+    def __repr__(self):
+        return (f"GameState(player={self.player_location}, wumpus={self.wumpus_location}, "
+                f"arrows={self.num_arrows}, game_over={self.game_over})")
+
+
+class HuntTheWumpus:
+    """
+    Core game logic for Hunt the Wumpus.
+    Manages the cave map, element placement, and game state.
+    """
+    def __init__(self, initial_arrows=5, use_bitboards=False, topology=None, seed=None, rng=None,
+                 recorder=None, undo=False, instrument=None, scenario=None):
+        # Every game draws from its own generator so runs are reproducible and independent
+        self.rng = rng if rng is not None else random.Random(seed)
+        # Topologies are built once and shared by every game that uses them
+        self.topology = topology if topology is not None else classic()
+        self.num_caves = self.topology.num_caves
+        self.cave_map = self._generate_cave_map()
+        # How many Wumpuses, pits and bats to hide, fixed for the lifetime of the instance
+        self.scenario = scenario if scenario is not None else CLASSIC
+        self.num_wumpuses, self.num_pits, self.num_bats = self.scenario.counts(self.num_caves)
+        # Living Wumpuses; the last one stays listed after it is shot
+        self.wumpus_locations = []
+        self.pit_locations = []
+        self.bat_locations = []
+        self.player_location = -1
+        self.initial_arrows = initial_arrows
+        self.num_arrows = initial_arrows
+        self.game_over = False
+        # How the game ended: "won", "wumpus", "pit", "self_shot" or "out_of_arrows"
+        self.outcome = None
+        # Message text, or a str.format template filled in from _message_args when first read
+        self._message = ""
+        self._message_args = None
+        # Optional bitmask backend for O(1) hazard and perception checks
+        self.bitboard = CaveBitboard.for_topology(self.topology) if use_bitboards else None
+        # Caves without pits or bats, for O(1) placement and bat drops
+        self.free_caves = FreeCaveIndex.for_topology(self.topology)
+        # O(1) hazard checks however many hazards there are: a flag byte per
+        # cave for the static pits and bats, and a count per Wumpus cave
+        self._hazard_flags = bytearray(self.num_caves + 1)
+        self._wumpus_counts = {}
+        # What the player senses in each cave, kept up to date as the Wumpus moves
+        self.perception_table = PerceptionTable(self.topology)
+        # Optional ReplayWriter that logs every action
+        self.recorder = recorder
+        # Snapshots taken before each action when undo is enabled
+        self.undo_stack = [] if undo else None
+        self._placement = ((), ())
+        # Optional Instrument timing every public action; the default costs nothing
+        self.instrument = instrument if instrument is not None else NULL_INSTRUMENT
+        self.instrument.attach(self, "engine", ENGINE_ACTIONS)
+
+        # Place the Wumpus, pits, bats, and player at the start
+        self._place_game_elements()
+
+    def _generate_cave_map(self):
+        """
+        Returns the cave map of the game's topology.
+        This is a read-only view over the topology's cached adjacency arrays,
+        so no per-game dict of lists is built.
+        """
+        return self.topology.cave_map
+
+    # --- MODIFIED CODE START ---
+    def _place_game_elements(self):
+        """
+        Randomly places the Wumpuses, pits, bats, and player in unique caves.
+        Pits and bats are popped from the free-cave index; the Wumpuses and
+        the player are drawn from what is left without removing them, so
+        every placement costs O(hazards) instead of a shuffle of all caves.
+        """
+        free = self.free_caves
+        free.reset()
+        self._clear_hazards()
+
+        for _ in range(self.num_pits):
+            self.pit_locations.append(free.pop_random(self.rng))
+
+        for _ in range(self.num_bats):
+            self.bat_locations.append(free.pop_random(self.rng))
+
+        wumpus_counts = self._wumpus_counts
+        for _ in range(self.num_wumpuses):
+            wumpus = free.sample_avoiding(self.rng, (), wumpus_counts)
+            self.wumpus_locations.append(wumpus)
+            wumpus_counts[wumpus] = 1
+        self.player_location = free.sample_avoiding(self.rng, (), wumpus_counts)
+
+        self._placement = (tuple(self.pit_locations), tuple(self.bat_locations))
+        self._index_hazards()
+        if self.recorder is not None:
+            self.recorder.start_game(self)
+    # --- MODIFIED CODE END ---
+
+    def _clear_hazards(self):
+        """Empties the hazard map of the previous placement in O(hazards)."""
+        flags = self._hazard_flags
+        for cave in self._placement[0] + self._placement[1]:
+            flags[cave] = 0
+        self._wumpus_counts.clear()
+
+    def _index_hazards(self):
+        """Fills the hazard map, the perception table and the bitboard from the placement lists."""
+        flags = self._hazard_flags
+        for cave in self.pit_locations:
+            flags[cave] = PIT_FLAG
+        for cave in self.bat_locations:
+            flags[cave] |= BAT_FLAG
+        self._wumpus_counts.clear()
+        for cave in self.wumpus_locations:
+            self._wumpus_counts[cave] = self._wumpus_counts.get(cave, 0) + 1
+        self.perception_table.build(self.wumpus_locations, self.pit_locations, self.bat_locations)
+        if self.bitboard is not None:
+            self.bitboard.place(self.wumpus_locations, self.pit_locations, self.bat_locations)
+
+    @property
+    def wumpus_location(self):
+        """The cave of the first Wumpus, the only one in the classic game."""
+        return self.wumpus_locations[0] if self.wumpus_locations else -1
+
+    def _move_wumpus(self, index, new_cave):
+        """Moves Wumpus number `index`, touching only the neighbors of its old and new cave."""
+        old_cave = self.wumpus_locations[index]
+        counts = self._wumpus_counts
+        if counts[old_cave] == 1:
+            del counts[old_cave]
+        else:
+            counts[old_cave] -= 1
+        counts[new_cave] = counts.get(new_cave, 0) + 1
+        self.wumpus_locations[index] = new_cave
+        self.perception_table.move(WUMPUS, old_cave, new_cave)
+
+    def _kill_wumpus(self, cave):
+        """Removes one Wumpus living in `cave`."""
+        counts = self._wumpus_counts
+        if counts[cave] == 1:
+            del counts[cave]
+        else:
+            counts[cave] -= 1
+        self.wumpus_locations.remove(cave)
+        self.perception_table.remove(WUMPUS, cave)
+        if self.bitboard is not None:
+            self.bitboard.place_wumpuses(self.wumpus_locations)
+
+    def reset(self, initial_arrows=None):
+        """Starts a new game on this instance, reusing its topology and tables."""
+        if initial_arrows is not None:
+            self.initial_arrows = initial_arrows
+        self.wumpus_locations = []
+        self.pit_locations = []
+        self.bat_locations = []
+        self.num_arrows = self.initial_arrows
+        self.game_over = False
+        self.outcome = None
+        self.message = ""
+        if self.undo_stack is not None:
+            self.undo_stack.clear()
+        self._place_game_elements()
+
+    def snapshot(self, include_rng=True):
+        """
+        Returns a GameState of the current game. Without the generator state
+        the snapshot is cheaper, but restoring it does not rewind the dice.
+        """
+        return GameState(self.player_location, self.wumpus_locations, self._placement[0],
+                         self._placement[1], self.num_arrows, self.game_over, self.outcome,
+                         self.message, self.rng.getstate() if include_rng else None)
+
+    def restore(self, state):
+        """Puts the game back into a state returned by snapshot(). Restores are not recorded."""
+        if state.pit_locations is not self._placement[0] or state.bat_locations is not self._placement[1]:
+            # A snapshot from before a reset: rebuild the tables for its placement
+            self._clear_hazards()
+            self.pit_locations = list(state.pit_locations)
+            self.bat_locations = list(state.bat_locations)
+            self._placement = (state.pit_locations, state.bat_locations)
+            self.wumpus_locations = list(state.wumpus_locations)
+            # Removing the caves in their original order rebuilds the same index
+            self.free_caves.reset()
+            for cave in self.pit_locations + self.bat_locations:
+                self.free_caves.remove(cave)
+            self._index_hazards()
+        elif tuple(self.wumpus_locations) != state.wumpus_locations:
+            # Wumpuses only move or die, so patch the moved ones in place
+            if len(self.wumpus_locations) != len(state.wumpus_locations):
+                for cave in self.wumpus_locations:
+                    self.perception_table.remove(WUMPUS, cave)
+                self.wumpus_locations = list(state.wumpus_locations)
+                self._wumpus_counts.clear()
+                for cave in self.wumpus_locations:
+                    self._wumpus_counts[cave] = self._wumpus_counts.get(cave, 0) + 1
+                    self.perception_table.add(WUMPUS, cave)
+            else:
+                for index, cave in enumerate(state.wumpus_locations):
+                    if self.wumpus_locations[index] != cave:
+                        self._move_wumpus(index, cave)
+            if self.bitboard is not None:
+                self.bitboard.place_wumpuses(self.wumpus_locations)
+        self.player_location = state.player_location
+        self.num_arrows = state.num_arrows
+        self.game_over = state.game_over
+        self.outcome = state.outcome
+        self.message = state.message
+        if state.rng_state is not None:
+            self.rng.setstate(state.rng_state)
+
+    def undo(self):
+        """Reverts the last move_player, shoot_arrow or take_bat_taxi call (needs undo=True)."""
+        if not self.undo_stack:
+            raise IndexError("Nothing to undo.")
+        self.restore(self.undo_stack.pop())
+
+    @property
+    def message(self):
+        """What happened in the last action. Deferred messages are formatted on first read."""
+        if self._message_args is not None:
+            self._message = self._message.format(*self._message_args)
+            self._message_args = None
+        return self._message
+
+    @message.setter
+    def message(self, text):
+        self._message = text
+        self._message_args = None
+
+    def _say(self, template, *args):
+        """Sets a message whose formatting is deferred until someone reads it."""
+        self._message = template
+        self._message_args = args
+
+    def _get_neighbors(self, cave):
+        """Returns a list of caves connected to the given cave."""
+        return self.topology.neighbors(cave)
+
+    def _is_neighbor(self, cave, other):
+        """Returns True if `other` is connected to `cave`."""
+        if self.bitboard is not None:
+            return self.bitboard.is_neighbor(cave, other)
+        return self.topology.is_neighbor(cave, other)
+
+    @property
+    def paths(self):
+        """Distance index of the cave map, built on first use and shared by all games on it."""
+        return distance_index(self.topology)
+
+    def arrow_targets(self, hops=ARROW_RANGE):
+        """Returns the caves a crooked arrow shot from the player's cave can reach."""
+        return self.paths.arrow_reach(self.player_location, hops)
+
+    def _hazard_at(self, cave):
+        """Returns "wumpus", "pit", "bats" or None for the given cave."""
+        if self.bitboard is not None:
+            return self.bitboard.hazard_at(cave)
+        if cave in self._wumpus_counts:
+            return "wumpus"
+        if not 0 < cave <= self.num_caves:
+            return None
+        flags = self._hazard_flags[cave]
+        if flags & PIT_FLAG:
+            return "pit"
+        if flags & BAT_FLAG:
+            return "bats"
+        return None
+
+    def _get_perceptions(self):
+        """Returns the perception messages for the player's cave from the precomputed table."""
+        return list(self.perception_table.perceptions(self.player_location))
+
+    def _check_hazards(self, has_planks, has_bat_taxi):
+        """Checks if the player's current location has a hazard and updates game state."""
+        return MOVE_RESULTS[self._hazard_code(has_planks, has_bat_taxi)]
+
+    def _hazard_code(self, has_planks, has_bat_taxi):
+        """_check_hazards returning a MOVE_* code."""
+        hazard = self._hazard_at(self.player_location)
+        if hazard == "wumpus":
+            self.message = "The Wumpus got you! Game Over."
+            self.game_over = True
+            self.outcome = "wumpus"
+            return MOVE_WUMPUS
+        elif hazard == "pit":
+            if has_planks:
+                self.message = "You fell into a pit but used your wooden planks to escape!"
+                return MOVE_PLANKS
+            else:
+                self.message = "You fell into a bottomless pit! Game Over."
+                self.game_over = True
+                self.outcome = "pit"
+                return MOVE_PIT
+        elif hazard == "bats":
+            if has_bat_taxi:
+                self.message = "Giant bats snatch you! You can now choose your destination."
+                return MOVE_BAT_TAXI
+            else:
+                self.message = "Giant bats snatch you and drop you in a random cave!"
+                drop = self.free_caves.sample_avoiding(self.rng, (self.player_location,), self._wumpus_counts)
+                if drop is None:
+                    drop = random_cave_except(self.rng, self.num_caves, self.player_location)
+                self.player_location = drop
+                return MOVE_BATS
+        return MOVE_SAFE
+
+    def use_radar(self, cave):
+        """Scans a cave and returns its hazard: "wumpus", "pit", "bats" or None."""
+        hazard = self._hazard_at(cave)
+        if self.recorder is not None:
+            self.recorder.record_radar(self, cave, hazard)
+        return hazard
+
+    def take_bat_taxi(self, destination, has_planks, has_bat_taxi):
+        """Flies the player to any cave and checks it for hazards."""
+        if self.undo_stack is not None:
+            self.undo_stack.append(self.snapshot())
+        self.player_location = destination
+        self._say("The bats dropped you off in cave {}.", destination)
+        result = self._check_hazards(has_planks, has_bat_taxi)
+        if self.recorder is not None:
+            self.recorder.record_bat_taxi(self, destination, result)
+        return result
+
+    def move_player(self, destination, has_planks, has_bat_taxi):
+        """Moves the player to a new cave if the move is valid."""
+        if self.undo_stack is None and self.recorder is None:
+            return MOVE_RESULTS[self._move(destination, has_planks, has_bat_taxi)]
+        return MOVE_RESULTS[self._move_action(destination, has_planks, has_bat_taxi)]
+
+    def _move_action(self, destination, has_planks, has_bat_taxi):
+        """move_player with undo and recording, returning a MOVE_* code."""
+        if self.undo_stack is not None:
+            self.undo_stack.append(self.snapshot())
+        code = self._move(destination, has_planks, has_bat_taxi)
+        if self.recorder is not None:
+            valid = code != MOVE_INVALID and code != MOVE_GAME_OVER
+            self.recorder.record_move(self, destination, MOVE_RESULTS[code], valid)
+        return code
+
+    def _move(self, destination, has_planks, has_bat_taxi):
+        if self.game_over:
+            self.message = "The game is over. Start a new game."
+            return MOVE_GAME_OVER
+
+        if not self._is_neighbor(self.player_location, destination):
+            self.message = "That's not a connected cave! Try again."
+            return MOVE_INVALID
+
+        self.player_location = destination
+        self._message = "You are now in cave {}."
+        self._message_args = (destination,)
+        if destination in self._wumpus_counts or self._hazard_flags[destination]:
+            return self._hazard_code(has_planks, has_bat_taxi)
+        return MOVE_SAFE
+
+    def shoot_arrow(self, target_path):
+        """Fires an arrow along a given path and checks for hits."""
+        if self.undo_stack is None and self.recorder is None:
+            self._shoot(target_path)
+        else:
+            self._shoot_action(target_path)
+
+    def _shoot_action(self, target_path):
+        """shoot_arrow with undo and recording, returning a SHOT_* code."""
+        if self.undo_stack is not None:
+            self.undo_stack.append(self.snapshot())
+        code = self._shoot(target_path)
+        if self.recorder is not None:
+            self.recorder.record_shot(self, target_path)
+        return code
+
+    def _shoot(self, target_path):
+        if self.game_over:
+            self.message = "The game is over. Start a new game."
+            return SHOT_GAME_OVER
+
+        if self.num_arrows <= 0:
+            self.message = "You are out of arrows! Game Over."
+            self.game_over = True
+            self.outcome = "out_of_arrows"
+            return SHOT_NO_ARROWS
+
+        self.num_arrows -= 1
+
+        if not target_path or not isinstance(target_path, list):
+            self.message = "Invalid arrow path. Please provide a list of cave numbers."
+            return SHOT_INVALID
+
+        current_arrow_location = self.player_location
+
+        for i, target_cave in enumerate(target_path):
+            if i >= 5:
+                self.message = "Arrow ran out of range!"
+                break
+
+            if not self._is_neighbor(current_arrow_location, target_cave) and target_cave != current_arrow_location:
+                self.message = "Arrow veered off course! It hit nothing."
+                return SHOT_VEERED
+
+            current_arrow_location = target_cave
+
+            if current_arrow_location in self._wumpus_counts:
+                if len(self.wumpus_locations) == 1:
+                    self.message = "You shot the Wumpus! You win!"
+                    self.game_over = True
+                    self.outcome = "won"
+                    return SHOT_WUMPUS
+                self._kill_wumpus(current_arrow_location)
+                self._say("You shot a Wumpus! {} left.", len(self.wumpus_locations))
+                if self.num_arrows == 0:
+                    self.message += "\nYou are out of arrows! Game Over."
+                    self.game_over = True
+                    self.outcome = "out_of_arrows"
+                return SHOT_KILLED
+
+            if current_arrow_location == self.player_location:
+                self.message = "You shot yourself! Game Over."
+                self.game_over = True
+                self.outcome = "self_shot"
+                return SHOT_SELF
+
+        # Every Wumpus wakes up on its own and moves to any cave but the player's and its own
+        woken = 0
+        for index, original_wumpus_location in enumerate(self.wumpus_locations):
+            if self.rng.random() < WAKE_CHANCE:
+                woken += 1
+                if self.num_caves > 2:
+                    new_location = random_cave_except(
+                        self.rng, self.num_caves, self.player_location, original_wumpus_location
+                    )
+                else:
+                    new_location = random_cave_except(self.rng, self.num_caves, self.player_location)
+                self._move_wumpus(index, new_location)
+        if woken and self.bitboard is not None:
+            self.bitboard.place_wumpuses(self.wumpus_locations)
+        if woken == 1 and len(self.wumpus_locations) == 1:
+            self.message = "Your shot woke the Wumpus! He moved!"
+        elif woken:
+            self._say("Your shot woke {} of the Wumpuses! They moved!", woken)
+        else:
+            self.message = "Arrow missed."
+
+        if self.num_arrows == 0:
+            self.message += "\nYou are out of arrows! Game Over."
+            self.game_over = True
+            self.outcome = "out_of_arrows"
+        return SHOT_WOKE if woken else SHOT_MISSED
+
+    def play(self, actions, has_planks=False, has_bat_taxi=False):
+        """
+        Plays a sequence of ("move", cave) and ("shoot", [caves]) actions, the
+        tuples agents return, and returns an array of result codes from
+        codes.py, one per action played: MOVE_* for moves, SHOT_* for shots.
+        Stops after an action that ends the game or calls the bat taxi, and
+        stops using the planks once they saved the player. No message is
+        formatted unless someone reads game.message.
+        """
+        results = array("b")
+        plain = self.undo_stack is None and self.recorder is None
+        move = self._move if plain else self._move_action
+        shoot = self._shoot if plain else self._shoot_action
+        for kind, target in actions:
+            if kind == "move":
+                code = move(target, has_planks, has_bat_taxi)
+                results.append(code)
+                if code == MOVE_PLANKS:
+                    has_planks = False
+                elif code == MOVE_BAT_TAXI:
+                    break
+            elif kind == "shoot":
+                results.append(shoot(target))
+            else:
+                raise ValueError(f"Unknown action {kind!r}. Use 'move' or 'shoot'.")
+            if self.game_over:
+                break
+        return results